@@ -11,11 +11,11 @@ import tempfile
 import threading
 import time
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timezone
 from pathlib import Path
 from queue import Empty
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import serial
@@ -55,7 +55,8 @@ else:
     PHIDGET_PANEL_IMPORT_ERROR = None
 
 from fbg.config import DEFAULT_CONFIG, InterrogatorSettings, load_config
-from fbg.streaming import FBGStreamReader
+from fbg.metrics import REGISTRY, format_metrics
+from fbg.streaming import FBGStreamReader, MultiFBGStreamReader, create_stream_reader
 
 ROOT_DIR = Path(__file__).resolve().parent
 STAGE_DIR = ROOT_DIR / "stage_control"
@@ -340,11 +341,16 @@ class BotaForceReader(threading.Thread):
                 raise RuntimeError("Bota activate() failed")
             self._initialized_event.set()
             loop_count = 0
+            metric_frames = REGISTRY.counter("bota.frames")
+            metric_failures = REGISTRY.counter("bota.read_failures")
+            metric_read = REGISTRY.histogram("bota.read_s")
 
             while not self._stop_event.is_set():
+                read_start = time.perf_counter()
                 try:
                     frame = self._driver.read_frame()
                 except Exception as exc:
+                    metric_failures.inc()
                     self._consecutive_read_failures += 1
                     if self._consecutive_read_failures >= 30:
                         self.error = (
@@ -356,6 +362,9 @@ class BotaForceReader(threading.Thread):
 
                 force = tuple(float(v) for v in frame.force)
                 timestamp = time.perf_counter()
+                metric_read.observe(timestamp - read_start)
+                metric_frames.inc()
+                REGISTRY.heartbeat("bota.sample", timestamp)
                 temp = float(frame.temperature)
                 self._consecutive_read_failures = 0
                 with self._lock:
@@ -621,6 +630,8 @@ class RealSenseCapture:
 
 class ExperimentController:
     _STAGE_STEP_SIZE_MM = 0.000047625
+    # Longest wait for FBG bursts still in flight when an averaging window closes.
+    _FBG_WINDOW_WAIT_S = 0.25
 
     def __init__(
         self,
@@ -628,7 +639,7 @@ class ExperimentController:
         output_dir: Path,
         bota_config_path: Path,
         bota_interface_override: Optional[str],
-        fbg_interrogator_cfg: InterrogatorSettings,
+        fbg_interrogator_cfgs: Sequence[InterrogatorSettings],
         stage_module_id: int = 1,
         y_stage_module_id: int = 2,
         z_stage_module_id: int = 3,
@@ -653,7 +664,8 @@ class ExperimentController:
         self.output_dir = output_dir
         self.bota_config_path = bota_config_path
         self.bota_interface_override = (bota_interface_override or "").strip() or None
-        self.fbg_interrogator_cfg = fbg_interrogator_cfg
+        # Primary first; several entries aggregate into one reader.
+        self.fbg_interrogator_cfgs = list(fbg_interrogator_cfgs)
         self.stage_module_id = int(stage_module_id)
         self.y_stage_module_id = int(y_stage_module_id)
         self.z_stage_module_id = int(z_stage_module_id)
@@ -700,7 +712,7 @@ class ExperimentController:
         self._z_max_mm = float(self.z_total_steps) * self._STAGE_STEP_SIZE_MM
 
         self._force_reader: Optional[Union[BotaForceReader, PhidgetForceReader]] = None
-        self._fbg_reader: Optional[FBGStreamReader] = None
+        self._fbg_reader: Optional[Union[FBGStreamReader, MultiFBGStreamReader]] = None
         self._realsense_camera: Optional[RealSenseCapture] = None
 
     @staticmethod
@@ -974,20 +986,24 @@ class ExperimentController:
                 self._force_reader = None
 
             try:
-                fbg_reader = FBGStreamReader(self.fbg_interrogator_cfg, history_seconds=10.0)
+                # ``separate_process`` in the config moves acquisition out of
+                # this (Qt, Bota, stage) process.
+                fbg_reader = create_stream_reader(self.fbg_interrogator_cfgs, history_seconds=10.0)
                 fbg_reader.start()
                 if not fbg_reader.wait_until_ready(timeout=8.0):
-                    cfg = self.fbg_interrogator_cfg
+                    targets = ", ".join(
+                        f"{cfg.ip_address}:{cfg.port}" for cfg in self.fbg_interrogator_cfgs
+                    )
                     detail = (fbg_reader.error or "").strip()
                     if detail:
                         msg = (
                             f"FBG interrogator connection failed: "
-                            f"{detail} (target {cfg.ip_address}:{cfg.port})"
+                            f"{detail} (target {targets})"
                         )
                     else:
                         msg = (
                             f"Timeout waiting for FBG interrogator connection "
-                            f"(target {cfg.ip_address}:{cfg.port}). "
+                            f"(target {targets}). "
                             "Check interrogator power/cable/IP, and ensure no other app is connected."
                         )
                     fbg_reader.stop()
@@ -1550,12 +1566,19 @@ class ExperimentController:
         with self._x_state_lock:
             return float(self._latest_y_mm)
 
-    def get_fbg_history(self, max_points: int = 1500) -> Tuple[np.ndarray, np.ndarray]:
+    def fbg_metrics(self) -> Dict[str, float]:
+        if self._fbg_reader is None or not self._fbg_reader.is_ready:
+            return {}
+        return self._fbg_reader.metrics()
+
+    def get_fbg_history(self, max_points: int = 1500, mode: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Newest ``max_points`` FBG samples, or the whole history reduced to
+        ``max_points`` with ``mode="minmax"``/``"lttb"`` (see ``fbg.downsample``)."""
         if self._fbg_reader is None or not self._fbg_reader.is_ready:
             return np.array([]), np.array([])
 
         use_max = max_points if max_points and max_points > 0 else None
-        timestamps, series = self._fbg_reader.snapshot(max_points=use_max)
+        timestamps, series = self._fbg_reader.snapshot(max_points=use_max, mode=mode)
         if timestamps.size == 0:
             return np.array([]), np.array([])
 
@@ -1574,6 +1597,41 @@ class ExperimentController:
 
         return timestamps, fbg1
 
+    def get_fbg_window(
+        self,
+        t_start: float,
+        t_end: float,
+        wait_timeout_s: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Every FBG1 sample taken between host ``perf_counter`` times ``t_start`` and ``t_end``.
+
+        Both bounds are mapped to device time, so samples still in flight
+        when the window closed are attributed to their acquisition time.
+        Waits up to ``wait_timeout_s`` for the reader's newest sample to
+        reach ``t_end``, so those samples have arrived before the query.
+        """
+        if self._fbg_reader is None or not self._fbg_reader.is_ready:
+            return np.array([]), np.array([])
+
+        reader = self._fbg_reader
+        device_start, device_end = reader.from_host_time(
+            np.array([t_start, t_end]) - reader.start_time
+        ).tolist()
+        wait_deadline = time.perf_counter() + max(0.0, float(wait_timeout_s))
+        while True:
+            latest_t, _ = reader.latest_sample()
+            if latest_t >= device_end or time.perf_counter() >= wait_deadline:
+                break
+            time.sleep(0.005)
+        timestamps, series = reader.query(device_start, device_end)
+        fbg1 = series.get("fbg_1")
+        if fbg1 is None:
+            names = list(self._fbg_reader.sensor_names)
+            fbg1 = series.get(names[0]) if names else None
+        if fbg1 is None:
+            return np.array([]), np.array([])
+        return timestamps, fbg1
+
     def probe_stage_ids(self) -> Dict[int, float]:
         if self._stage_serial is None:
             raise RuntimeError("Stage is not connected")
@@ -2004,7 +2062,8 @@ class ExperimentController:
                 fz_samples: List[float] = []
                 fbg1_samples: List[float] = []
 
-                window_deadline = time.perf_counter() + window_s
+                window_start = time.perf_counter()
+                window_deadline = window_start + window_s
                 capture_deadline = time.perf_counter() + 0.5 * window_s
                 while True:
                     if abort_event.is_set():
@@ -2039,9 +2098,20 @@ class ExperimentController:
                     time.sleep(max(0.01, min(0.05, float(config.move_poll_interval_s))))
 
                 avg_x = float(np.mean(x_samples)) if x_samples else float("nan")
+                # Average every FBG sample of the window, extracted after the
+                # fact, rather than only the polled ones.
+                fbg1_avg = float("nan")
+                _, fbg1_window = self.get_fbg_window(
+                    window_start, window_deadline, wait_timeout_s=self._FBG_WINDOW_WAIT_S
+                )
+                fbg1_window = fbg1_window[np.isfinite(fbg1_window)]
+                if fbg1_window.size:
+                    fbg1_avg = float(np.mean(fbg1_window))
+                if not np.isfinite(fbg1_avg) and fbg1_samples:
+                    fbg1_avg = float(np.mean(fbg1_samples))
                 avg_snapshot = {
                     "force_z_n": float(np.mean(fz_samples)) if fz_samples else float("nan"),
-                    "fbg1_nm": float(np.mean(fbg1_samples)) if fbg1_samples else float("nan"),
+                    "fbg1_nm": fbg1_avg,
                 }
                 last_avg_x = avg_x
                 last_snapshot = avg_snapshot
@@ -2282,10 +2352,15 @@ class ExperimentPanel(QtWidgets.QMainWindow):
         self.trial_done_signal.connect(self._on_trial_done)
         self.rezero_done_signal.connect(self._on_rezero_done)
 
+        self._live_refresh_timer = REGISTRY.timer("panel.live_refresh_s")
         self._live_timer = QtCore.QTimer(self)
-        self._live_timer.timeout.connect(self._refresh_live_snapshot)
+        self._live_timer.timeout.connect(self._on_live_timer)
         self._live_timer.start(50)
 
+        self._metrics_timer = QtCore.QTimer(self)
+        self._metrics_timer.timeout.connect(self._refresh_metrics)
+        self._metrics_timer.start(1000)
+
     def _build_ui(self, initial_stage_port: str, initial_whisker_name: str) -> None:
         central = QtWidgets.QWidget()
         self.setCentralWidget(central)
@@ -2383,6 +2458,10 @@ class ExperimentPanel(QtWidgets.QMainWindow):
         self.y_label = QtWidgets.QLabel("nan")
         self.z_label = QtWidgets.QLabel("nan")
         self.fbg1_label = QtWidgets.QLabel("nan")
+        self.fbg_stream_label = QtWidgets.QLabel("n/a")
+        self.fbg_stream_label.setToolTip(
+            "Frames received in the last complete second, and frames lost (acquisition-counter gaps) since connect."
+        )
         self.status_label = QtWidgets.QLabel("Disconnected")
         self.last_result_label = QtWidgets.QLabel("No trials yet.")
         self.last_result_label.setWordWrap(True)
@@ -2403,12 +2482,26 @@ class ExperimentPanel(QtWidgets.QMainWindow):
         live_layout.addWidget(self.z_label, 1, 5)
         live_layout.addWidget(QtWidgets.QLabel("FBG1 (nm)"), 2, 0)
         live_layout.addWidget(self.fbg1_label, 2, 1)
+        live_layout.addWidget(QtWidgets.QLabel("FBG Stream"), 2, 2)
+        live_layout.addWidget(self.fbg_stream_label, 2, 3, 1, 3)
         live_layout.addWidget(QtWidgets.QLabel("Status"), 3, 0)
         live_layout.addWidget(self.status_label, 3, 1, 1, 5)
         live_layout.addWidget(QtWidgets.QLabel("Last Trial"), 4, 0)
         live_layout.addWidget(self.last_result_label, 4, 1, 1, 5)
         layout.addWidget(live_group)
 
+        metrics_group = QtWidgets.QGroupBox("Acquisition Metrics")
+        metrics_layout = QtWidgets.QVBoxLayout(metrics_group)
+        self.metrics_text = QtWidgets.QPlainTextEdit()
+        self.metrics_text.setReadOnly(True)
+        self.metrics_text.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.metrics_text.setMaximumHeight(140)
+        self.metrics_text.setToolTip(
+            "Shared acquisition metrics: counters, rates, loop/lock-wait latency and sample age per device."
+        )
+        metrics_layout.addWidget(self.metrics_text)
+        layout.addWidget(metrics_group)
+
         manual_group = QtWidgets.QGroupBox("Manual XYZ Move")
         manual_layout = QtWidgets.QGridLayout(manual_group)
         xy_max_mm = 101.6
@@ -3088,18 +3181,21 @@ class ExperimentPanel(QtWidgets.QMainWindow):
         if not self._fbg_plot_enabled or self.fbg1_curve is None or self.fbg1_plot is None:
             return
 
-        if not self._fbg_plot_times:
-            return
-
-        ts = np.fromiter(self._fbg_plot_times, dtype=np.float64)
-        fbg1 = np.fromiter(self._fbg_plot_values, dtype=np.float64)
-        if ts.size == 0 or fbg1.size == 0:
-            return
+        # Min/max-reduced reader history keeps spikes between polled samples;
+        # the polled samples are the fallback when no stream reader is running.
+        ts, fbg1 = self.controller.get_fbg_history(max_points=self._fbg_plot_max_points, mode="minmax")
+        if ts.size == 0:
+            if not self._fbg_plot_times:
+                return
+            ts = np.fromiter(self._fbg_plot_times, dtype=np.float64)
+            fbg1 = np.fromiter(self._fbg_plot_values, dtype=np.float64)
+            if ts.size == 0 or fbg1.size == 0:
+                return
 
-        if ts.size > self._fbg_plot_max_points:
-            step = max(1, int(np.ceil(ts.size / float(self._fbg_plot_max_points))))
-            ts = ts[::step]
-            fbg1 = fbg1[::step]
+            if ts.size > self._fbg_plot_max_points:
+                step = max(1, int(np.ceil(ts.size / float(self._fbg_plot_max_points))))
+                ts = ts[::step]
+                fbg1 = fbg1[::step]
 
         ts_rel = ts - float(ts[-1])
         self.fbg1_curve.setData(ts_rel, fbg1)
@@ -3154,6 +3250,16 @@ class ExperimentPanel(QtWidgets.QMainWindow):
             f"{int(result['samples'])} samples)"
         )
 
+    def _on_live_timer(self) -> None:
+        with self._live_refresh_timer:
+            self._refresh_live_snapshot()
+
+    def _refresh_metrics(self) -> None:
+        scroll = self.metrics_text.verticalScrollBar()
+        position = scroll.value()
+        self.metrics_text.setPlainText(format_metrics(REGISTRY.snapshot()))
+        scroll.setValue(position)
+
     def _refresh_live_snapshot(self) -> None:
         if not self.controller.is_connected:
             return
@@ -3184,6 +3290,13 @@ class ExperimentPanel(QtWidgets.QMainWindow):
                 self._append_fbg_plot_sample(fbg1_nm, fbg_sample_t if np.isfinite(fbg_sample_t) else None)
                 if np.isfinite(fbg_sample_t):
                     self._last_fbg_sample_time = fbg_sample_t
+        fbg_metrics = self.controller.fbg_metrics()
+        if fbg_metrics:
+            self.fbg_stream_label.setText(
+                f"{fbg_metrics['last_second_received']:.0f} Hz, "
+                f"lost {fbg_metrics['frames_lost']:.0f} ({100.0 * fbg_metrics['loss_ratio']:.3f}%), "
+                f"gaps {fbg_metrics['gap_count']:.0f}"
+            )
         x_value = snapshot.get("x_mm", float("nan"))
         if np.isfinite(x_value):
             self.x_label.setText(f"{x_value:.4f}")
@@ -3405,39 +3518,28 @@ def main() -> int:
         print(f"bota_driver import failed: {BOTA_IMPORT_ERROR}", file=sys.stderr)
         return 1
 
-    fbg_cfg = load_config(args.fbg_config).interrogator if args.fbg_config else DEFAULT_CONFIG.interrogator
-    if len(fbg_cfg.sensors) > 1:
-        # Force panel to use only FBG1 from configuration.
-        fbg_cfg = InterrogatorSettings(
-            ip_address=fbg_cfg.ip_address,
-            port=fbg_cfg.port,
-            data_interleave=fbg_cfg.data_interleave,
-            num_averages=fbg_cfg.num_averages,
-            ch_gains=list(fbg_cfg.ch_gains),
-            ch_noise_thresholds=list(fbg_cfg.ch_noise_thresholds),
-            sensors=[fbg_cfg.sensors[0]],
-        )
+    fbg_cfgs = (load_config(args.fbg_config) if args.fbg_config else DEFAULT_CONFIG).interrogator_list()
+    if len(fbg_cfgs[0].sensors) > 1:
+        # Force panel to use only FBG1 from the primary interrogator; any
+        # further interrogators keep their configured sensors.
+        fbg_cfgs[0] = replace(fbg_cfgs[0], sensors=[fbg_cfgs[0].sensors[0]])
 
     fbg_interleave = max(1, int(args.fbg_data_interleave))
     fbg_num_averages = max(1, int(args.fbg_num_averages))
-    if (
-        fbg_cfg.data_interleave != fbg_interleave
-        or fbg_cfg.num_averages != fbg_num_averages
-    ):
-        fbg_cfg = InterrogatorSettings(
-            ip_address=fbg_cfg.ip_address,
-            port=fbg_cfg.port,
+    fbg_cfgs = [
+        replace(
+            fbg_cfg,
             data_interleave=fbg_interleave,
             num_averages=fbg_num_averages,
-            ch_gains=list(fbg_cfg.ch_gains),
-            ch_noise_thresholds=list(fbg_cfg.ch_noise_thresholds),
-            sensors=list(fbg_cfg.sensors),
         )
+        for fbg_cfg in fbg_cfgs
+    ]
     print(
         "[ExperimentPanel] FBG settings: "
-        f"sensors={len(fbg_cfg.sensors)}, "
-        f"data_interleave={fbg_cfg.data_interleave}, "
-        f"num_averages={fbg_cfg.num_averages}"
+        f"interrogators={len(fbg_cfgs)}, "
+        f"sensors={sum(len(fbg_cfg.sensors) for fbg_cfg in fbg_cfgs)}, "
+        f"data_interleave={fbg_interleave}, "
+        f"num_averages={fbg_num_averages}"
     )
     print(f"[ExperimentPanel] Bota enabled: {enable_bota}")
     print(
@@ -3466,7 +3568,7 @@ def main() -> int:
         output_dir=args.output_dir,
         bota_config_path=args.bota_config,
         bota_interface_override=args.bota_interface,
-        fbg_interrogator_cfg=fbg_cfg,
+        fbg_interrogator_cfgs=fbg_cfgs,
         stage_module_id=args.stage_id,
         y_stage_module_id=args.y_stage_id,
         z_stage_module_id=args.z_stage_id,
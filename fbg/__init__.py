@@ -1,6 +1,9 @@
-"""Utilities for working with the Micron Optics sm130 interrogator."""
+"""Utilities for working with the Micron Optics sm130 interrogator.
+
+:func:`run_live_plot` is imported on first use, so console tools importing
+e.g. :mod:`fbg.metrics` or :mod:`fbg.streaming` do not load Qt.
+"""
 
-from .app import run_live_plot
 from .config import (
     FBGConfig,
     InterrogatorSettings,
@@ -19,3 +22,11 @@ __all__ = [
     "load_config",
     "run_live_plot",
 ]
+
+
+def __getattr__(name: str):
+    if name == "run_live_plot":
+        from .app import run_live_plot
+
+        return run_live_plot
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,258 @@
+"""Asyncio client for the sm130 interrogator.
+
+:class:`AsyncInterrogator` speaks the same protocol as
+:class:`~fbg.interrogator.Interrogator` without a dedicated OS thread, so
+several interrogators and their control commands can share one event loop::
+
+    async with AsyncInterrogator("10.0.0.126", n_sensors=2) as interrogator:
+        await interrogator.configure(data_interleave=1)
+        await interrogator.start_streaming()
+        async for batch in interrogator.stream():
+            ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Sequence
+
+from .interrogator import Interrogator, _pending_settings, _record_settings, _setting_key
+from .protocol import LENGTH_PREFIX_SIZE, FrameBatch, FrameReader, decode_frames, is_data_frame
+
+
+def _format_command(command: str) -> bytes:
+    return ("#" + command.strip().lstrip("#") + "\n").encode("ascii")
+
+
+class _FrameProtocol(asyncio.BufferedProtocol):
+    """Feeds socket data straight into a :class:`FrameReader` buffer.
+
+    Frames are either handed to waiting command futures in request order or,
+    on the streaming connection, left buffered for :meth:`take_frames`. Reading
+    is paused while the buffer cannot take another maximum-size frame, so a
+    slow consumer back-pressures the device through TCP.
+    """
+
+    def __init__(self, route_to_waiters: bool) -> None:
+        self.reader = FrameReader(None)
+        self.route_to_waiters = route_to_waiters
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.unsolicited = 0
+        self.transport: asyncio.Transport | None = None
+        self.closed: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._data_ready = asyncio.Event()
+        self._paused = False
+        self._low_water = LENGTH_PREFIX_SIZE + self.reader.max_frame_size
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.reader.writable_view()
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.reader.commit(nbytes)
+        while self.waiters or self.route_to_waiters:
+            frame = self.reader.next_frame()
+            if frame is None:
+                break
+            if not self.waiters:
+                self.unsolicited += 1
+                continue
+            # A cancelled command still owns its response; drop it in order.
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(bytes(frame))
+        if not self.route_to_waiters:
+            self._data_ready.set()
+        if self.reader.free_bytes < self._low_water and self.transport is not None:
+            self.transport.pause_reading()
+            self._paused = True
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        error = exc or ConnectionError("Interrogator closed the connection.")
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+        if not self.closed.done():
+            self.closed.set_result(None)
+        self._data_ready.set()
+
+    def expect_response(self) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        return waiter
+
+    async def take_frames(self, max_frames: int) -> List[memoryview]:
+        """Wait for at least one frame and return up to ``max_frames``.
+
+        The views alias the reader buffer; decode them before awaiting again.
+        """
+        while True:
+            frames: List[memoryview] = []
+            while len(frames) < max_frames:
+                frame = self.reader.next_frame()
+                if frame is None:
+                    break
+                frames.append(frame)
+            if self._paused and self.reader.free_bytes >= self._low_water:
+                self._paused = False
+                assert self.transport is not None
+                self.transport.resume_reading()
+            if frames:
+                return frames
+            if self.closed.done():
+                raise ConnectionError("Interrogator closed the connection.")
+            self._data_ready.clear()
+            await self._data_ready.wait()
+
+
+class AsyncInterrogator(object):
+    """Coroutine-based counterpart of :class:`~fbg.interrogator.Interrogator`.
+
+    Commands may be issued concurrently from several tasks: each write is
+    paired with a future that is resolved by the next response, in order, so
+    pipelining falls out naturally. ``settings_cache`` has the same meaning
+    as for the blocking client.
+    """
+
+    def __init__(
+        self,
+        ip_address: str = "10.0.0.126",
+        port: int = 1852,
+        n_sensors: int = 0,
+        settings_cache: Dict[str, str] | None = None,
+    ) -> None:
+        self.ip_address = ip_address
+        self.port = port
+        self.n_sensors = int(n_sensors)
+        self.max_sample_rate = 2000
+        self.sample_rate = self.max_sample_rate
+        self.applied_settings = {} if settings_cache is None else settings_cache
+        self.latest_response = b""
+        self._command: _FrameProtocol | None = None
+        self._stream: _FrameProtocol | None = None
+
+    async def __aenter__(self) -> "AsyncInterrogator":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.disconnect()
+
+    async def connect(self) -> None:
+        self._command = await self._open(route_to_waiters=True)
+
+    async def disconnect(self) -> None:
+        for protocol in (self._stream, self._command):
+            if protocol is not None and protocol.transport is not None:
+                protocol.transport.close()
+                await protocol.closed
+        self._stream = None
+        self._command = None
+
+    async def command(self, command: str) -> bytes:
+        """Send one command and return its response payload."""
+        return (await self.commands([command]))[0]
+
+    async def commands(self, commands: Sequence[str]) -> List[bytes]:
+        """Send ``commands`` in one write and gather their responses in order."""
+        protocol = self._require_command()
+        if not commands:
+            return []
+        waiters = [protocol.expect_response() for _ in commands]
+        for command in commands:
+            self.applied_settings.pop(_setting_key(command)[0], None)
+        assert protocol.transport is not None
+        protocol.transport.write(b"".join(_format_command(command) for command in commands))
+        responses = list(await asyncio.gather(*waiters))
+        self.latest_response = responses[-1]
+        return responses
+
+    async def apply_settings(self, commands: Sequence[str], force: bool = False) -> List[str]:
+        """Async :meth:`Interrogator.apply_settings`."""
+        pending = _pending_settings(self.applied_settings, commands, force)
+        responses = await self.commands(pending)
+        _record_settings(self.applied_settings, pending, responses)
+        return pending
+
+    async def configure(
+        self,
+        data_interleave: int = 1,
+        num_averages: int = 1,
+        ch_gains: Sequence[float] = (),
+        ch_noise_thresholds: Sequence[float] = (),
+        trigger_defaults: bool = False,
+        force: bool = False,
+    ) -> List[str]:
+        """Async :meth:`Interrogator.configure`."""
+        commands = Interrogator.configuration_commands(
+            data_interleave, num_averages, ch_gains, ch_noise_thresholds, trigger_defaults)
+        sent = await self.apply_settings(commands, force=force)
+        applied = max(1, int(data_interleave))
+        if any(command.startswith("SET_DATA_INTERLEAVE") for command in sent):
+            try:
+                applied = int(await self.command("GET_DATA_INTERLEAVE"))
+            except ValueError:
+                pass
+        self.sample_rate = self.max_sample_rate / max(1, applied)
+        return sent
+
+    async def get_data(self) -> FrameBatch:
+        """Poll one frame with ``#GET_DATA``."""
+        return decode_frames([await self.command("GET_DATA")], self.n_sensors)
+
+    async def read_buffer(self, max_frames: int = 1000) -> FrameBatch:
+        """Async :meth:`Interrogator.read_buffer` (buffer must be enabled)."""
+        count = min(int(await self.command("GET_BUFFER_COUNT")), int(max_frames))
+        if count <= 0:
+            return FrameBatch.empty(self.n_sensors)
+        return decode_frames(await self.commands(["GET_DATA"] * count), self.n_sensors)
+
+    async def start_streaming(self) -> bytes:
+        """Open the streaming connection and enable streaming on it."""
+        if self._stream is None:
+            self._stream = await self._open(route_to_waiters=True)
+        assert self._stream.transport is not None
+        waiter = self._stream.expect_response()
+        # Only the acknowledgement goes to the waiter; the frames behind it
+        # stay buffered for stream().
+        self._stream.route_to_waiters = False
+        self._stream.transport.write(_format_command("SET_STREAMING_DATA 1"))
+        return await waiter
+
+    async def stream(self, max_frames: int = 256) -> AsyncIterator[FrameBatch]:
+        """Yield batches of streamed frames until the connection closes."""
+        if self._stream is None:
+            raise RuntimeError("Call start_streaming() first.")
+        protocol = self._stream
+        # The acknowledgement has been consumed; only data frames follow.
+        protocol.reader.validate = is_data_frame
+        while True:
+            try:
+                frames = await protocol.take_frames(max_frames)
+            except ConnectionError:
+                return
+            yield decode_frames(frames, self.n_sensors)
+
+    @property
+    def stream_resync_count(self) -> int:
+        return 0 if self._stream is None else self._stream.reader.resync_count
+
+    async def _open(self, route_to_waiters: bool) -> _FrameProtocol:
+        loop = asyncio.get_running_loop()
+        _, protocol = await loop.create_connection(
+            lambda: _FrameProtocol(route_to_waiters), self.ip_address, self.port
+        )
+        return protocol
+
+    def _require_command(self) -> _FrameProtocol:
+        if self._command is None:
+            raise RuntimeError("AsyncInterrogator is not connected.")
+        return self._command
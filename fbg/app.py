@@ -3,12 +3,13 @@ from __future__ import annotations
 import argparse
 import copy
 import sys
+from dataclasses import replace
 from pathlib import Path
 from typing import Optional
 
 from .config import DEFAULT_CONFIG, FBGConfig, load_config
 from .plotting import LivePlotWindow, create_application
-from .streaming import FBGStreamReader
+from .streaming import create_stream_reader
 
 
 def run_live_plot(config: Optional[FBGConfig] = None, wait_ready_timeout: float = 5.0) -> None:
@@ -16,8 +17,8 @@ def run_live_plot(config: Optional[FBGConfig] = None, wait_ready_timeout: float
     cfg = copy.deepcopy(config or DEFAULT_CONFIG)
 
     app = create_application()
-    reader = FBGStreamReader(
-        cfg.interrogator,
+    reader = create_stream_reader(
+        cfg.interrogator_list(),
         history_seconds=cfg.plot.history_seconds,
     )
     reader.start()
@@ -25,7 +26,8 @@ def run_live_plot(config: Optional[FBGConfig] = None, wait_ready_timeout: float
     window = LivePlotWindow(
         reader=reader,
         plot_cfg=cfg.plot,
-        interr_cfg=cfg.interrogator,
+        # One plot row per sensor across all interrogators.
+        interr_cfg=replace(cfg.interrogator, sensors=cfg.all_sensors()),
         recording_cfg=cfg.recording,
     )
     window.show()
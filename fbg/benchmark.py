@@ -0,0 +1,280 @@
+"""Micro-benchmarks for the FBG acquisition path.
+
+Run with ``python -m fbg.benchmark decode`` to compare the legacy
+status-header decoder against the precompiled one used by
+:meth:`Interrogator.get_data` (the legacy one is a frozen copy, see
+:func:`_legacy_decode`), or ``python -m fbg.benchmark stream`` to
+measure end-to-end throughput and latency against the local emulator.
+``python -m fbg.benchmark replay --capture FILE`` pushes a raw capture
+(see :mod:`fbg.capture`) through the framer and decoder as fast as possible,
+so decode changes can be checked against real captured traffic.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import struct
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .capture import RawCaptureReader
+from .emulator import EmulatorSettings, InterrogatorEmulator, encode_frame
+from .interrogator import Interrogator
+from .protocol import StatusHeader
+
+
+def _legacy_decode(response: bytes) -> Dict[str, object]:
+    """Header decode as done by ``get_data()`` before the precompiled decoder.
+
+    Frozen copy of the original implementation, kept only as a fixed
+    baseline for the ``decode`` benchmark. Nothing else uses it; do not
+    update it when the protocol decoders change.
+    """
+    status_header = response[:88]
+    (
+        fs_radix, cur_layer, fw_ver, abcde,
+        fbg_thermistor, knpl, fghij,
+        reserved2, tx_ambient_temp,
+        num_fbg_peaks, num_ffpi_peaks,
+        num_dut1_peaks, num_dut2_peaks,
+        num_dut3_peaks, num_dut4_peaks,
+        acq_counter, qr, reserved7,
+        serial_number,
+        kernel_timestamp_microseconds,
+        kernel_timestamp_seconds,
+        kernel_buffers, kernel_src_buffer,
+        error_and_kernel_rt_loc0,
+        buffer, header_ver, header_length,
+        dut1_gain, dut2_gain,
+        dut3_gain, dut4_gain,
+        dut1_noise_thresh, dut2_noise_thresh,
+        dut3_noise_thresh, dut4_noise_thresh,
+        peak_data_rate_div, hw_clk_div,
+        granularity,
+        reserved4,
+        starting_lambda,
+        ending_lambda,
+    ) = struct.unpack(
+        '<BBBBHBBHHHHHHHHHBBIIIHHIBBHHHHHHHHHHHIIII',
+        status_header,
+    )
+    acq_triggered = bool(abcde & 0x80)
+    calibration_fault = bool(abcde & 0x40)
+    start_of_frame = bool(abcde & 0x20)
+    primary_fan_state = bool(abcde & 0x10)
+    secondary_fan_state = bool(abcde & 0x08)
+    s0_mux_state = bool(abcde & 0x04)
+    s1_mux_state = bool(abcde & 0x02)
+    s2_mux_state = bool(abcde & 0x01)
+    xfer_type = fghij >> 4
+    soa_therm_limit = bool(fghij & 0x08)
+    soa_current_limit = bool(fghij & 0x04)
+    tec_over_temp = bool(fghij & 0x02)
+    tec_under_temp = bool(fghij & 0x01)
+    operating_mode = knpl >> 6
+    triggering_mode = (knpl & 0x30) >> 4
+    sm041_mux_level = (knpl & 0x0c) >> 2
+    sw_position = knpl & 0x03
+    nrz_command = qr >> 5
+    reserved6 = qr & 0x1f
+    error = error_and_kernel_rt_loc0 >> 24
+    kernel_rt_loc0 = error_and_kernel_rt_loc0 & 0xffffff
+    return {"Serial number": serial_number,
+            "FBG thermistor": fbg_thermistor,
+            "FS radix": fs_radix,
+            "Firmware version": fw_ver,
+            "Acquisition triggered": acq_triggered,
+            "Ch_1 # of peaks": num_dut1_peaks,
+            "Ch_2 # of peaks": num_dut2_peaks,
+            "Ch_3 # of peaks": num_dut3_peaks,
+            "Ch_4 # of peaks": num_dut4_peaks,
+            "Calibration fault": calibration_fault,
+            "Start of frame": start_of_frame,
+            "Primary fan state": primary_fan_state,
+            "Secondary fan state": secondary_fan_state,
+            "S0 mux state": s0_mux_state,
+            "Percent buffer": buffer,
+            "Header length": header_length,
+            "Header version": header_ver,
+            "Tx ambient temp": tx_ambient_temp,
+            "SM041 mux level": sm041_mux_level,
+            "HW clock div": hw_clk_div,
+            "Granularity": granularity,
+            "Operating mode": operating_mode,
+            "Starting lambda": starting_lambda,
+            "Ending lambda": ending_lambda,
+            "Kernel timestamp (seconds)": kernel_timestamp_seconds,
+            "Kernel timestamp (microseconds)": kernel_timestamp_microseconds,
+            "Kernel timestamp": datetime.datetime.fromtimestamp(kernel_timestamp_seconds),
+            "Triggering mode": triggering_mode,
+            "Error": error,
+            "Acquisition counter": acq_counter}
+
+
+def _fast_decode(response: bytes) -> StatusHeader:
+    return StatusHeader(response)
+
+
+def _frames_per_second(func: Callable[[bytes], object], frame: bytes, duration: float) -> float:
+    count = 0
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    while True:
+        for _ in range(1000):
+            func(frame)
+        count += 1000
+        if time.perf_counter() >= deadline:
+            break
+    return count / (time.perf_counter() - start)
+
+
+def bench_decode(duration: float = 1.0) -> Dict[str, float]:
+    """Measure status-header decode throughput in frames per second."""
+    frame = encode_frame()
+    results = {
+        "legacy": _frames_per_second(_legacy_decode, frame, duration),
+        "precompiled": _frames_per_second(_fast_decode, frame, duration),
+    }
+    for name, fps in results.items():
+        print(f"[bench decode] {name:>12}: {fps:12,.0f} frames/s")
+    print(f"[bench decode] speed-up: {results['precompiled'] / results['legacy']:.1f}x")
+    return results
+
+
+def bench_stream(
+    duration: float = 5.0,
+    settings: EmulatorSettings | None = None,
+    batch_frames: int = 256,
+) -> Dict[str, float]:
+    """Stream from a local emulator and report throughput and frame latency.
+
+    Latency is measured from each frame's kernel timestamp (its acquisition
+    time on the emulator) to the moment its batch was decoded on the host.
+    """
+    settings = settings or EmulatorSettings()
+    settings.port = 0
+    fbg_props = {
+        f"fbg_{idx + 1}": {"position": idx} for idx in range(len(settings.wavelengths_nm))
+    }
+    latencies: List[np.ndarray] = []
+    frames = 0
+    with InterrogatorEmulator(settings) as emulator:
+        host, port = emulator.address
+        interrogator = Interrogator(host, port, fbg_props)
+        interrogator.connect()
+        interrogator.setup_streaming()
+        try:
+            start = time.perf_counter()
+            deadline = start + duration
+            while time.perf_counter() < deadline:
+                batch = interrogator.get_data_batch(batch_frames)
+                latencies.append(time.time() - batch.kernel_timestamp)
+                frames += len(batch)
+            elapsed = time.perf_counter() - start
+        finally:
+            interrogator.disconnect()
+        resyncs = interrogator.stream_resync_count
+
+    latency_ms = np.concatenate(latencies) * 1000.0 if latencies else np.array([np.nan])
+    results = {
+        "frames_per_second": frames / elapsed,
+        "latency_p50_ms": float(np.percentile(latency_ms, 50)),
+        "latency_p99_ms": float(np.percentile(latency_ms, 99)),
+        "latency_max_ms": float(np.max(latency_ms)),
+        "resyncs": float(resyncs),
+    }
+    print(
+        f"[bench stream] {results['frames_per_second']:,.0f} frames/s "
+        f"(emulated {settings.sample_rate:,.0f} Hz, bursts of {settings.burst_size})"
+    )
+    print(
+        f"[bench stream] latency p50 {results['latency_p50_ms']:.2f} ms, "
+        f"p99 {results['latency_p99_ms']:.2f} ms, max {results['latency_max_ms']:.2f} ms, "
+        f"resyncs {resyncs}"
+    )
+    return results
+
+
+def bench_replay(path, speed: float = 0.0, batch_frames: int = 256, n_sensors: int | None = None) -> Dict[str, float]:
+    """Decode a raw capture through :class:`Interrogator` and report frames/s.
+
+    ``n_sensors`` defaults to the peak count of the first captured frame.
+    """
+    if n_sensors is None:
+        with RawCaptureReader(path) as capture:
+            first = next(capture.records(), None)
+            n_sensors = sum(StatusHeader(first[1]).num_peaks) if first is not None else 0
+    fbg_props = {f"fbg_{idx + 1}": {"position": idx} for idx in range(n_sensors)}
+    interrogator = Interrogator(fbg_props=fbg_props)
+    interrogator.replay(path, speed=speed)
+    frames = 0
+    checksum = 0.0
+    start = time.perf_counter()
+    try:
+        while True:
+            try:
+                batch = interrogator.get_data_batch(batch_frames)
+            except ConnectionError:
+                break
+            frames += len(batch)
+            checksum += float(np.nansum(batch.wavelengths[-1]))
+    finally:
+        elapsed = time.perf_counter() - start
+        interrogator.disconnect()
+    results = {
+        "frames": float(frames),
+        "frames_per_second": frames / elapsed if elapsed > 0 else 0.0,
+        "resyncs": float(interrogator.stream_resync_count),
+    }
+    print(
+        f"[bench replay] {frames:,} frames in {elapsed:.3f} s "
+        f"({results['frames_per_second']:,.0f} frames/s, {n_sensors} sensors, "
+        f"resyncs {interrogator.stream_resync_count}, checksum {checksum:.6f})"
+    )
+    return results
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FBG acquisition micro-benchmarks.")
+    parser.add_argument("benchmark", choices=["decode", "stream", "replay"], help="Benchmark to run.")
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=1.0,
+        help="Seconds to spend on each measured variant.",
+    )
+    parser.add_argument("--rate", type=float, default=2000.0, help="Emulated frame rate in Hz (stream).")
+    parser.add_argument("--burst-size", type=int, default=100, help="Frames per emulated burst (stream).")
+    parser.add_argument("--batch-frames", type=int, default=256, help="Frames drained per batch (stream).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Emulated burst jitter (stream).")
+    parser.add_argument("--drop-prob", type=float, default=0.0, help="Emulated frame drop probability (stream).")
+    parser.add_argument("--garbage-prob", type=float, default=0.0, help="Emulated garbage probability (stream).")
+    parser.add_argument("--capture", type=str, help="Raw capture file to decode (replay).")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed; 0 is unthrottled (replay).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if args.benchmark == "decode":
+        bench_decode(args.duration)
+    elif args.benchmark == "stream":
+        settings = EmulatorSettings(
+            sample_rate=args.rate,
+            burst_size=args.burst_size,
+            jitter_s=args.jitter_ms / 1000.0,
+            drop_probability=args.drop_prob,
+            garbage_probability=args.garbage_prob,
+        )
+        bench_stream(args.duration, settings, batch_frames=args.batch_frames)
+    elif args.benchmark == "replay":
+        if not args.capture:
+            raise SystemExit("replay needs --capture FILE")
+        bench_replay(args.capture, speed=args.speed, batch_frames=args.batch_frames)
+
+
+if __name__ == "__main__":
+    main()
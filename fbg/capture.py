@@ -0,0 +1,224 @@
+"""Raw interrogator frame capture and replay.
+
+A capture is an append-only log of undecoded frames (status header + peaks)
+exactly as they came off the wire, so recordings can be re-decoded later with
+a different peak assignment or timing policy. Layout of ``<name>.fbgraw``::
+
+    b"FBGRAW01" | capture start (float64, Unix time)
+    record*:    payload length (uint32) | host time (float64) | payload
+
+``host time`` is ``perf_counter`` seconds since the capture started. Every
+``index_every`` frames ``<name>.fbgraw.idx`` gets a ``(frame number, byte
+offset, kernel timestamp)`` entry so replays can seek by device time without
+scanning the log.
+
+:class:`ReplaySocket` serves a capture through the socket interface that
+:class:`~fbg.protocol.FrameReader` reads from, so replays go through the same
+framing and decoding path as live traffic.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .protocol import LENGTH_PREFIX_SIZE, StatusHeader
+
+CAPTURE_MAGIC = b"FBGRAW01"
+CAPTURE_SUFFIX = ".fbgraw"
+_FILE_HEADER = struct.Struct("<8sd")
+_RECORD = struct.Struct("<Id")
+_INDEX_ENTRY = struct.Struct("<QQd")
+
+
+def index_path(path: Path) -> Path:
+    return Path(str(path) + ".idx")
+
+
+class RawCaptureWriter(object):
+    """Append raw frames to a new capture log.
+
+    Writes go through a large userspace buffer, so one :meth:`write` per
+    decoded batch costs a ``memcpy`` rather than a syscall.
+    """
+
+    def __init__(self, path: Path, index_every: int = 1024, buffer_size: int = 1 << 20) -> None:
+        self.path = Path(path)
+        self.index_every = max(1, int(index_every))
+        self._file = self.path.open("xb", buffering=buffer_size)
+        self._index = index_path(self.path).open("xb")
+        self._origin = time.perf_counter()
+        self._file.write(_FILE_HEADER.pack(CAPTURE_MAGIC, time.time()))
+        self._offset = _FILE_HEADER.size
+        self.frame_count = 0
+
+    def __enter__(self) -> "RawCaptureWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, frames: Sequence, host_time: float | None = None) -> None:
+        """Append ``frames`` (payload buffers) received at ``perf_counter`` time ``host_time``."""
+        if host_time is None:
+            host_time = time.perf_counter()
+        stamp = host_time - self._origin
+        pack = _RECORD.pack
+        parts: List[bytes] = []
+        for frame in frames:
+            if self.frame_count % self.index_every == 0:
+                kernel_time = StatusHeader(frame).kernel_timestamp
+                self._index.write(_INDEX_ENTRY.pack(self.frame_count, self._offset, kernel_time))
+            size = len(frame)
+            parts.append(pack(size, stamp))
+            parts.append(bytes(frame))
+            self._offset += _RECORD.size + size
+            self.frame_count += 1
+        self._file.write(b"".join(parts))
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+            self._index.close()
+
+
+class RawCaptureReader(object):
+    """Memory-mapped, read-only view of a capture log."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.start_time = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{self.path} is not a raw FBG capture.")
+        self._view = memoryview(self._map)
+        index_file = index_path(self.path)
+        raw_index = index_file.read_bytes() if index_file.exists() else b""
+        usable = len(raw_index) - len(raw_index) % _INDEX_ENTRY.size
+        self.index = np.frombuffer(
+            raw_index[:usable],
+            dtype=np.dtype([("frame", "<u8"), ("offset", "<u8"), ("kernel_time", "<f8")]),
+        )
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "RawCaptureReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def offset_for_time(self, kernel_time: float) -> int:
+        """Byte offset of the last indexed frame stamped at or before ``kernel_time``."""
+        if self.index.shape[0] == 0:
+            return _FILE_HEADER.size
+        pos = bisect_right(self.index["kernel_time"].tolist(), kernel_time) - 1
+        return int(self.index["offset"][max(pos, 0)])
+
+    def records(self, offset: int | None = None) -> Iterator[Tuple[float, memoryview]]:
+        """Yield ``(host_time, payload)`` from ``offset`` to the last complete record."""
+        offset = _FILE_HEADER.size if offset is None else int(offset)
+        view = self._view
+        end = len(view)
+        unpack_from = _RECORD.unpack_from
+        while offset + _RECORD.size <= end:
+            size, host_time = unpack_from(view, offset)
+            start = offset + _RECORD.size
+            if start + size > end:
+                # Torn final record from an interrupted capture.
+                return
+            yield host_time, view[start:start + size]
+            offset = start + size
+
+
+class ReplaySocket(object):
+    """Socket stand-in that streams a capture as length-prefixed frames.
+
+    Frames are released on their original kernel-timestamp schedule divided
+    by ``speed``; ``speed <= 0`` releases them as fast as they are read.
+    ``recv_into`` returns 0 at the end of the capture, which the framer reports
+    as a closed connection, unless ``loop`` restarts it from the beginning.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        speed: float = 1.0,
+        loop: bool = False,
+        start_time: float | None = None,
+    ) -> None:
+        self.capture = RawCaptureReader(path)
+        self.speed = float(speed)
+        self.loop = loop
+        self._start_offset = (
+            self.capture.offset_for_time(start_time) if start_time is not None else None
+        )
+        self._records = self.capture.records(self._start_offset)
+        self._pending = memoryview(b"")
+        self._held: bytes | None = None
+        self._wall_origin: float | None = None
+        self._device_origin = 0.0
+        self.frames_replayed = 0
+
+    def recv_into(self, buffer: memoryview) -> int:
+        written = 0
+        capacity = len(buffer)
+        while written < capacity:
+            if not self._pending:
+                frame = self._next_frame(block=written == 0)
+                if frame is None:
+                    break
+                self._pending = memoryview(b"%0*d" % (LENGTH_PREFIX_SIZE, len(frame)) + frame)
+            take = min(capacity - written, len(self._pending))
+            buffer[written:written + take] = self._pending[:take]
+            self._pending = self._pending[take:]
+            written += take
+        return written
+
+    def settimeout(self, timeout) -> None:
+        pass
+
+    def close(self) -> None:
+        self._held = None
+        self._records.close()
+        self.capture.close()
+
+    def _next_frame(self, block: bool) -> bytes | None:
+        frame = self._held
+        self._held = None
+        while frame is None:
+            try:
+                frame = bytes(next(self._records)[1])
+            except StopIteration:
+                if not self.loop or self.frames_replayed == 0:
+                    return None
+                self._records = self.capture.records(self._start_offset)
+                self._wall_origin = None
+        if self.speed > 0:
+            device_time = StatusHeader(frame).kernel_timestamp
+            now = time.perf_counter()
+            if self._wall_origin is None:
+                self._wall_origin = now
+                self._device_origin = device_time
+            due = self._wall_origin + (device_time - self._device_origin) / self.speed
+            if due > now:
+                if not block:
+                    # Hand back what is already due; keep this one for later.
+                    self._held = frame
+                    return None
+                time.sleep(due - now)
+        self.frames_replayed += 1
+        return frame
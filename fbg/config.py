@@ -49,6 +49,15 @@ class InterrogatorSettings:
     ch_gains: List[float] = field(default_factory=lambda: [1, 1, 1, 1])
     ch_noise_thresholds: List[float] = field(default_factory=lambda: [100, 100, 100, 100])
     sensors: List[SensorSettings] = field(default_factory=list)
+    # "stream" pushes every frame over a dedicated socket; "buffered" lets the
+    # interrogator queue frames and drains them in bulk every poll interval;
+    # "replay" plays back the raw capture at ``replay_path`` instead.
+    acquisition_mode: str = "stream"
+    buffer_poll_interval_s: float = 0.05
+    replay_path: str = ""
+    replay_speed: float = 1.0
+    # Run acquisition in a child process, sharing samples via shared memory.
+    separate_process: bool = False
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "InterrogatorSettings":
@@ -71,6 +80,11 @@ class InterrogatorSettings:
                 data.get("ch_noise_thresholds", data.get("ch_noise_thres", [100, 100, 100, 100]))
             ),
             sensors=sensors,
+            acquisition_mode=data.get("acquisition_mode", "stream"),
+            buffer_poll_interval_s=data.get("buffer_poll_interval_s", 0.05),
+            replay_path=str(data.get("replay_path", "") or ""),
+            replay_speed=data.get("replay_speed", 1.0),
+            separate_process=bool(data.get("separate_process", False)),
         )
 
     def to_fbg_properties(self) -> Dict[str, Dict[str, Any]]:
@@ -100,6 +114,9 @@ class PlotSettings:
     plot_limit: bool = False
     history_seconds: float = 10.0
     update_interval_ms: int = 10
+    # Peak-preserving reduction of line plots to ~2 points per pixel:
+    # "minmax", "lttb", or "" to draw every sample.
+    downsample_mode: str = "minmax"
     high_res: SpectrogramSettings = field(default_factory=lambda: SpectrogramSettings(2048, 25.0, 0.5))
     wide_range: SpectrogramSettings = field(default_factory=lambda: SpectrogramSettings(512, 200.0, 0.25))
 
@@ -120,6 +137,7 @@ class PlotSettings:
             plot_limit=data.get("plot_limit", base.plot_limit),
             history_seconds=data.get("history_seconds", base.history_seconds),
             update_interval_ms=data.get("update_interval_ms", base.update_interval_ms),
+            downsample_mode=data.get("downsample_mode", base.downsample_mode),
             high_res=high_res,
             wide_range=wide_range,
         )
@@ -129,12 +147,18 @@ class PlotSettings:
 class RecordingSettings:
     save_directory: Path = Path("./data")
     file_prefix: str = "whisker"
+    # Also keep the undecoded interrogator frames (see fbg/capture.py).
+    raw_capture: bool = False
+    # Samples are recorded to ``.npy``; also export a CSV copy after stopping.
+    export_csv: bool = True
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "RecordingSettings":
         return cls(
             save_directory=Path(data.get("save_directory", "./data")),
             file_prefix=data.get("file_prefix", data.get("filename_prefix", "whisker")),
+            raw_capture=bool(data.get("raw_capture", False)),
+            export_csv=bool(data.get("export_csv", True)),
         )
 
 
@@ -143,15 +167,34 @@ class FBGConfig:
     interrogator: InterrogatorSettings = field(default_factory=InterrogatorSettings)
     plot: PlotSettings = field(default_factory=PlotSettings)
     recording: RecordingSettings = field(default_factory=RecordingSettings)
+    # Set when the rig uses several interrogators; ``interrogator`` is then
+    # the first entry, whose clock serves as the common time base.
+    interrogators: List[InterrogatorSettings] = field(default_factory=list)
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "FBGConfig":
+        interrogators = [
+            InterrogatorSettings.from_dict(item) for item in data.get("interrogators") or []
+        ]
+        if interrogators:
+            interrogator = interrogators[0]
+        else:
+            interrogator = InterrogatorSettings.from_dict(data.get("interrogator", data))
         return cls(
-            interrogator=InterrogatorSettings.from_dict(data.get("interrogator", data)),
+            interrogator=interrogator,
             plot=PlotSettings.from_dict(data.get("plot", data)),
             recording=RecordingSettings.from_dict(data.get("recording", data)),
+            interrogators=interrogators,
         )
 
+    def interrogator_list(self) -> List[InterrogatorSettings]:
+        """All configured interrogators, primary first."""
+        return list(self.interrogators) or [self.interrogator]
+
+    def all_sensors(self) -> List[SensorSettings]:
+        """Sensors of every interrogator, in reader column order."""
+        return [sensor for interr in self.interrogator_list() for sensor in interr.sensors]
+
 
 DEFAULT_CONFIG = FBGConfig.from_dict(
     {
@@ -162,6 +205,11 @@ DEFAULT_CONFIG = FBGConfig.from_dict(
             "num_averages": 1,
             "ch_gains": [1, 1, 1, 1],
             "ch_noise_thresholds": [100, 100, 100, 100],
+            "acquisition_mode": "stream",
+            "buffer_poll_interval_s": 0.05,
+            "replay_path": "",
+            "replay_speed": 1.0,
+            "separate_process": False,
             "sensors": [
                 {
                     "name": "fbg_1",
@@ -183,12 +231,18 @@ DEFAULT_CONFIG = FBGConfig.from_dict(
             "plot_limit": False,
             "history_seconds": 10.0,
             "update_interval_ms": 10,
+            "downsample_mode": "minmax",
             "spectrogram": {
                 "high_res": {"nperseg": 2048, "max_freq": 25, "noverlap_ratio": 0.5},
                 "wide_range": {"nperseg": 512, "max_freq": 200, "noverlap_ratio": 0.25},
             },
         },
-        "recording": {"save_directory": "./data", "file_prefix": "whisker"},
+        "recording": {
+            "save_directory": "./data",
+            "file_prefix": "whisker",
+            "raw_capture": False,
+            "export_csv": True,
+        },
     }
 )
 
@@ -0,0 +1,115 @@
+"""Acquisition-counter continuity checks for streamed interrogator frames."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+# The status header carries a 16-bit acquisition counter.
+ACQ_COUNTER_MODULUS = 1 << 16
+
+
+class CounterTracker(object):
+    """Detect lost and duplicated frames from the wrapping acquisition counter.
+
+    The nominal counter increment is learned from the first ``learn_frames``
+    deltas (it is larger than one when the device decimates, e.g. with data
+    interleave), unless given explicitly. Deltas of half the counter range or
+    more are treated as a counter reset rather than a loss.
+    """
+
+    def __init__(
+        self,
+        step: int | None = None,
+        learn_frames: int = 32,
+        modulus: int = ACQ_COUNTER_MODULUS,
+    ) -> None:
+        self.modulus = int(modulus)
+        self.step = int(step) if step else None
+        self.learn_frames = int(learn_frames)
+        self._learning: List[int] = []
+        self._last: int | None = None
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.resets = 0
+
+    def reset(self) -> None:
+        """Forget the last counter, e.g. after reconnecting to the device."""
+        self._last = None
+
+    def update(self, counters: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Account for a batch of counters.
+
+        Returns ``(lost, duplicate)``: the number of frames missing right
+        before each frame, and a mask of frames that repeat the previous
+        counter.
+        """
+        counters = np.asarray(counters, dtype=np.int64)
+        count = counters.shape[0]
+        lost = np.zeros(count, dtype=np.int64)
+        duplicate = np.zeros(count, dtype=bool)
+        if count == 0:
+            return lost, duplicate
+
+        self.received += count
+        if self._last is None:
+            deltas = np.diff(counters) % self.modulus
+            offset = 1
+        else:
+            deltas = np.diff(counters, prepend=self._last) % self.modulus
+            offset = 0
+        self._last = int(counters[-1])
+
+        if self.step is None:
+            self._learning.extend(deltas[deltas > 0].tolist())
+            if len(self._learning) < self.learn_frames:
+                return lost, duplicate
+            self.step = max(1, int(np.median(self._learning)))
+            self._learning = []
+
+        duplicate[offset:] = deltas == 0
+        reset = deltas >= self.modulus // 2
+        gap = np.where(reset, 0, deltas // self.step - 1)
+        lost[offset:] = np.maximum(gap, 0)
+
+        self.duplicates += int(np.count_nonzero(duplicate))
+        self.resets += int(np.count_nonzero(reset))
+        self.lost += int(lost.sum())
+        return lost, duplicate
+
+
+class LossHistory(object):
+    """Per-second received/lost/duplicate frame counts over a sliding window."""
+
+    def __init__(self, window_seconds: int = 300) -> None:
+        self._seconds: Deque[List[int]] = deque(maxlen=window_seconds)
+
+    def add(self, timestamps: np.ndarray, lost: np.ndarray, duplicate: np.ndarray) -> None:
+        if timestamps.shape[0] == 0:
+            return
+        seconds = np.floor(timestamps).astype(np.int64)
+        buckets, first = np.unique(seconds, return_index=True)
+        bounds = np.append(first, seconds.shape[0])
+        received = np.diff(bounds)
+        lost_sums = np.add.reduceat(lost, first)
+        dup_sums = np.add.reduceat(duplicate.astype(np.int64), first)
+        for second, rx, lo, dup in zip(buckets.tolist(), received.tolist(), lost_sums.tolist(), dup_sums.tolist()):
+            if self._seconds and self._seconds[-1][0] == second:
+                entry = self._seconds[-1]
+                entry[1] += rx
+                entry[2] += lo
+                entry[3] += dup
+            elif not self._seconds or second > self._seconds[-1][0]:
+                self._seconds.append([second, rx, lo, dup])
+
+    def as_array(self, seconds: int | None = None) -> np.ndarray:
+        """Return rows of ``[second, received, lost, duplicates]``, oldest first."""
+        rows = list(self._seconds)
+        if seconds is not None:
+            rows = rows[-int(seconds):]
+        if not rows:
+            return np.empty((0, 4), dtype=np.int64)
+        return np.asarray(rows, dtype=np.int64)
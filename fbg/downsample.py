@@ -0,0 +1,119 @@
+"""Point-budgeted reduction of sample blocks for plotting.
+
+Both reducers take ``timestamps[n]`` and ``values[n, k]`` and return at most
+``max_points`` rows that share one time axis, so a reduced block drops
+straight into the ``(timestamps, series)`` shape used by the readers. They
+are vectorised over buckets of consecutive samples:
+
+``minmax``
+    Two rows per bucket, at the bucket's first and last timestamps, holding
+    each column's minimum and maximum in the order they occurred. Every
+    spike survives whatever the budget.
+``lttb``
+    Largest-Triangle-Three-Buckets: one existing sample per bucket, chosen
+    to maximise the triangle it forms with its neighbours. Columns are
+    scaled to their range and share the selection. The left vertex is the
+    previous bucket's mean rather than the previously chosen point, which
+    lets all buckets be evaluated at once.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+DOWNSAMPLE_MODES = ("minmax", "lttb")
+
+
+def downsample(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    max_points: int,
+    mode: str = "minmax",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce ``(timestamps, values[n, k])`` to at most ``max_points`` rows."""
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"Unsupported downsampling mode: {mode!r}")
+    if max_points <= 0 or timestamps.shape[0] <= max_points:
+        return timestamps, values
+    if mode == "minmax":
+        return minmax(timestamps, values, max_points)
+    return lttb(timestamps, values, max_points)
+
+
+def _bucketed(array: np.ndarray, buckets: int) -> np.ndarray:
+    """``array[..., n]`` NaN-padded and reshaped to ``[..., buckets, size]``."""
+    n = array.shape[-1]
+    size = -(-n // buckets)
+    if buckets * size != n:
+        padded = np.full(array.shape[:-1] + (buckets * size,), np.nan)
+        padded[..., :n] = array
+        array = padded
+    return array.reshape(array.shape[:-1] + (buckets, size))
+
+
+def _bucket_count(n: int, buckets: int) -> int:
+    """Largest count <= ``buckets`` that leaves no bucket empty after padding."""
+    return -(-n // -(-n // max(1, buckets)))
+
+
+def minmax(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    buckets = _bucket_count(timestamps.shape[0], max_points // 2)
+    times = _bucketed(timestamps, buckets)
+    # Columns first, so each bucket is a contiguous run.
+    data = _bucketed(np.ascontiguousarray(values.T, dtype=np.float64), buckets)
+    if np.isnan(data).any():
+        # All-NaN buckets stay NaN; NaN never wins otherwise.
+        low_idx = np.where(np.isnan(data), np.inf, data).argmin(axis=-1)
+        high_idx = np.where(np.isnan(data), -np.inf, data).argmax(axis=-1)
+    else:
+        low_idx = data.argmin(axis=-1)
+        high_idx = data.argmax(axis=-1)
+    low = np.take_along_axis(data, low_idx[..., None], axis=-1)[..., 0]
+    high = np.take_along_axis(data, high_idx[..., None], axis=-1)[..., 0]
+    low_first = low_idx <= high_idx
+    out = np.empty((2 * buckets, values.shape[1]))
+    out[0::2] = np.where(low_first, low, high).T
+    out[1::2] = np.where(low_first, high, low).T
+    out_times = np.empty(2 * buckets)
+    out_times[0::2] = times[:, 0]
+    out_times[1::2] = np.fmax.reduce(times, axis=1)
+    return out_times, out
+
+
+def lttb(timestamps: np.ndarray, values: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = timestamps.shape[0]
+    if max_points < 3:
+        keep = np.array([0, n - 1][:max(1, max_points)])
+        return timestamps[keep], values[keep]
+    has_nan = np.isnan(values).any()
+    low = np.nanmin(values, axis=0) if has_nan else values.min(axis=0)
+    span = (np.nanmax(values, axis=0) if has_nan else values.max(axis=0)) - low
+    scaled = ((values - low) / np.where(span > 0, span, 1.0)).T
+    if has_nan:
+        # Missing samples count as mid-range rather than poisoning the areas.
+        scaled = np.nan_to_num(scaled, nan=0.5)
+
+    inner = _bucket_count(n - 2, max_points - 2)
+    size = -(-(n - 2) // inner)
+    # Pad by repeating the final sample; padded slots are never chosen.
+    take = np.minimum(np.arange(1, 1 + inner * size), n - 2)
+    times = timestamps[take].reshape(inner, size)
+    data = scaled[:, take].reshape(-1, inner, size)
+    mean_times = times.mean(axis=-1)
+    mean_data = data.mean(axis=-1)
+    left_t = np.concatenate(([timestamps[0]], mean_times[:-1]))
+    left_y = np.concatenate((scaled[:, :1], mean_data[:, :-1]), axis=1)
+    right_t = np.concatenate((mean_times[1:], [timestamps[-1]]))
+    right_y = np.concatenate((mean_data[:, 1:], scaled[:, -1:]), axis=1)
+
+    # Twice the triangle area, summed over columns.
+    area = np.abs(
+        (left_t - right_t)[:, None] * (data - left_y[..., None])
+        - (left_t[:, None] - times) * (right_y - left_y)[..., None]
+    ).sum(axis=0)
+    area.reshape(-1)[n - 2:] = -1.0
+    chosen = area.argmax(axis=1) + np.arange(inner) * size + 1
+    keep = np.concatenate(([0], chosen, [n - 1]))
+    return timestamps[keep], values[keep]
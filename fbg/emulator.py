@@ -0,0 +1,513 @@
+"""Local TCP emulator for the Micron Optics sm130 interrogator.
+
+Speaks the same ``#COMMAND\\n`` / 10-byte length-prefixed protocol as the
+hardware so the acquisition stack can be exercised without the physical
+unit. Streamed frames are delivered in bursts like the real device, and
+jitter, dropped frames and garbage bytes can be injected on demand::
+
+    python -m fbg.emulator --port 1852 --rate 2000 --burst-size 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .protocol import LENGTH_PREFIX_SIZE, PEAK_DTYPE, STATUS_HEADER, STATUS_HEADER_SIZE
+
+# Byte offsets of the per-frame fields inside the status header.
+_ACQ_COUNTER_OFFSET = 24
+_TIMESTAMP_OFFSET = 32
+
+
+def encode_header(
+    acq_counter: int = 0,
+    num_peaks: int = 2,
+    granularity: int = 20000,
+    kernel_timestamp: float | None = None,
+    error: int = 0,
+    serial_number: int = 12345,
+) -> bytes:
+    """Build a well-formed 88-byte status header."""
+    if kernel_timestamp is None:
+        kernel_timestamp = time.time()
+    seconds = int(kernel_timestamp)
+    micros = int(round((kernel_timestamp - seconds) * 1e6)) % 1_000_000
+    return STATUS_HEADER.pack(
+        0, 0, 1, 0x20,  # 0
+        0, 0, 0,  # 1
+        0, 25,  # 2
+        num_peaks, 0,  # 3
+        num_peaks, 0,  # 4
+        0, 0,  # 5
+        acq_counter & 0xFFFF, 0, 0,  # 6
+        serial_number,  # 7
+        micros,  # 8
+        seconds,  # 9
+        0, 0,  # 10
+        (error & 0xFF) << 24,  # 11
+        0, 3, STATUS_HEADER_SIZE,  # 12
+        0, 0,  # 13
+        0, 0,  # 14
+        100, 100,  # 15
+        100, 100,  # 16
+        1, 1,  # 17
+        granularity,  # 18
+        0,  # 19
+        1510 * granularity,  # 20
+        1590 * granularity,  # 21
+    )
+
+
+def encode_frame(
+    acq_counter: int = 0,
+    peaks: List[int] | None = None,
+    granularity: int = 20000,
+    kernel_timestamp: float | None = None,
+    error: int = 0,
+) -> bytes:
+    """Build a status header followed by raw (granularity-scaled) peak values."""
+    peaks = peaks if peaks is not None else [31_000_000, 31_100_000]
+    header = encode_header(acq_counter, len(peaks), granularity, kernel_timestamp, error)
+    return header + struct.pack("<%dI" % len(peaks), *peaks)
+
+
+def frame_response(payload: bytes) -> bytes:
+    """Wrap ``payload`` in the 10-byte ASCII length prefix used on the wire."""
+    return b"%0*d" % (LENGTH_PREFIX_SIZE, len(payload)) + payload
+
+
+@dataclass
+class EmulatorSettings:
+    host: str = "127.0.0.1"
+    port: int = 1852
+    sample_rate: float = 2000.0
+    # Frames are delivered in bursts of ``burst_size`` at the average rate.
+    burst_size: int = 100
+    jitter_s: float = 0.0
+    drop_probability: float = 0.0
+    garbage_probability: float = 0.0
+    garbage_max_bytes: int = 32
+    buffer_capacity: int = 60000
+    wavelengths_nm: List[float] = field(default_factory=lambda: [1550.0, 1555.0])
+    signal_amplitude_nm: float = 0.005
+    signal_frequency_hz: float = 5.0
+    noise_nm: float = 0.0005
+    granularity: int = 20000
+    seed: Optional[int] = None
+
+
+class _FrameGenerator(object):
+    """Vectorised builder for bursts of consecutive streamed frames."""
+
+    def __init__(self, settings: EmulatorSettings, rng: np.random.Generator) -> None:
+        self.settings = settings
+        self.rng = rng
+        self.n_peaks = len(settings.wavelengths_nm)
+        self.frame_size = LENGTH_PREFIX_SIZE + STATUS_HEADER_SIZE + self.n_peaks * PEAK_DTYPE.itemsize
+        self._template = np.frombuffer(
+            frame_response(encode_frame(peaks=[0] * self.n_peaks, granularity=settings.granularity)),
+            dtype=np.uint8,
+        )
+        self._base = np.asarray(settings.wavelengths_nm, dtype=np.float64)
+        self.acq_counter = 0
+
+    def burst(self, times: np.ndarray) -> bytes:
+        """Encode one frame per acquisition time in ``times`` (epoch seconds)."""
+        count = times.shape[0]
+        settings = self.settings
+        frames = np.empty((count, self.frame_size), dtype=np.uint8)
+        frames[:] = self._template
+
+        header = LENGTH_PREFIX_SIZE
+        counters = (self.acq_counter + np.arange(count)) & 0xFFFF
+        self.acq_counter = (self.acq_counter + count) & 0xFFFF
+        frames[:, header + _ACQ_COUNTER_OFFSET:header + _ACQ_COUNTER_OFFSET + 2] = (
+            counters.astype("<u2")[:, np.newaxis].view(np.uint8)
+        )
+        seconds = np.floor(times)
+        stamps = np.column_stack(
+            (np.round((times - seconds) * 1e6) % 1_000_000, seconds)
+        ).astype("<u4")
+        frames[:, header + _TIMESTAMP_OFFSET:header + _TIMESTAMP_OFFSET + 8] = stamps.view(np.uint8)
+
+        phase = 2.0 * np.pi * settings.signal_frequency_hz * times[:, np.newaxis]
+        wavelengths = self._base + settings.signal_amplitude_nm * np.sin(phase)
+        if settings.noise_nm > 0:
+            wavelengths = wavelengths + self.rng.normal(0.0, settings.noise_nm, wavelengths.shape)
+        raw = np.round(wavelengths * settings.granularity).astype(PEAK_DTYPE)
+        frames[:, header + STATUS_HEADER_SIZE:] = raw.view(np.uint8)
+
+        if settings.drop_probability > 0:
+            frames = frames[self.rng.random(count) >= settings.drop_probability]
+        return frames.tobytes()
+
+    def single(self) -> bytes:
+        return self.burst(np.array([time.time()]))[LENGTH_PREFIX_SIZE:]
+
+    def payloads(self, times: np.ndarray) -> List[bytes]:
+        """Encode frames for ``times`` as individual unprefixed payloads."""
+        data = self.burst(times)
+        return [
+            data[start + LENGTH_PREFIX_SIZE:start + self.frame_size]
+            for start in range(0, len(data), self.frame_size)
+        ]
+
+
+class _Connection(object):
+    def __init__(self, emulator: "InterrogatorEmulator", sock: socket.socket) -> None:
+        self.emulator = emulator
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.closed = threading.Event()
+        self.streaming = False
+        self.buffer: deque = deque(maxlen=emulator.settings.buffer_capacity)
+        self.buffer_enabled = False
+        self._buffer_frames: _FrameGenerator | None = None
+        self._buffer_start = 0.0
+        self._buffer_acquired = 0
+
+    def enable_buffer(self, enable: bool) -> None:
+        self.buffer_enabled = enable
+        self.buffer.clear()
+        if enable:
+            self._buffer_frames = _FrameGenerator(self.emulator.settings, self.emulator._rng)
+            self._buffer_start = time.time()
+            self._buffer_acquired = 0
+
+    def fill_buffer(self) -> None:
+        """Acquire every frame that became due since the last call into the buffer."""
+        if not self.buffer_enabled or self._buffer_frames is None:
+            return
+        rate = self.emulator.stream_rate
+        due = int((time.time() - self._buffer_start) * rate)
+        if due <= self._buffer_acquired:
+            return
+        times = self._buffer_start + np.arange(self._buffer_acquired, due) / rate
+        self._buffer_acquired = due
+        self.buffer.extend(self._buffer_frames.payloads(times))
+
+    def send(self, data: bytes) -> None:
+        with self.send_lock:
+            self.sock.sendall(data)
+
+    def respond(self, payload: bytes | str) -> None:
+        if isinstance(payload, str):
+            payload = payload.encode("ascii")
+        self.send(frame_response(payload))
+
+    def close(self) -> None:
+        self.closed.set()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class InterrogatorEmulator(object):
+    """Threaded TCP server emulating an sm130 on a local port.
+
+    ``port=0`` binds an ephemeral port; the bound address is available from
+    :attr:`address` after :meth:`start`.
+    """
+
+    def __init__(self, settings: EmulatorSettings | None = None) -> None:
+        self.settings = settings or EmulatorSettings()
+        self.state: Dict[str, str] = {
+            "OPERATING_MODE": "0",
+            "TRIG_MODE": "0",
+            "TRIG_START_EDGE": "0",
+            "TRIG_STOP_TYPE": "1",
+            "TRIG_STOP_EDGE": "1",
+            "TRIG_NUM_ACQ": "1",
+            "AUTO_RETRIG": "0",
+            "DATA_INTERLEAVE": "1",
+            "DATA_RATE_DIVIDER": "1",
+            "CAPABILITIES": "3",
+        }
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.garbage_bursts = 0
+        self._rng = np.random.default_rng(self.settings.seed)
+        self._random = random.Random(self.settings.seed)
+        self._polled_frames = _FrameGenerator(self.settings, self._rng)
+        self._server: socket.socket | None = None
+        self._connections: List[_Connection] = []
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Callable[[_Connection, List[str]], None]] = {
+            "IDN?": lambda conn, args: conn.respond("Micron Optics sm130 emulator\n"),
+            "GET_SN": lambda conn, args: conn.respond("SM130-EMU\n"),
+            "GET_DATA": self._handle_get_data,
+            "SET_STREAMING_DATA": self._handle_set_streaming,
+            "SET_OPERATING_MODE": self._setter("OPERATING_MODE", "Setting Operating mode to {}.\n"),
+            "SET_TRIG_MODE": self._setter("TRIG_MODE", "Setting triggering mode to {}.\n"),
+            "SET_NUM_AVERAGES": lambda conn, args: conn.respond(
+                "Setting number of averages to {}.\n".format(args[-1] if args else "")
+            ),
+            "FLUSH_BUFFER": self._handle_flush_buffer,
+            "GET_BUFFER_COUNT": self._handle_buffer_count,
+            "SET_BUFFER_ENABLE": self._handle_buffer_enable,
+            "SAVE_SETTINGS": lambda conn, args: conn.respond("Settings Saved.\n"),
+            "WHO?": lambda conn, args: conn.respond(self._peer_list()),
+            "WHOAMI?": lambda conn, args: conn.respond(
+                "{}\n".format(conn.sock.getpeername()[0])
+            ),
+        }
+
+    @property
+    def address(self) -> tuple:
+        if self._server is None:
+            return (self.settings.host, self.settings.port)
+        return self._server.getsockname()
+
+    @property
+    def stream_rate(self) -> float:
+        interleave = max(1, int(self.state.get("DATA_INTERLEAVE", "1")))
+        divider = max(1, int(self.state.get("DATA_RATE_DIVIDER", "1")))
+        return self.settings.sample_rate / (interleave * divider)
+
+    def start(self) -> "InterrogatorEmulator":
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind((self.settings.host, self.settings.port))
+        server.listen(8)
+        self._server = server
+        self._spawn(self._accept_loop)
+        return self
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            conn.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def __enter__(self) -> "InterrogatorEmulator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _spawn(self, target: Callable, *args) -> None:
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept_loop(self) -> None:
+        assert self._server is not None
+        while not self._stop_event.is_set():
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = _Connection(self, sock)
+            with self._lock:
+                self._connections.append(conn)
+            self._spawn(self._command_loop, conn)
+
+    def _command_loop(self, conn: _Connection) -> None:
+        pending = b""
+        try:
+            while not conn.closed.is_set():
+                chunk = conn.sock.recv(4096)
+                if not chunk:
+                    break
+                pending += chunk
+                while b"\n" in pending:
+                    line, pending = pending.split(b"\n", 1)
+                    self._dispatch(conn, line.decode("ascii", errors="replace").strip())
+        except OSError:
+            pass
+        finally:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    def _dispatch(self, conn: _Connection, line: str) -> None:
+        if not line.startswith("#"):
+            conn.respond("Unknown command.\n")
+            return
+        parts = line[1:].split()
+        if not parts:
+            conn.respond("Unknown command.\n")
+            return
+        name, args = parts[0].upper(), parts[1:]
+        handler = self._handlers.get(name)
+        if handler is not None:
+            handler(conn, args)
+        elif name.startswith("SET_"):
+            key = name[len("SET_"):]
+            self.state[" ".join([key] + args[:-1])] = args[-1] if args else ""
+            conn.respond("Setting {} to {}.\n".format(key.lower(), " ".join(args)))
+        elif name.startswith("GET_"):
+            key = " ".join([name[len("GET_"):]] + args)
+            conn.respond("{}\n".format(self.state.get(key, self.state.get(name[len("GET_"):], "0"))))
+        else:
+            conn.respond("Unknown command.\n")
+
+    def _setter(self, key: str, message: str) -> Callable[[_Connection, List[str]], None]:
+        def handler(conn: _Connection, args: List[str]) -> None:
+            value = args[0] if args else ""
+            self.state[key] = value
+            conn.respond(message.format(value))
+
+        return handler
+
+    def _peer_list(self) -> str:
+        with self._lock:
+            peers = {conn.sock.getpeername()[0] for conn in self._connections if not conn.closed.is_set()}
+        return "".join("{}\n".format(peer) for peer in sorted(peers))
+
+    def _handle_get_data(self, conn: _Connection, args: List[str]) -> None:
+        conn.fill_buffer()
+        if conn.buffer:
+            conn.respond(conn.buffer.popleft())
+        else:
+            conn.respond(self._polled_frames.single())
+
+    def _handle_buffer_enable(self, conn: _Connection, args: List[str]) -> None:
+        enable = bool(args) and args[0] != "0"
+        conn.enable_buffer(enable)
+        conn.respond("Setting buffer enable to {}.\n".format(1 if enable else 0))
+
+    def _handle_buffer_count(self, conn: _Connection, args: List[str]) -> None:
+        conn.fill_buffer()
+        conn.respond("{}\n".format(len(conn.buffer)))
+
+    def _handle_flush_buffer(self, conn: _Connection, args: List[str]) -> None:
+        conn.fill_buffer()
+        conn.buffer.clear()
+        conn.respond("Buffer flushed.\n")
+
+    def _handle_set_streaming(self, conn: _Connection, args: List[str]) -> None:
+        enable = bool(args) and args[0] != "0"
+        if enable and not conn.streaming:
+            conn.streaming = True
+            conn.respond("Streaming data enabled.\n")
+            self._spawn(self._stream_loop, conn)
+        elif not enable:
+            conn.streaming = False
+            conn.respond("Streaming data disabled.\n")
+        else:
+            conn.respond("Streaming data enabled.\n")
+
+    def _stream_loop(self, conn: _Connection) -> None:
+        settings = self.settings
+        generator = _FrameGenerator(settings, self._rng)
+        start = time.time()
+        sent_until = 0
+        next_send = time.perf_counter()
+        while conn.streaming and not conn.closed.is_set() and not self._stop_event.is_set():
+            rate = self.stream_rate
+            burst_period = max(1, settings.burst_size) / rate
+            next_send += burst_period
+            delay = next_send - time.perf_counter()
+            if settings.jitter_s > 0:
+                delay += abs(self._random.gauss(0.0, settings.jitter_s))
+            if delay > 0:
+                time.sleep(delay)
+
+            elapsed = time.time() - start
+            due = int(elapsed * rate)
+            if due <= sent_until:
+                continue
+            times = start + np.arange(sent_until, due) / rate
+            sent_until = due
+            payload = generator.burst(times)
+            sent = len(payload) // generator.frame_size
+            if settings.garbage_probability > 0 and self._random.random() < settings.garbage_probability:
+                # Anywhere in the burst, including inside a frame.
+                split = self._random.randrange(0, len(payload) + 1)
+                garbage = self._garbage(generator.frame_size)
+                payload = payload[:split] + garbage + payload[split:]
+                self.garbage_bursts += 1
+            try:
+                conn.send(payload)
+            except OSError:
+                break
+            self.frames_sent += sent
+            self.frames_dropped += len(times) - sent
+
+
+    def _garbage(self, frame_size: int) -> bytes:
+        """Random bytes, half the time carrying a digit run that parses as a
+        plausible length prefix, so readers must resync from a false frame."""
+        count = self._random.randint(1, max(1, self.settings.garbage_max_bytes))
+        garbage = bytearray(self._random.randrange(256) for _ in range(count))
+        if self._random.random() < 0.5:
+            prefix = b"%0*d" % (LENGTH_PREFIX_SIZE, self._random.randint(1, 2 * frame_size))
+            position = self._random.randrange(0, count + 1)
+            garbage[position:position] = prefix
+        return bytes(garbage)
+
+
+def _parse_args() -> argparse.Namespace:
+    defaults = EmulatorSettings()
+    parser = argparse.ArgumentParser(description="Emulate an sm130 interrogator on a local port.")
+    parser.add_argument("--host", default=defaults.host, help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=defaults.port, help="TCP port to listen on.")
+    parser.add_argument("--rate", type=float, default=defaults.sample_rate, help="Average frame rate in Hz.")
+    parser.add_argument(
+        "--burst-size",
+        type=int,
+        default=defaults.burst_size,
+        help="Frames delivered back-to-back per burst.",
+    )
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Std. dev. of extra burst delay.")
+    parser.add_argument("--drop-prob", type=float, default=0.0, help="Probability a frame is dropped.")
+    parser.add_argument(
+        "--garbage-prob",
+        type=float,
+        default=0.0,
+        help="Probability a burst carries injected garbage bytes.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    settings = EmulatorSettings(
+        host=args.host,
+        port=args.port,
+        sample_rate=args.rate,
+        burst_size=args.burst_size,
+        jitter_s=args.jitter_ms / 1000.0,
+        drop_probability=args.drop_prob,
+        garbage_probability=args.garbage_prob,
+        seed=args.seed,
+    )
+    emulator = InterrogatorEmulator(settings).start()
+    host, port = emulator.address
+    print(f"[Emulator] sm130 emulator listening on {host}:{port} at {settings.sample_rate:.0f} Hz")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
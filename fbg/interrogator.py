@@ -1,29 +1,85 @@
-import datetime
 import json
 import socket
-import struct
 import time
 from typing import Dict, Iterable, Tuple
 
 import numpy as np
 
+from .capture import ReplaySocket
+from .protocol import (
+    SKIP_FRAME_ERROR,
+    FrameBatch,
+    FrameReader,
+    StatusHeader,
+    decode_frames,
+    decode_peaks,
+    is_data_frame,
+)
 from .sensor import Sensor
 
+
+def _setting_key(command):
+    """Split ``"SET_CH_GAIN_DB 1 10"`` into ``("SET_CH_GAIN_DB 1", "10")``."""
+    parts = command.strip().lstrip("#").split()
+    if len(parts) < 2:
+        return " ".join(parts), ""
+    return " ".join(parts[:-1]), parts[-1]
+
+
+def _pending_settings(applied, commands, force=False):
+    """Commands from ``commands`` whose value differs from ``applied``."""
+    if force:
+        return list(commands)
+    return [command for command in commands
+            if applied.get(_setting_key(command)[0]) != _setting_key(command)[1]]
+
+
+def _record_settings(applied, commands, responses):
+    """Cache accepted settings; raise ``ValueError`` listing rejected ones."""
+    rejected = []
+    for command, response in zip(commands, responses):
+        text = response.decode(errors="ignore")
+        if any(word in text.lower() for word in ("error", "invalid", "unknown")):
+            rejected.append("{} -> {}".format(command, text.strip()))
+            continue
+        key, value = _setting_key(command)
+        applied[key] = value
+    if rejected:
+        raise ValueError("Interrogator rejected: " + "; ".join(rejected))
+
+
 class Interrogator(object):
-    def __init__(self, ip_address="10.0.0.126", port=1852, fbg_props=None):
+    def __init__(self, ip_address="10.0.0.126", port=1852, fbg_props=None,
+                 settings_cache=None, timeout=None):
         self.ip_address = ip_address
         self.port = port
+        # Seconds a connect or read may block before raising socket.timeout;
+        # None blocks indefinitely. Applies to the streaming socket too.
+        self.timeout = timeout
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
         self.latest_response = ""
         self.sensors = []
+        self.wavelengths = np.empty(0, dtype=np.float64)
+        self.update_sensors = True
         if fbg_props:
             self.create_sensors(fbg_props)
         self.max_sample_rate = 2000 # 2000 Hz for Micron Optics sm130
         self.sample_rate = self.max_sample_rate
         self.append_data = False
         self.stream_data = False
+        self.stream_reader = None
+        self.command_reader = FrameReader(self.socket)
+        # Optional callable(frames, host_time) handed every raw frame payload
+        # before decoding, e.g. RawCaptureWriter.write.
+        self.frame_sink = None
         self.data = {}
         self.acq_counter = 0
+        self.status_header = None
+        # Last value applied per setting ("SET_CH_GAIN_DB 1" -> "10"). The
+        # settings are device-wide and survive reconnects, so a caller may
+        # share one dict across Interrogator instances.
+        self.applied_settings = {} if settings_cache is None else settings_cache
     
     def connect(self):
         self.socket.connect((self.ip_address, self.port))
@@ -33,10 +89,78 @@ class Interrogator(object):
             command = "#" + command
         if command[-1] != "\n":
             command += "\n"
-        self.socket.send(command.encode("ascii"))
+        self.socket.sendall(command.encode("ascii"))
+        # A setter issued directly may or may not have taken effect; either
+        # way the cached value no longer describes the device.
+        self.applied_settings.pop(_setting_key(command)[0], None)
         if receive:
-            respsize = int(self.socket.recv(10))
-            self.latest_response = self.socket.recv(respsize)
+            self.latest_response = bytes(self.command_reader.read_frame())
+
+    def send_commands(self, commands):
+        """Send several commands back-to-back and collect all responses.
+
+        The commands go out in a single write and the responses are read
+        afterwards, so a batch costs one network round-trip instead of one
+        per command. Returns the responses in command order.
+        """
+        lines = []
+        for command in commands:
+            command = command.strip().lstrip("#")
+            lines.append("#" + command + "\n")
+            self.applied_settings.pop(_setting_key(command)[0], None)
+        if not lines:
+            return []
+        self.socket.sendall("".join(lines).encode("ascii"))
+        responses = [bytes(self.command_reader.read_frame()) for _ in lines]
+        self.latest_response = responses[-1]
+        return responses
+
+    def apply_settings(self, commands, force=False):
+        """Pipeline ``SET_*`` commands, skipping those already in effect.
+
+        A command is skipped when :attr:`applied_settings` records the same
+        value for it, unless ``force`` is set. Raises ``ValueError`` if the
+        device rejects any command; the accepted ones are still cached.
+        Returns the commands that were actually sent.
+        """
+        pending = _pending_settings(self.applied_settings, commands, force)
+        responses = self.send_commands(pending)
+        _record_settings(self.applied_settings, pending, responses)
+        return pending
+
+    def configure(self, data_interleave=1, num_averages=1, ch_gains=(),
+                  ch_noise_thresholds=(), trigger_defaults=False, force=False):
+        """Apply the acquisition settings in one pipelined batch.
+
+        Settings that match :attr:`applied_settings` are not resent, so
+        reconfiguring an unchanged device after a reconnect is nearly free.
+        """
+        commands = self.configuration_commands(
+            data_interleave, num_averages, ch_gains, ch_noise_thresholds, trigger_defaults)
+        sent = self.apply_settings(commands, force=force)
+        applied = max(1, int(data_interleave))
+        if any(command.startswith("SET_DATA_INTERLEAVE") for command in sent):
+            try:
+                applied = int(self.data_interleave)
+            except Exception:
+                pass
+        self.sample_rate = self.max_sample_rate / max(1, applied)
+        print(f"[Interrogator] configured: sent {len(sent)}/{len(commands)} settings, "
+              f"data_interleave={applied}, sample_rate_est={self.sample_rate:.1f} Hz")
+        return sent
+
+    @classmethod
+    def configuration_commands(cls, data_interleave=1, num_averages=1, ch_gains=(),
+                               ch_noise_thresholds=(), trigger_defaults=False):
+        """The ``SET_*`` commands sent by :meth:`configure`."""
+        commands = ["SET_DATA_INTERLEAVE {}".format(max(1, int(data_interleave))),
+                    "SET_NUM_AVERAGES {}".format(num_averages)]
+        commands += ["SET_CH_GAIN_DB {} {}".format(idx, gain)
+                     for idx, gain in enumerate(ch_gains, start=1)]
+        commands += ["SET_CH_NOISE_THRESH {} {}".format(idx, thres)
+                     for idx, thres in enumerate(ch_noise_thresholds, start=1)]
+        commands += cls.trigger_default_commands(trigger_defaults)
+        return commands
 
     @property
     def idn(self):
@@ -191,18 +315,22 @@ class Interrogator(object):
           * Hardware triggered by falling edge
           * Stop after rising edge
           * Automatic retriggering on."""
+        self.apply_settings(self.trigger_default_commands(on))
+
+    @staticmethod
+    def trigger_default_commands(on=True):
+        """Commands behind :meth:`set_trigger_defaults`, for pipelining."""
         if on:
-            self.trig_mode = "hardware"
-            self.trig_start_edge = "falling"
-            self.trig_stop_type = "edge"
-            self.trig_stop_edge = "rising"
-            self.auto_retrig = True
-        else:
-            self.trig_mode = "untriggered"
-            self.trig_start_edge = "rising"
-            self.trig_stop_edge = "falling"
-            self.trig_stop_type = "edge"
-            self.auto_retrig = False
+            return ["SET_TRIG_MODE 3",
+                    "SET_TRIG_START_EDGE 1",
+                    "SET_TRIG_STOP_TYPE 1",
+                    "SET_TRIG_STOP_EDGE 0",
+                    "SET_AUTO_RETRIG 1"]
+        return ["SET_TRIG_MODE 0",
+                "SET_TRIG_START_EDGE 0",
+                "SET_TRIG_STOP_EDGE 1",
+                "SET_TRIG_STOP_TYPE 1",
+                "SET_AUTO_RETRIG 0"]
     
     def set_channel_gain(self, channel_no, gain):
         self.send_command("SET_CH_GAIN_DB {} {}".format(channel_no, gain))
@@ -338,157 +466,97 @@ class Interrogator(object):
             
     def get_data(self):
         if self.stream_data:
-            respsize = self.streaming_socket.recv(10)
-            
-            valid_response = False
-            while valid_response == False:
-                try:
-                    respsize = int(respsize)
-                    valid_response = True
-                except:
-                    new_byte = self.streaming_socket.recv(1)
-                    respsize = respsize[1:] + new_byte
-            response = self.streaming_socket.recv(respsize)
-            if self.stream_iteration < 1:
-                token = self.streaming_socket.recv(0)
-            else:
-                token = response[-8:]
-                response = response[:-8]
-                self.stream_iteration += 1
-                self.streaming_socket.recv(2)
+            response = self.stream_reader.read_frame()
         else:
             self.send_command("GET_DATA")
             response = self.latest_response
-        status_header = response[:88]
-        data = response[88:]
-        # unpack the struct into variables
-        (
-            fs_radix, cur_layer, fw_ver, abcde, #  0 fixed
-            fbg_thermistor, knpl, fghij, # 1 fixed
-            reserved2, tx_ambient_temp, # 2 fixed
-            num_fbg_peaks, num_ffpi_peaks, # 3 fixed
-            num_dut1_peaks, num_dut2_peaks, # 4 fixed
-            num_dut3_peaks, num_dut4_peaks, # 5 fixed
-            acq_counter, qr, reserved7, # 6 fixed
-            serial_number,  # 7
-            kernel_timestamp_microseconds,  # 8
-            kernel_timestamp_seconds,  # 9
-            kernel_buffers, kernel_src_buffer, # 10 fixed
-            error_and_kernel_rt_loc0,  # 11 needs parse
-            buffer, header_ver, header_length, # 12 fixed
-            dut1_gain, dut2_gain, # 13 fixed
-            dut3_gain, dut4_gain, # 14 fixed
-            dut1_noise_thresh, dut2_noise_thresh, # 15 fixed
-            dut3_noise_thresh, dut4_noise_thresh, # 16 fixed
-            peak_data_rate_div, hw_clk_div, # 17 fixed
-            granularity,  # 18
-            reserved4,  # 19
-            starting_lambda,  # 20
-            ending_lambda  # 21
-        ) = struct.unpack(
-            '<'  # big endian
-            'BBBB'  # 0 needs parse
-            'HBB'  # 1 needs parse
-            'HH'  # 2
-            'HH'  # 3
-            'HH'  # 4
-            'HH'  # 5
-            'HBB'  # 6 needs parse
-            'I'  # 7
-            'I'  # 8 
-            'I'  # 9
-            'HH'  # 10
-            'I'  # 11 needs parse
-            'BBH'  # 12
-            'HH'  # 13
-            'HH'  # 14
-            'HH'  # 15
-            'HH'  # 16
-            'HH'  # 17
-            'I'  # 18
-            'I'  # 19
-            'I'  # 20
-            'I',  # 21
-            status_header
-        )
-
-        # 0 parse abcde
-        acq_triggered = bool(abcde & 0x80)
-        calibration_fault = bool(abcde & 0x40)
-        start_of_frame = bool(abcde & 0x20)
-        primary_fan_state = bool(abcde & 0x10)
-        secondary_fan_state = bool(abcde & 0x08)
-        
-        s0_mux_state = bool(abcde & 0x04)
-        s1_mux_state = bool(abcde & 0x02)
-        s2_mux_state = bool(abcde & 0x01)
-        
-        # 1 parse fghij
-        xfer_type = fghij >> 4
-        soa_therm_limit = bool(fghij & 0x08)
-        soa_current_limit = bool(fghij & 0x04)
-        tec_over_temp = bool(fghij & 0x02)
-        tec_under_temp = bool(fghij & 0x01)
-        
-        # 1 parse knpl
-        operating_mode = knpl >> 6
-        triggering_mode = (knpl & 0x30) >> 4
-        sm041_mux_level = (knpl & 0x0c) >> 2
-        sw_position = knpl & 0x03
-        
-        # 6 parse qr
-        nrz_command = qr >> 5
-        reserved6 = qr & 0x1f
-        
-        # 11 parse
-        error = error_and_kernel_rt_loc0 >> 24
-        kernel_rt_loc0 = error_and_kernel_rt_loc0 & 0xffffff
-        
-        self.data_header = {"Serial number": serial_number,
-                            "FBG thermistor": fbg_thermistor,
-                            "FS radix": fs_radix,
-                            "Firmware version": fw_ver,
-                            "Acquisition triggered": acq_triggered,
-                            "Ch_1 # of peaks": num_dut1_peaks,
-                            "Ch_2 # of peaks": num_dut2_peaks,
-                            "Ch_3 # of peaks": num_dut3_peaks,
-                            "Ch_4 # of peaks": num_dut4_peaks,
-                            "Calibration fault": calibration_fault,
-                            "Start of frame": start_of_frame,
-                            "Primary fan state": primary_fan_state,
-                            "Secondary fan state": secondary_fan_state,
-                            "S0 mux state": s0_mux_state,
-                            "Percent buffer": buffer,
-                            "Header length": header_length,
-                            "Header version": header_ver,
-                            "Tx ambient temp": tx_ambient_temp,
-                            "SM041 mux level": sm041_mux_level,
-                            "HW clock div": hw_clk_div,
-                            "Granularity": granularity,
-                            "Operating mode": operating_mode,
-                            "Starting lambda": starting_lambda,
-                            "Ending lambda": ending_lambda,
-                            "Kernel timestamp (seconds)": kernel_timestamp_seconds,
-                            "Kernel timestamp (microseconds)": kernel_timestamp_microseconds,
-                            "Kernel timestamp": datetime.datetime.fromtimestamp(kernel_timestamp_seconds),
-                            "Triggering mode": triggering_mode,
-                            "Error": error,
-                            "Acquisition counter": acq_counter}
-                     
-        self.data_serial_no = serial_number
-        self.kernel_timestamp = float(kernel_timestamp_seconds) \
-                                + float(kernel_timestamp_microseconds)*1e-6
-        
-        for n, sensor in enumerate(self.sensors):
-            try:
-                (sensor.wavelength,) = struct.unpack("<I", data[n*4:(n+1)*4])
-                sensor.wavelength /= granularity
-            except:
-                sensor.wavelength = np.nan
+        if self.frame_sink is not None:
+            self.frame_sink([response], time.perf_counter())
+        header = StatusHeader(response)
+        self.status_header = header
+        self.data_serial_no = header.serial_number
+        self.kernel_timestamp = header.kernel_timestamp
+
+        # All peaks of the frame land in the preallocated array indexed by
+        # sensor order; Sensor objects are only touched when asked to.
+        decode_peaks(response, header.granularity, self.wavelengths)
+        if self.update_sensors:
+            for sensor, wavelength in zip(self.sensors, self.wavelengths.tolist()):
+                sensor.wavelength = wavelength
 
-        if self.append_data and error != 9:
+        if self.append_data and header.error != SKIP_FRAME_ERROR:
             self.do_append_data()
-        self.acq_counter = acq_counter
+        self.acq_counter = header.acq_counter
+
+    def get_data_batch(self, max_frames=256):
+        """Decode every complete frame already received, up to ``max_frames``.
+
+        Blocks until at least one frame is available and returns a
+        :class:`FrameBatch` of contiguous arrays (acquisition counters, kernel
+        timestamps, error codes and ``wavelengths[n, sensors]``). The latest
+        frame's header and peaks are also published like :meth:`get_data`.
+        """
+        if not self.stream_data:
+            self.get_data()
+            header = self.status_header
+            return FrameBatch(
+                acq_counter=np.array([header.acq_counter], dtype=np.int64),
+                kernel_timestamp=np.array([header.kernel_timestamp], dtype=np.float64),
+                error=np.array([header.error], dtype=np.uint8),
+                wavelengths=self.wavelengths[np.newaxis, :].copy(),
+            )
+
+        frames = self.stream_reader.read_frames(max_frames)
+        if self.frame_sink is not None:
+            self.frame_sink(frames, time.perf_counter())
+        batch = decode_frames(frames, len(self.sensors))
+        self._publish_latest(frames[-1], batch)
+        return batch
+
+    def read_buffer(self, max_frames=1000):
+        """Pull up to ``max_frames`` entries from the device's data buffer.
+
+        With the buffer enabled (:meth:`enable_buffer`) the interrogator
+        keeps up to 60,000 entries for this socket and each ``#GET_DATA``
+        pops the oldest one. All ``#GET_DATA`` commands for the pending
+        entries are written in one send and the responses decoded as they
+        stream back, so hundreds of frames cost a single round-trip.
+        """
+        count = min(self.buffer_count, int(max_frames))
+        if count <= 0:
+            return FrameBatch.empty(len(self.sensors))
+        self.socket.sendall(b"#GET_DATA\n" * count)
+        batches = []
+        remaining = count
+        while remaining:
+            frames = self.command_reader.read_frames(remaining)
+            if self.frame_sink is not None:
+                self.frame_sink(frames, time.perf_counter())
+            batches.append(decode_frames(frames, len(self.sensors)))
+            remaining -= len(frames)
+        batch = FrameBatch.concatenate(batches)
+        self._publish_latest(frames[-1], batch)
+        return batch
+
+    def _publish_latest(self, frame, batch):
+        """Expose the newest frame of ``batch`` the same way get_data() does."""
+        header = StatusHeader(frame)
+        self.status_header = header
+        self.data_serial_no = header.serial_number
+        self.kernel_timestamp = header.kernel_timestamp
+        self.acq_counter = header.acq_counter
+        self.wavelengths[:] = batch.wavelengths[-1]
+        if self.update_sensors:
+            for sensor, wavelength in zip(self.sensors, self.wavelengths.tolist()):
+                sensor.wavelength = wavelength
+
+    @property
+    def data_header(self):
+        """Full status header of the latest frame, decoded on first access."""
+        header = getattr(self, "status_header", None)
+        if header is None:
+            return {}
+        return header.fields
             
     def flush_buffer(self, receive=True, verbose=False):
         """
@@ -522,6 +590,7 @@ class Interrogator(object):
 
         if not self.fbg_properties:
             self.sensors = []
+            self.wavelengths = np.empty(0, dtype=np.float64)
             return
 
         entries: Iterable[Tuple[str, Dict]] = []
@@ -552,19 +621,40 @@ class Interrogator(object):
             normalized_props[name] = props
 
         self.fbg_properties = normalized_props
+        self.wavelengths = np.full(len(self.sensors), np.nan, dtype=np.float64)
             
     def setup_streaming(self, verbose=False):
         self.setup_append_data()
         self.streaming_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.streaming_socket.settimeout(self.timeout)
         self.streaming_socket.connect((self.ip_address, self.port))
+        self.stream_reader = FrameReader(self.streaming_socket)
         command = "#SET_STREAMING_DATA 1\n"
-        self.streaming_socket.send(command.encode("ascii"))
-        respsize = int(self.streaming_socket.recv(10))
-        response = self.streaming_socket.recv(respsize)
+        self.streaming_socket.sendall(command.encode("ascii"))
+        response = bytes(self.stream_reader.read_frame())
         if verbose:
             print(response)
+        # Only data frames follow the acknowledgement.
+        self.stream_reader.validate = is_data_frame
         self.stream_data = True
-        self.stream_iteration = 0
+
+    def replay(self, path, speed=1.0, loop=False):
+        """Stream frames from a raw capture instead of the device.
+
+        Frames go through the same framer and decoder as live streaming, at
+        ``speed`` times their original rate (``0`` for as fast as possible).
+        """
+        self.setup_append_data()
+        self.streaming_socket = ReplaySocket(path, speed=speed, loop=loop)
+        self.stream_reader = FrameReader(self.streaming_socket, validate=is_data_frame)
+        self.stream_data = True
+
+    @property
+    def stream_resync_count(self):
+        """Number of times the streaming framer had to skip garbled bytes."""
+        if self.stream_reader is None:
+            return 0
+        return self.stream_reader.resync_count
         
     def disable_streaming(self):
         self.send_command("SET STREAMING DATA 0")
@@ -594,8 +684,8 @@ class Interrogator(object):
         # else:
         #     newtime = self.data["time"][-1] 
         # self.data["time"] = np.array([newtime])
-        for s in self.sensors:
-            self.data[s.name + "_wavelength"] =np.array([ s.wavelength])
+        for idx, s in enumerate(self.sensors):
+            self.data[s.name + "_wavelength"] = self.wavelengths[idx:idx + 1].copy()
                                                                
     def sleep(self):
         time.sleep(1/self.sample_rate/2)
@@ -648,3 +738,4 @@ class Interrogator(object):
 
 if __name__ == "__main__":
     pass
+
@@ -0,0 +1,194 @@
+"""Process-wide registry of acquisition metrics.
+
+Readers publish named counters, gauges, latency histograms and sample
+heartbeats to :data:`REGISTRY` instead of printing diagnostics; displays and
+tuning scripts read them back with :meth:`MetricsRegistry.snapshot`. Names are
+dotted, device first, e.g. ``fbg.10.0.0.126:1852.frames`` or
+``phidget.ch0.dropped``.
+
+Updates take one small lock and never allocate after the first use of a
+name, so publishing from 2 kHz acquisition loops is cheap. Histograms use
+fixed power-of-two buckets from 1 us to ~17 min, so percentiles are
+accurate to within a factor of two and memory stays constant.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from typing import Dict, Iterable, List
+
+# Upper bucket bounds in seconds: 1 us * 2**k.
+_HISTOGRAM_BOUNDS: List[float] = [1e-6 * 2.0 ** k for k in range(31)]
+HISTOGRAM_PERCENTILES = (50.0, 99.0)
+
+
+class Counter(object):
+    """Monotonic count, e.g. frames received or records dropped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(object):
+    """Last reported value, e.g. a sample rate or queue depth."""
+
+    def __init__(self) -> None:
+        self.value = math.nan
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Histogram(object):
+    """Distribution of durations in seconds, e.g. loop time or lock wait."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets = [0] * (len(_HISTOGRAM_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = math.nan
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(_HISTOGRAM_BOUNDS, seconds)
+        with self._lock:
+            self._buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            if not seconds <= self.maximum:
+                self.maximum = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q``-th percentile, capped at the maximum."""
+        with self._lock:
+            buckets = list(self._buckets)
+            count = self.count
+            maximum = self.maximum
+        if count == 0:
+            return math.nan
+        rank = q / 100.0 * count
+        seen = 0
+        for index, n in enumerate(buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(_HISTOGRAM_BOUNDS[min(index, len(_HISTOGRAM_BOUNDS) - 1)], maximum)
+        return maximum
+
+
+class Timer(object):
+    """Context manager observing its duration into a :class:`Histogram`."""
+
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self) -> "Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class MetricsRegistry(object):
+    """Named metrics, created on first use."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._heartbeats: Dict[str, float] = {}
+
+    def counter(self, name: str) -> Counter:
+        return self._get(self._counters, name, Counter)
+
+    def gauge(self, name: str) -> Gauge:
+        return self._get(self._gauges, name, Gauge)
+
+    def histogram(self, name: str) -> Histogram:
+        return self._get(self._histograms, name, Histogram)
+
+    def timer(self, name: str) -> Timer:
+        return Timer(self.histogram(name))
+
+    def heartbeat(self, name: str, at: float | None = None) -> None:
+        """Note that ``name`` just produced a sample (``perf_counter`` time).
+
+        :meth:`snapshot` reports it as ``<name>.age_s``, the sample age.
+        """
+        beat = time.perf_counter() if at is None else float(at)
+        with self._lock:
+            self._heartbeats[name] = beat
+
+    def snapshot(self, prefix: str = "") -> Dict[str, float]:
+        """Flat ``{name: value}`` view of every metric starting with ``prefix``.
+
+        Histograms expand to ``.count``, ``.mean``, ``.p50``, ``.p99`` and
+        ``.max``.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            counters = list(self._counters.items())
+            gauges = list(self._gauges.items())
+            histograms = list(self._histograms.items())
+            heartbeats = list(self._heartbeats.items())
+        values: Dict[str, float] = {}
+        for name, counter in counters:
+            values[name] = counter.value
+        for name, gauge in gauges:
+            values[name] = gauge.value
+        for name, histogram in histograms:
+            values[f"{name}.count"] = float(histogram.count)
+            values[f"{name}.mean"] = histogram.total / histogram.count if histogram.count else math.nan
+            for q in HISTOGRAM_PERCENTILES:
+                values[f"{name}.p{q:g}"] = histogram.percentile(q)
+            values[f"{name}.max"] = histogram.maximum
+        for name, beat in heartbeats:
+            values[f"{name}.age_s"] = now - beat
+        return {name: values[name] for name in sorted(values) if name.startswith(prefix)}
+
+    def publish(self, values: Dict[str, float]) -> None:
+        """Mirror a :meth:`snapshot` taken elsewhere (e.g. a child process) as gauges."""
+        for name, value in values.items():
+            self.gauge(name).set(value)
+
+    def remove(self, prefix: str) -> None:
+        """Forget every metric whose name starts with ``prefix``."""
+        with self._lock:
+            for table in (self._counters, self._gauges, self._histograms, self._heartbeats):
+                for name in [name for name in table if name.startswith(prefix)]:
+                    del table[name]
+
+    def _get(self, table, name: str, factory):
+        metric = table.get(name)
+        if metric is None:
+            with self._lock:
+                metric = table.setdefault(name, factory())
+        return metric
+
+
+def format_metrics(values: Dict[str, float], names: Iterable[str] | None = None) -> str:
+    """One ``name value`` line per metric, for logs and text displays."""
+    lines = []
+    for name in values if names is None else names:
+        value = values.get(name, math.nan)
+        if name.endswith((".mean", ".p50", ".p99", ".max")) and math.isfinite(value):
+            lines.append(f"{name:<48} {value * 1e3:10.3f} ms")
+        else:
+            lines.append(f"{name:<48} {value:10.6g}")
+    return "\n".join(lines)
+
+
+# Shared by every reader in the process.
+REGISTRY = MetricsRegistry()
@@ -1,18 +1,17 @@
 from __future__ import annotations
 
 import sys
+import threading
 from datetime import datetime
 import os
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 os.environ.setdefault("PYQTGRAPH_QT_LIB", "PyQt5")
 import pyqtgraph as pg
-from scipy import signal
 
 from .config import (
     InterrogatorSettings,
@@ -20,11 +19,26 @@ from .config import (
     RecordingSettings,
     SpectrogramSettings,
 )
+from .capture import CAPTURE_SUFFIX
+from .recorder import export_csv
+from .spectrogram import StreamingSpectrogram
 from .streaming import FBGStreamReader
 
+# A streaming spectrogram is rebuilt when the estimated rate drifts this much.
+_SPECTROGRAM_RATE_TOLERANCE = 0.05
+
 
 class LivePlotWindow(QtWidgets.QMainWindow):
-    """Live plotting window with manual recording controls."""
+    """Live plotting window with manual recording controls.
+
+    ``on_recording_finished`` receives the saved path: the CSV copy when
+    ``recording_cfg.export_csv`` is set (called once the background export
+    is done), otherwise, or if the export fails, the ``.npy`` recording;
+    ``None`` when nothing was captured.
+    """
+
+    # (recording path, CSV path or None on failure), from the export thread.
+    _csv_exported = QtCore.pyqtSignal(object, object)
 
     def __init__(
         self,
@@ -54,11 +68,17 @@ class LivePlotWindow(QtWidgets.QMainWindow):
 
         self._init_ui()
         self._init_timer()
+        # Spectrograms are updated from new samples only: one subscription
+        # feeds a StreamingSpectrogram per (sensor, resolution).
+        self._spectrograms: Dict[Tuple[str, str], StreamingSpectrogram] = {}
+        self._spec_subscription = reader.subscribe(from_start=True) if enable_spectrograms else None
 
         QtWidgets.QApplication.instance().aboutToQuit.connect(self._on_app_about_to_quit)
 
         self.is_recording = False
         self.recording_start_time: datetime | None = None
+        self._export_threads: List[threading.Thread] = []
+        self._csv_exported.connect(self._on_csv_exported)
 
     def _init_ui(self) -> None:
         self.setWindowTitle("FBG Live Plot - Press 'R' to record, 'S' to stop & save")
@@ -152,22 +172,34 @@ class LivePlotWindow(QtWidgets.QMainWindow):
         if not self.reader.is_ready:
             return
 
-        timestamps, series = self.reader.snapshot()
+        mode = self.plot_cfg.downsample_mode or None
+        timestamps, series = self.reader.snapshot(
+            max_points=self._line_point_budget() if mode else None, mode=mode
+        )
         if timestamps.size == 0:
             return
 
-        sample_rate = self.reader.sample_rate
-
         for idx, sensor_name in enumerate(self.sensor_names):
             data = series.get(sensor_name)
             if data is None or data.size == 0:
                 continue
             self._line_curves[idx].setData(timestamps, data)
 
-            if not self._enable_spectrograms:
-                continue
+        if not self._enable_spectrograms:
+            return
 
+        # Spectrograms need every sample, not the reduced line data.
+        timestamps, series = self._spec_subscription.read()
+        if timestamps.size == 0:
+            return
+        sample_rate = self.reader.sample_rate
+        for idx, sensor_name in enumerate(self.sensor_names):
+            data = series.get(sensor_name)
+            if data is None or data.size == 0:
+                continue
             self._update_spectrogram(
+                key=(sensor_name, "high_res"),
+                timestamps=timestamps,
                 data=data,
                 image_item=self._spec_high_items[idx],
                 hist_item=self._hist_high[idx],
@@ -175,6 +207,8 @@ class LivePlotWindow(QtWidgets.QMainWindow):
                 sample_rate=sample_rate,
             )
             self._update_spectrogram(
+                key=(sensor_name, "wide_range"),
+                timestamps=timestamps,
                 data=data,
                 image_item=self._spec_wide_items[idx],
                 hist_item=self._hist_wide[idx],
@@ -182,40 +216,39 @@ class LivePlotWindow(QtWidgets.QMainWindow):
                 sample_rate=sample_rate,
             )
 
+    def _line_point_budget(self) -> int:
+        """Two points per horizontal pixel of the widest line plot."""
+        width = max((int(plot.vb.width()) for plot in self._line_plots), default=0)
+        return 2 * (width or self.plot_cfg.window_size[0])
+
     def _update_spectrogram(
         self,
         *,
+        key: Tuple[str, str],
+        timestamps: np.ndarray,
         data: np.ndarray,
         image_item: pg.ImageItem,
         hist_item: pg.HistogramLUTItem,
         config: SpectrogramSettings,
         sample_rate: float,
     ) -> None:
-        nperseg = min(config.nperseg, data.size)
-        if nperseg <= 8 or data.size <= nperseg:
-            return
-
-        noverlap = int(nperseg * config.noverlap_ratio)
-        f_axis, t_axis, sxx = signal.spectrogram(
-            data, fs=sample_rate, nperseg=nperseg, noverlap=noverlap
-        )
-        mask = f_axis <= config.max_freq
-        f_axis = f_axis[mask]
-        sxx = sxx[mask, :]
-
-        sxx_db = 10.0 * np.log10(sxx + 1e-12)
-        if not np.isfinite(sxx_db).any():
+        engine = self._spectrograms.get(key)
+        if engine is None or abs(engine.sample_rate - sample_rate) > _SPECTROGRAM_RATE_TOLERANCE * sample_rate:
+            noverlap = int(config.nperseg * config.noverlap_ratio)
+            engine = StreamingSpectrogram(
+                sample_rate, config.nperseg, noverlap, config.max_freq, self.plot_cfg.history_seconds
+            )
+            self._spectrograms[key] = engine
+        if not engine.extend(timestamps, data):
             return
 
-        image_item.setImage(sxx_db.T, autoLevels=False)
-        hist_item.setLevels(float(np.nanmin(sxx_db)), float(np.nanmax(sxx_db)))
+        image_item.setImage(engine.image(), autoLevels=False)
+        hist_item.setLevels(*engine.levels)
 
+        t0, width, f0, height = engine.extent()
         transform = QtGui.QTransform()
-        if t_axis.size > 0 and f_axis.size > 0:
-            transform.scale(
-                t_axis[-1] / max(1, sxx.shape[1]),
-                f_axis[-1] / max(1, sxx.shape[0]),
-            )
+        transform.translate(t0, f0)
+        transform.scale(width, height)
         image_item.setTransform(transform)
 
     def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:
@@ -229,9 +262,16 @@ class LivePlotWindow(QtWidgets.QMainWindow):
     def _start_recording(self) -> None:
         if self.is_recording:
             return
-        self.reader.start_recording()
-        self.is_recording = True
         self.recording_start_time = datetime.now()
+        save_dir = self.recording_cfg.save_directory
+        save_dir.mkdir(parents=True, exist_ok=True)
+        stamp = self.recording_start_time.strftime("%Y%m%d-%H%M%S")
+        self.reader.start_recording(save_dir / f"{self.recording_cfg.file_prefix}_{stamp}.npy")
+        self.is_recording = True
+        if self.recording_cfg.raw_capture:
+            self.reader.start_raw_capture(
+                save_dir / f"{self.recording_cfg.file_prefix}_{stamp}{CAPTURE_SUFFIX}"
+            )
         timestamp = self.recording_start_time.strftime("%Y-%m-%d %H:%M:%S")
         self.setWindowTitle(
             f"FBG Live Plot - RECORDING since {timestamp} - Press 'S' to stop & save"
@@ -244,34 +284,57 @@ class LivePlotWindow(QtWidgets.QMainWindow):
         if not self.is_recording:
             return
 
-        rows = self.reader.stop_recording()
+        saved_path = self.reader.stop_recording()
+        if self.recording_cfg.raw_capture:
+            raw_path = self.reader.stop_raw_capture()
+            if raw_path is not None:
+                print(f"[FBG] Raw frames captured to {raw_path}")
         self.is_recording = False
         self.setWindowTitle("FBG Live Plot - Press 'R' to record, 'S' to stop & save")
 
-        saved_path: Optional[Path] = None
-        if not rows:
+        if saved_path is None:
             print("[FBG] No samples captured during recording.")
         else:
-            save_dir = self.recording_cfg.save_directory
-            save_dir.mkdir(parents=True, exist_ok=True)
-
-            timestamp = (self.recording_start_time or datetime.now()).strftime("%Y%m%d-%H%M%S")
-            columns = ["time_seconds"] + self.sensor_names
-            df = pd.DataFrame(rows, columns=columns)
-            filename = f"{self.recording_cfg.file_prefix}_{timestamp}.csv"
-            saved_path = save_dir / filename
-            df.to_csv(saved_path, index=False)
-            print(f"[FBG] Saved {len(df)} samples to {saved_path}")
+            print(f"[FBG] Saved recording to {saved_path}")
+            if self.recording_cfg.export_csv:
+                # Large recordings take a while to format; keep the GUI
+                # responsive and report once the CSV exists.
+                thread = threading.Thread(target=self._export_csv, args=(saved_path,))
+                self._export_threads = [t for t in self._export_threads if t.is_alive()] + [thread]
+                thread.start()
+                return
 
         if self._on_recording_finished:
             self._on_recording_finished(self, saved_path)
 
+    def _export_csv(self, path: Path) -> None:
+        csv_path: Optional[Path] = None
+        try:
+            csv_path = export_csv(path, path.with_suffix(".csv"))
+        except Exception as exc:
+            print(f"[FBG] CSV export of {path} failed: {type(exc).__name__}: {exc}")
+        else:
+            print(f"[FBG] Exported {csv_path}")
+        self._csv_exported.emit(path, csv_path)
+
+    def _on_csv_exported(self, path: Path, csv_path: Optional[Path]) -> None:
+        if self._on_recording_finished:
+            self._on_recording_finished(self, csv_path or path)
+
+    def _finish_exports(self) -> None:
+        """Wait for running CSV exports so closing never leaves a partial file."""
+        for thread in self._export_threads:
+            thread.join()
+        self._export_threads = []
+
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         self.reader.stop()
+        self._finish_exports()
         super().closeEvent(event)
 
     def _on_app_about_to_quit(self) -> None:
         self.reader.stop()
+        self._finish_exports()
 
     def stop_recording(self) -> None:
         """Programmatically stop recording and finalize the dataset."""
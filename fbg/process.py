@@ -0,0 +1,286 @@
+"""FBG acquisition in a separate process.
+
+:class:`ProcessStreamReader` keeps the :class:`~fbg.streaming.FBGStreamReader`
+interface, but the interrogator connection, decoding, continuity tracking and
+recording all run in a child process. The child writes samples into a
+:class:`~fbg.ringbuffer.SharedRingBuffer`, so 2 kHz capture no longer
+competes for the GIL with Qt, spectrograms or other device loops, while
+:meth:`snapshot`, :meth:`latest_sample` and :meth:`subscribe` stay plain
+memory reads in the calling process.
+
+Everything else goes through two pipes:
+
+- the child pushes a status message (readiness, errors, rate, clock
+  mapping, sensor calibration, metrics and its
+  :data:`~fbg.metrics.REGISTRY` entries) every ``STATUS_INTERVAL_S``;
+- recording, raw capture, gap, time-range query, recording-snapshot,
+  decimated history and rolling statistics calls are forwarded to the child
+  and answered in order.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .config import InterrogatorSettings
+from .metrics import REGISTRY
+from .ringbuffer import RingBuffer, SharedRingBuffer
+from .rolling import RollingSummary
+from .streaming import FBGStreamReader
+
+# Child processes start fresh rather than forking a process that runs Qt.
+_CONTEXT = multiprocessing.get_context("spawn")
+STATUS_INTERVAL_S = 0.1
+# Shared history is sized once, for the sm130's highest sample rate.
+_MAX_SAMPLE_RATE = 2000.0
+
+
+class _ChildStreamReader(FBGStreamReader):
+    """Acquisition thread of the child process, writing into the shared ring."""
+
+    def __init__(
+        self,
+        interr_cfg: InterrogatorSettings,
+        history_seconds: float,
+        batch_frames: int,
+        ring: SharedRingBuffer,
+        lock,
+        data_ready,
+    ) -> None:
+        super().__init__(interr_cfg, history_seconds, batch_frames)
+        self._lock = lock
+        self._data_ready = data_ready
+        self._ring = ring
+
+    def _new_ring(self, capacity: int) -> RingBuffer:
+        # Reuse the shared segment; clearing keeps the absolute write
+        # position, so subscriptions in the parent stay valid.
+        if len(self.sensor_names) + 1 != self._ring.columns:
+            raise ValueError("Sensor layout changed after the shared history was sized.")
+        self._ring.clear()
+        return self._ring
+
+
+def _status_of(reader: FBGStreamReader) -> Dict[str, Any]:
+    return {
+        "ready": reader.is_ready,
+        "alive": reader.is_alive(),
+        "error": reader.error,
+        "error_count": reader.error_count,
+        "sample_rate": reader.sample_rate,
+        "sensor_names": list(reader.sensor_names),
+        "nominal_wavelengths": dict(reader.nominal_wavelengths),
+        "history_samples": reader._history_samples,
+        "start_time": reader._start_time,
+        "clock": reader.clock,
+        "sensor_bank": reader.sensor_bank,
+        "metrics": reader.metrics(),
+        "registry": REGISTRY.snapshot(reader.metrics_prefix + "."),
+    }
+
+
+def _child_main(
+    interr_cfg: InterrogatorSettings,
+    history_seconds: float,
+    batch_frames: int,
+    ring_name: str,
+    capacity: int,
+    columns: int,
+    lock,
+    data_ready,
+    commands,
+    status,
+) -> None:
+    ring = SharedRingBuffer(capacity, columns, name=ring_name)
+    reader = _ChildStreamReader(interr_cfg, history_seconds, batch_frames, ring, lock, data_ready)
+    reader.start()
+    try:
+        while True:
+            if commands.poll(STATUS_INTERVAL_S):
+                request = commands.recv()
+                if request is None:
+                    break
+                method, args = request
+                try:
+                    reply = (True, getattr(reader, method)(*args))
+                except Exception as exc:
+                    reply = (False, exc)
+                commands.send(reply)
+            status.send(_status_of(reader))
+    except (EOFError, BrokenPipeError):
+        pass
+    finally:
+        reader.stop()
+        # Leave a readable file behind if the parent went away mid-recording.
+        reader.stop_recording()
+        reader.stop_raw_capture()
+
+
+class ProcessStreamReader(FBGStreamReader):
+    """:class:`~fbg.streaming.FBGStreamReader` whose acquisition runs in a child process.
+
+    The thread started by :meth:`start` only supervises the child and
+    mirrors its status; :attr:`interrogator` stays ``None`` in this process.
+    """
+
+    def __init__(
+        self,
+        interr_cfg: InterrogatorSettings,
+        history_seconds: float,
+        batch_frames: int = 256,
+    ) -> None:
+        super().__init__(interr_cfg, history_seconds, batch_frames)
+        self._lock = _CONTEXT.Lock()
+        self._data_ready = _CONTEXT.Condition(self._lock)
+        capacity = max(self._history_samples, int(_MAX_SAMPLE_RATE * history_seconds * 3.0))
+        self._ring = SharedRingBuffer(capacity, 1 + len(self.sensor_names))
+        self._process = None
+        self._commands = None
+        self._status = None
+        self._call_lock = threading.Lock()
+        self._metrics: Dict[str, float] = {}
+        # The child publishes this reader's registry entries; mirror them
+        # instead of keeping idle local ones.
+        REGISTRY.remove(self.metrics_prefix + ".")
+
+    def run(self) -> None:
+        commands, child_commands = _CONTEXT.Pipe()
+        self._status, child_status = _CONTEXT.Pipe(duplex=False)
+        status = self._status
+        self._process = _CONTEXT.Process(
+            target=_child_main,
+            args=(
+                self._interr_cfg,
+                self._history_seconds,
+                self._batch_frames,
+                self._ring.name,
+                self._ring.capacity,
+                self._ring.columns,
+                self._lock,
+                self._data_ready,
+                child_commands,
+                child_status,
+            ),
+            name=f"fbg-acquisition-{self._interr_cfg.ip_address}",
+            daemon=True,
+        )
+        self._process.start()
+        child_commands.close()
+        child_status.close()
+        self._commands = commands
+        try:
+            while not self._stop_event.is_set():
+                if status.poll(STATUS_INTERVAL_S):
+                    self._apply_status(status.recv())
+                elif not self._process.is_alive():
+                    self.error = self.error or f"Acquisition process exited ({self._process.exitcode})."
+                    break
+        except EOFError:
+            self.error = self.error or "Acquisition process closed its status pipe."
+        finally:
+            self._shutdown_process()
+
+    def _apply_status(self, status: Dict[str, Any]) -> None:
+        self.error = status["error"]
+        self.error_count = status["error_count"]
+        self._estimated_rate = status["sample_rate"]
+        self.sensor_names = status["sensor_names"]
+        self.nominal_wavelengths = status["nominal_wavelengths"]
+        self._history_samples = status["history_samples"]
+        self._start_time = status["start_time"]
+        self.clock = status["clock"]
+        self.sensor_bank = status["sensor_bank"]
+        self._metrics = status["metrics"]
+        REGISTRY.publish(status["registry"])
+        if status["ready"]:
+            self._ready_event.set()
+
+    def _shutdown_process(self) -> None:
+        with self._call_lock:
+            if self._commands is not None:
+                try:
+                    self._commands.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            # Nobody drains status any more; closing it unblocks the child.
+            self._status.close()
+            if self._process is not None:
+                self._process.join(timeout=5.0)
+                if self._process.is_alive():
+                    self._process.terminate()
+                    self._process.join()
+            self._commands = None
+        # The mapping stays readable here, so snapshots still work after stop.
+        self._ring.unlink()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=8.0)
+
+    def _call(self, method: str, *args):
+        with self._call_lock:
+            if self._commands is None:
+                raise RuntimeError("Acquisition process is not running.")
+            self._commands.send((method, args))
+            ok, result = self._commands.recv()
+        if not ok:
+            raise result
+        return result
+
+    def metrics(self) -> Dict[str, float]:
+        return dict(self._metrics)
+
+    def add_rolling_window(self, window_seconds: float) -> None:
+        self._call("add_rolling_window", window_seconds)
+
+    def rolling_stats(
+        self,
+        window_seconds: float | None = None,
+        sensors: Sequence[str] | None = None,
+    ) -> Dict[str, RollingSummary]:
+        # Rolling aggregates are kept next to the acquisition, in the child.
+        return self._call("rolling_stats", window_seconds, sensors)
+
+    def gaps(self, since: float | None = None) -> List[Tuple[float, int]]:
+        return self._call("gaps", since)
+
+    def query(
+        self,
+        t_start: float,
+        t_end: float,
+        sensors: Sequence[str] | None = None,
+        time_base: str = "device",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        # The recording that backs spans older than the shared history is
+        # written by the child.
+        return self._call("query", t_start, t_end, sensors, time_base)
+
+    def start_recording(self, path: Path | None = None) -> Path:
+        return self._call("start_recording", path)
+
+    def stop_recording(self) -> Path | None:
+        return self._call("stop_recording")
+
+    def start_raw_capture(self, path: Path) -> None:
+        self._call("start_raw_capture", path)
+
+    def stop_raw_capture(self) -> Path | None:
+        return self._call("stop_raw_capture")
+
+    def snapshot_from_recording(self, window_sec: float | None = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        return self._call("snapshot_from_recording", window_sec)
+
+    def history(
+        self,
+        span_seconds: float,
+        max_points: int | None = None,
+        stat: str = "mean",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        # Decimated tiers live in the child; only the raw history is shared.
+        return self._call("history", span_seconds, max_points, stat)
@@ -0,0 +1,391 @@
+"""Wire format helpers for the Micron Optics sm130 data protocol."""
+
+from __future__ import annotations
+
+import datetime
+import struct
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+STATUS_HEADER_SIZE = 88
+LENGTH_PREFIX_SIZE = 10
+PEAK_DTYPE = np.dtype("<u4")
+
+# Frames flagged with this error code are not appended to the data history.
+SKIP_FRAME_ERROR = 9
+
+# Full 88-byte status header, field order as documented in the sm130 manual.
+STATUS_HEADER = struct.Struct(
+    "<"
+    "BBBB"  # 0 fs_radix, cur_layer, fw_ver, abcde
+    "HBB"  # 1 fbg_thermistor, knpl, fghij
+    "HH"  # 2 reserved2, tx_ambient_temp
+    "HH"  # 3 num_fbg_peaks, num_ffpi_peaks
+    "HH"  # 4 num_dut1_peaks, num_dut2_peaks
+    "HH"  # 5 num_dut3_peaks, num_dut4_peaks
+    "HBB"  # 6 acq_counter, qr, reserved7
+    "I"  # 7 serial_number
+    "I"  # 8 kernel_timestamp_microseconds
+    "I"  # 9 kernel_timestamp_seconds
+    "HH"  # 10 kernel_buffers, kernel_src_buffer
+    "I"  # 11 error_and_kernel_rt_loc0
+    "BBH"  # 12 buffer, header_ver, header_length
+    "HH"  # 13 dut1_gain, dut2_gain
+    "HH"  # 14 dut3_gain, dut4_gain
+    "HH"  # 15 dut1_noise_thresh, dut2_noise_thresh
+    "HH"  # 16 dut3_noise_thresh, dut4_noise_thresh
+    "HH"  # 17 peak_data_rate_div, hw_clk_div
+    "I"  # 18 granularity
+    "I"  # 19 reserved4
+    "I"  # 20 starting_lambda
+    "I"  # 21 ending_lambda
+)
+
+# Only the fields the acquisition loop needs; pad bytes skip everything else
+# so a single unpack_from() call touches no more than it has to.
+_FAST_HEADER = struct.Struct(
+    "<"
+    "16x"
+    "HHHH"  # num_dut1..4_peaks
+    "H"  # acq_counter
+    "2x"
+    "I"  # serial_number
+    "I"  # kernel_timestamp_microseconds
+    "I"  # kernel_timestamp_seconds
+    "4x"
+    "I"  # error_and_kernel_rt_loc0
+    "24x"
+    "I"  # granularity
+)
+
+# num_dut1..4_peaks, for frame validation.
+_PEAK_COUNTS = struct.Struct("<16xHHHH")
+
+
+class StatusHeader(object):
+    """Decoded status header with the full field dict built on first access.
+
+    Only the handful of values needed per frame are unpacked eagerly; the
+    30-key dictionary reported by :attr:`fields` is decoded lazily from a
+    private copy of the raw header bytes.
+    """
+
+    __slots__ = (
+        "num_peaks",
+        "acq_counter",
+        "serial_number",
+        "kernel_timestamp_microseconds",
+        "kernel_timestamp_seconds",
+        "error",
+        "granularity",
+        "_raw",
+        "_fields",
+    )
+
+    def __init__(self, buffer, offset: int = 0) -> None:
+        (
+            dut1,
+            dut2,
+            dut3,
+            dut4,
+            self.acq_counter,
+            self.serial_number,
+            self.kernel_timestamp_microseconds,
+            self.kernel_timestamp_seconds,
+            error_and_kernel_rt_loc0,
+            self.granularity,
+        ) = _FAST_HEADER.unpack_from(buffer, offset)
+        self.num_peaks = (dut1, dut2, dut3, dut4)
+        self.error = error_and_kernel_rt_loc0 >> 24
+        self._raw = bytes(buffer[offset:offset + STATUS_HEADER_SIZE])
+        self._fields: Dict[str, Any] | None = None
+
+    @property
+    def kernel_timestamp(self) -> float:
+        return float(self.kernel_timestamp_seconds) + float(self.kernel_timestamp_microseconds) * 1e-6
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        if self._fields is None:
+            self._fields = decode_status_header(self._raw)
+        return self._fields
+
+
+def decode_status_header(buffer, offset: int = 0) -> Dict[str, Any]:
+    """Decode every field of the status header into the legacy ``data_header`` dict."""
+    (
+        fs_radix, cur_layer, fw_ver, abcde,  # 0
+        fbg_thermistor, knpl, fghij,  # 1
+        reserved2, tx_ambient_temp,  # 2
+        num_fbg_peaks, num_ffpi_peaks,  # 3
+        num_dut1_peaks, num_dut2_peaks,  # 4
+        num_dut3_peaks, num_dut4_peaks,  # 5
+        acq_counter, qr, reserved7,  # 6
+        serial_number,  # 7
+        kernel_timestamp_microseconds,  # 8
+        kernel_timestamp_seconds,  # 9
+        kernel_buffers, kernel_src_buffer,  # 10
+        error_and_kernel_rt_loc0,  # 11
+        buffer_pct, header_ver, header_length,  # 12
+        dut1_gain, dut2_gain,  # 13
+        dut3_gain, dut4_gain,  # 14
+        dut1_noise_thresh, dut2_noise_thresh,  # 15
+        dut3_noise_thresh, dut4_noise_thresh,  # 16
+        peak_data_rate_div, hw_clk_div,  # 17
+        granularity,  # 18
+        reserved4,  # 19
+        starting_lambda,  # 20
+        ending_lambda,  # 21
+    ) = STATUS_HEADER.unpack_from(buffer, offset)
+
+    # 1 parse knpl
+    operating_mode = knpl >> 6
+    triggering_mode = (knpl & 0x30) >> 4
+    sm041_mux_level = (knpl & 0x0c) >> 2
+
+    return {
+        "Serial number": serial_number,
+        "FBG thermistor": fbg_thermistor,
+        "FS radix": fs_radix,
+        "Firmware version": fw_ver,
+        "Acquisition triggered": bool(abcde & 0x80),
+        "Ch_1 # of peaks": num_dut1_peaks,
+        "Ch_2 # of peaks": num_dut2_peaks,
+        "Ch_3 # of peaks": num_dut3_peaks,
+        "Ch_4 # of peaks": num_dut4_peaks,
+        "Calibration fault": bool(abcde & 0x40),
+        "Start of frame": bool(abcde & 0x20),
+        "Primary fan state": bool(abcde & 0x10),
+        "Secondary fan state": bool(abcde & 0x08),
+        "S0 mux state": bool(abcde & 0x04),
+        "Percent buffer": buffer_pct,
+        "Header length": header_length,
+        "Header version": header_ver,
+        "Tx ambient temp": tx_ambient_temp,
+        "SM041 mux level": sm041_mux_level,
+        "HW clock div": hw_clk_div,
+        "Granularity": granularity,
+        "Operating mode": operating_mode,
+        "Starting lambda": starting_lambda,
+        "Ending lambda": ending_lambda,
+        "Kernel timestamp (seconds)": kernel_timestamp_seconds,
+        "Kernel timestamp (microseconds)": kernel_timestamp_microseconds,
+        "Kernel timestamp": datetime.datetime.fromtimestamp(kernel_timestamp_seconds),
+        "Triggering mode": triggering_mode,
+        "Error": error_and_kernel_rt_loc0 >> 24,
+        "Acquisition counter": acq_counter,
+    }
+
+
+def is_data_frame(payload) -> bool:
+    """Whether ``payload`` can be a streamed data frame: a status header
+    followed by whole peak words, at least as many as the header reports."""
+    size = len(payload)
+    peak_bytes = size - STATUS_HEADER_SIZE
+    if peak_bytes < 0 or peak_bytes % PEAK_DTYPE.itemsize:
+        return False
+    return sum(_PEAK_COUNTS.unpack_from(payload)) * PEAK_DTYPE.itemsize <= peak_bytes
+
+
+def decode_peaks(buffer, granularity: int, out: np.ndarray, offset: int = STATUS_HEADER_SIZE) -> None:
+    """Decode the raw peak values following a status header into ``out`` (nm).
+
+    Peaks are assigned to ``out`` in order; slots without a matching peak,
+    or every slot when the header reports no granularity, are set to NaN.
+    """
+    available = max(0, (len(buffer) - offset) // PEAK_DTYPE.itemsize)
+    count = min(out.shape[0], available) if granularity else 0
+    if count:
+        raw = np.frombuffer(buffer, dtype=PEAK_DTYPE, count=count, offset=offset)
+        np.divide(raw, granularity, out=out[:count])
+    out[count:] = np.nan
+
+
+@dataclass
+class FrameBatch:
+    """Contiguous per-frame arrays decoded from a run of streamed frames."""
+
+    acq_counter: np.ndarray
+    kernel_timestamp: np.ndarray
+    error: np.ndarray
+    wavelengths: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.acq_counter.shape[0])
+
+    @classmethod
+    def empty(cls, n_sensors: int) -> "FrameBatch":
+        return cls(
+            acq_counter=np.empty(0, dtype=np.int64),
+            kernel_timestamp=np.empty(0, dtype=np.float64),
+            error=np.empty(0, dtype=np.uint8),
+            wavelengths=np.empty((0, n_sensors), dtype=np.float64),
+        )
+
+    @classmethod
+    def concatenate(cls, batches: Sequence["FrameBatch"]) -> "FrameBatch":
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            acq_counter=np.concatenate([batch.acq_counter for batch in batches]),
+            kernel_timestamp=np.concatenate([batch.kernel_timestamp for batch in batches]),
+            error=np.concatenate([batch.error for batch in batches]),
+            wavelengths=np.concatenate([batch.wavelengths for batch in batches]),
+        )
+
+
+def decode_frames(frames: Sequence, n_sensors: int) -> FrameBatch:
+    """Decode a sequence of frame payloads (header + peaks) into a :class:`FrameBatch`."""
+    count = len(frames)
+    acq_counter = np.empty(count, dtype=np.int64)
+    kernel_timestamp = np.empty(count, dtype=np.float64)
+    error = np.empty(count, dtype=np.uint8)
+    wavelengths = np.empty((count, n_sensors), dtype=np.float64)
+    unpack_from = _FAST_HEADER.unpack_from
+    for idx, frame in enumerate(frames):
+        (_, _, _, _, counter, _, micros, seconds, error_and_rt, granularity) = unpack_from(frame)
+        acq_counter[idx] = counter
+        kernel_timestamp[idx] = seconds + micros * 1e-6
+        error[idx] = error_and_rt >> 24
+        decode_peaks(frame, granularity, wavelengths[idx])
+    return FrameBatch(acq_counter, kernel_timestamp, error, wavelengths)
+
+
+class FrameReader(object):
+    """Exact-length reader for the 10-byte, length-prefixed sm130 responses.
+
+    Socket reads go through ``recv_into`` on one reusable buffer, so a single
+    syscall can pull in many frames. A garbled length prefix starts a resync
+    that skips bytes inside the buffer until a plausible prefix is found; each
+    such event increments :attr:`resync_count`.
+
+    With ``validate`` set (e.g. :func:`is_data_frame` once a connection only
+    carries data frames), a frame is also rejected, and the resync started,
+    when ``validate(payload)`` fails or when the bytes already buffered after
+    it do not start a plausible prefix. That catches digits in garbage that
+    parse as a length, and garbage inserted inside a frame, at the cost of
+    the valid frame just before garbage that falls between frames.
+    """
+
+    def __init__(
+        self,
+        sock,
+        buffer_size: int = 1 << 18,
+        max_frame_size: int = 1 << 16,
+        validate: Callable[[memoryview], bool] | None = None,
+    ) -> None:
+        if buffer_size < LENGTH_PREFIX_SIZE + max_frame_size:
+            raise ValueError("buffer_size must hold at least one maximum-size frame.")
+        self.socket = sock
+        self.max_frame_size = max_frame_size
+        self.validate = validate
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._resyncing = False
+        self.frame_count = 0
+        self.recv_count = 0
+        self.resync_count = 0
+        self.skipped_bytes = 0
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._end - self._start
+
+    def read_frame(self) -> memoryview:
+        """Block until a complete frame is buffered and return its payload.
+
+        The returned view aliases the internal buffer and is only valid until
+        the next call on this reader.
+        """
+        while True:
+            frame = self._next_buffered_frame()
+            if frame is not None:
+                return frame
+            self._fill()
+
+    def read_frames(self, max_frames: int) -> List[memoryview]:
+        """Return every complete buffered frame, up to ``max_frames``.
+
+        Blocks only while no complete frame is available at all. The views
+        are valid until the next call on this reader.
+        """
+        frames: List[memoryview] = []
+        while True:
+            while len(frames) < max_frames:
+                frame = self._next_buffered_frame()
+                if frame is None:
+                    break
+                frames.append(frame)
+            if frames:
+                return frames
+            self._fill()
+
+    def _next_buffered_frame(self) -> memoryview | None:
+        while self._end - self._start >= LENGTH_PREFIX_SIZE:
+            size = self._prefix_at(self._start)
+            payload_start = self._start + LENGTH_PREFIX_SIZE
+            payload_end = payload_start + size
+            if size >= 0 and payload_end > self._end:
+                return None
+            if size < 0 or (self.validate is not None and not self._plausible(payload_start, payload_end)):
+                if not self._resyncing:
+                    self._resyncing = True
+                    self.resync_count += 1
+                self._start += 1
+                self.skipped_bytes += 1
+                continue
+            self._resyncing = False
+            self._start = payload_end
+            self.frame_count += 1
+            return self._view[payload_start:payload_end]
+        return None
+
+    def _prefix_at(self, offset: int) -> int:
+        """Frame size announced by the prefix at ``offset``, or -1 if implausible."""
+        prefix = self._buffer[offset:offset + LENGTH_PREFIX_SIZE].strip()
+        size = int(prefix) if prefix.isdigit() else -1
+        return size if size <= self.max_frame_size else -1
+
+    def _plausible(self, payload_start: int, payload_end: int) -> bool:
+        if payload_end + LENGTH_PREFIX_SIZE <= self._end and self._prefix_at(payload_end) < 0:
+            return False
+        return self.validate(self._view[payload_start:payload_end])
+
+    def next_frame(self) -> memoryview | None:
+        """Return the next complete buffered frame without reading, or ``None``."""
+        return self._next_buffered_frame()
+
+    @property
+    def free_bytes(self) -> int:
+        """Space :meth:`writable_view` can offer once consumed bytes are dropped."""
+        return len(self._buffer) - (self._end - self._start)
+
+    def writable_view(self) -> memoryview:
+        """Compact the buffer and return the free tail for the next read.
+
+        Together with :meth:`commit` this lets an event loop fill the reader
+        (e.g. from ``asyncio.BufferedProtocol``) instead of :meth:`_fill`.
+        """
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif self._end == len(self._buffer) or self._start > len(self._buffer) // 2:
+            pending = self._end - self._start
+            self._view[:pending] = self._view[self._start:self._end]
+            self._start, self._end = 0, pending
+        return self._view[self._end:]
+
+    def commit(self, nbytes: int) -> None:
+        """Mark ``nbytes`` written into :meth:`writable_view` as received."""
+        self._end += nbytes
+        self.recv_count += 1
+
+    def _fill(self) -> int:
+        received = self.socket.recv_into(self.writable_view())
+        if received == 0:
+            raise ConnectionError("Interrogator closed the connection.")
+        self.commit(received)
+        return received
@@ -0,0 +1,279 @@
+"""Bounded-memory recording of sample rows to disk.
+
+The acquisition thread copies rows into fixed-size chunks; full chunks are
+handed to a writer thread that appends them to a ``.npy`` file with one
+float64 field per column. Memory stays at a few chunks however long the
+recording runs, and stopping only flushes the last partial chunk and patches
+the row count into the header.
+
+Recordings load with ``np.load(path, mmap_mode="r")``; fields are named
+after the columns, e.g. ``data["time_seconds"]``.
+
+While recording, the first timestamp of every chunk is indexed, so
+:meth:`ChunkedRecorder.span` can binary-search a time window and copy just
+those rows, from disk or from chunks still in memory, in O(window).
+"""
+
+from __future__ import annotations
+
+import ast
+import math
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+_MAGIC = b"\x93NUMPY"
+# Header reserved up front so the final row count can be patched in place.
+_MAX_ROWS_DIGITS = 15
+
+
+def _header_bytes(dtype: np.dtype, rows: int, total_size: int | None = None) -> bytes:
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+        np.lib.format.dtype_to_descr(dtype),
+        rows,
+    )
+    if total_size is None:
+        worst = len(header) + _MAX_ROWS_DIGITS + 1
+        total_size = -(-(len(_MAGIC) + 4 + worst) // 64) * 64
+    header_len = total_size - len(_MAGIC) - 4
+    if header_len > 0xFFFF:
+        raise ValueError("Too many columns for a single npy header.")
+    padded = header.ljust(header_len - 1) + "\n"
+    return _MAGIC + bytes([1, 0]) + header_len.to_bytes(2, "little") + padded.encode("latin1")
+
+
+class ChunkedRecorder(object):
+    """Append ``[n, columns]`` float blocks to ``path`` via a writer thread."""
+
+    def __init__(self, path: Path, columns: Sequence[str], chunk_rows: int = 16384) -> None:
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.dtype = np.dtype([(name, "<f8") for name in self.columns])
+        self.chunk_rows = max(1, int(chunk_rows))
+        # Unbuffered, so rows counted as written are visible to readers.
+        self._file = self.path.open("wb", buffering=0)
+        self._header_size = len(_header_bytes(self.dtype, 0))
+        self._file.write(_header_bytes(self.dtype, 0, self._header_size))
+        self._chunk = self._new_chunk()
+        self._fill = 0
+        self._lock = threading.Lock()
+        self._in_flight: deque[np.ndarray] = deque()
+        self._queue: "queue.Queue[np.ndarray | None]" = queue.Queue()
+        # First timestamp (column 0) of chunk k, for k < _chunk_count.
+        self._chunk_starts = np.empty(64, dtype=np.float64)
+        self._chunk_count = 0
+        self.last_time = math.nan
+        self._closed = False
+        self.rows_recorded = 0
+        self.rows_written = 0
+        # Set when a write fails; the recorder then keeps only the rows
+        # already on disk and ``close`` raises.
+        self.error: str | None = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _new_chunk(self) -> np.ndarray:
+        return np.empty((self.chunk_rows, len(self.columns)), dtype=np.float64)
+
+    def append(self, rows: np.ndarray) -> None:
+        """Copy ``rows`` into the current chunk; called from the producer thread.
+
+        Rows are dropped once a write has failed (see :attr:`error`).
+        """
+        count = rows.shape[0]
+        offset = 0
+        with self._lock:
+            if self._closed or self.error is not None:
+                return
+            while offset < count:
+                take = min(count - offset, self.chunk_rows - self._fill)
+                if self._fill == 0:
+                    self._index_chunk(rows[offset, 0])
+                self._chunk[self._fill:self._fill + take] = rows[offset:offset + take]
+                self._fill += take
+                offset += take
+                if self._fill == self.chunk_rows:
+                    self._hand_off(self._chunk)
+                    self._chunk = self._new_chunk()
+                    self._fill = 0
+            self.rows_recorded += count
+            if count:
+                self.last_time = float(rows[-1, 0])
+
+    @property
+    def pending_chunks(self) -> int:
+        """Full chunks handed to the writer thread but not on disk yet."""
+        return len(self._in_flight)
+
+    def rows(self) -> np.ndarray:
+        """Everything recorded so far as one ``[n, columns]`` array."""
+        return self.span()
+
+    def span(self, t_start: float | None = None, t_end: float | None = None) -> np.ndarray:
+        """Copy of the rows with ``t_start <= time <= t_end`` (column 0).
+
+        Assumes non-decreasing timestamps. Only the recorder's own lock is
+        taken, briefly, to pin the current chunks; rows already on disk are
+        read back through a memory map.
+        """
+        with self._lock:
+            written = self.rows_written
+            in_flight = list(self._in_flight)
+            partial = self._chunk[:self._fill]
+            starts = self._chunk_starts[:self._chunk_count].copy()
+        # Rows below a chunk's fill level are never modified again, so the
+        # pinned views can be read without holding the lock.
+        chunks = _ChunkView(self, written, in_flight, partial)
+        lo = 0 if t_start is None else chunks.locate(starts, t_start, "left")
+        hi = chunks.total if t_end is None else chunks.locate(starts, t_end, "right")
+        return chunks.copy_rows(lo, max(lo, hi))
+
+    def close(self) -> Path:
+        """Flush the partial chunk, finalise the header and return the path.
+
+        After a failed write the file is still finalised, holding the rows
+        written before the failure, and :class:`OSError` is raised.
+        """
+        with self._lock:
+            if self._closed:
+                return self.path
+            self._closed = True
+            if self._fill and self.error is None:
+                self._hand_off(self._chunk[:self._fill])
+                self._fill = 0
+        self._queue.put(None)
+        self._writer.join()
+        try:
+            if self.error is not None:
+                # Drop any partly written chunk after the last complete one.
+                self._file.truncate(self._header_size + self.rows_written * self.dtype.itemsize)
+            self._file.seek(0)
+            self._file.write(_header_bytes(self.dtype, self.rows_written, self._header_size))
+        finally:
+            self._file.close()
+        if self.error is not None:
+            raise OSError(f"Recording to {self.path} failed: {self.error}")
+        return self.path
+
+    def _index_chunk(self, first_time: float) -> None:
+        if self._chunk_count == self._chunk_starts.shape[0]:
+            grown = np.empty(2 * self._chunk_count, dtype=np.float64)
+            grown[:self._chunk_count] = self._chunk_starts
+            self._chunk_starts = grown
+        self._chunk_starts[self._chunk_count] = first_time
+        self._chunk_count += 1
+
+    def _hand_off(self, chunk: np.ndarray) -> None:
+        self._in_flight.append(chunk)
+        self._queue.put(chunk)
+
+    def _write_loop(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self.error is not None:
+                continue
+            try:
+                view = memoryview(np.ascontiguousarray(chunk)).cast("B")
+                while view:
+                    view = view[self._file.write(view):]
+            except OSError as exc:
+                self._fail(exc)
+                continue
+            with self._lock:
+                self._in_flight.popleft()
+                self.rows_written += chunk.shape[0]
+
+    def _fail(self, exc: OSError) -> None:
+        """Stop recording after a failed write, keeping what is on disk.
+
+        Chunks still queued are discarded unwritten, and the chunk index is
+        cut back to the rows already written, so :meth:`span` only ever
+        returns data the file holds.
+        """
+        with self._lock:
+            if self.error is not None:
+                return
+            self.error = f"{type(exc).__name__}: {exc}"
+            self._in_flight.clear()
+            self._fill = 0
+            self._chunk_count = -(-self.rows_written // self.chunk_rows)
+
+
+class _ChunkView(object):
+    """Chunks of a :class:`ChunkedRecorder` pinned at one instant."""
+
+    def __init__(
+        self,
+        recorder: ChunkedRecorder,
+        written: int,
+        in_flight: List[np.ndarray],
+        partial: np.ndarray,
+    ) -> None:
+        self.size = recorder.chunk_rows
+        self.on_disk = written // self.size
+        self.total = written + sum(chunk.shape[0] for chunk in in_flight) + partial.shape[0]
+        self._memory = in_flight + [partial]
+        self._disk = None
+        if written:
+            self._disk = np.memmap(
+                recorder.path, dtype=np.float64, mode="r", offset=recorder._header_size,
+                shape=(written, len(recorder.columns)),
+            )
+
+    def chunk(self, k: int) -> np.ndarray:
+        if k < self.on_disk:
+            return self._disk[k * self.size:(k + 1) * self.size]
+        return self._memory[k - self.on_disk]
+
+    def locate(self, starts: np.ndarray, t: float, side: str) -> int:
+        """Row index where ``t`` would be inserted on the time column."""
+        if starts.shape[0] == 0:
+            return 0
+        k = max(0, int(np.searchsorted(starts, t, side="right")) - 1)
+        k = min(k, self.on_disk + len(self._memory) - 1)
+        return k * self.size + int(np.searchsorted(self.chunk(k)[:, 0], t, side=side))
+
+    def copy_rows(self, lo: int, hi: int) -> np.ndarray:
+        parts: List[np.ndarray] = []
+        row = lo
+        while row < hi:
+            k, start = divmod(row, self.size)
+            chunk = self.chunk(k)
+            stop = min(chunk.shape[0], start + hi - row)
+            parts.append(chunk[start:stop])
+            row += stop - start
+        if not parts:
+            return np.empty((0, self._memory[-1].shape[1]), dtype=np.float64)
+        return np.concatenate(parts)
+
+
+def recording_columns(path: Path) -> List[str]:
+    """Column names of a recording, read from its header only."""
+    with Path(path).open("rb") as handle:
+        prefix = handle.read(10)
+        header = handle.read(int.from_bytes(prefix[8:10], "little"))
+    descr = ast.literal_eval(header.decode("latin1"))["descr"]
+    return [name for name, _ in descr]
+
+
+def load_recording(path: Path) -> np.ndarray:
+    """Memory-map a recording as a ``[rows, columns]`` float64 array."""
+    data = np.load(path, mmap_mode="r")
+    return data.view(np.float64).reshape(data.shape[0], len(data.dtype.names))
+
+
+def export_csv(path: Path, csv_path: Path, chunk_rows: int = 100000) -> Path:
+    """Write a recording to CSV in chunks, keeping memory bounded."""
+    columns = recording_columns(path)
+    data = load_recording(path)
+    with Path(csv_path).open("w") as handle:
+        handle.write(",".join(columns) + "\n")
+        for start in range(0, data.shape[0], chunk_rows):
+            np.savetxt(handle, data[start:start + chunk_rows], delimiter=",", fmt="%.12g")
+    return Path(csv_path)
@@ -0,0 +1,197 @@
+"""Fixed-capacity 2-D ring buffer for sample history."""
+
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """Preallocated ``[capacity, columns]`` float64 ring.
+
+    Appends copy at most two slices into the backing array and never
+    allocate. :meth:`views` exposes the newest rows as at most two contiguous,
+    read-only slices of that array, oldest first. They alias the buffer and
+    are overwritten once enough new rows arrive, so callers that keep them
+    beyond the caller's lock should copy (see :meth:`latest`).
+
+    Not thread-safe; the owner serialises access.
+    """
+
+    def __init__(self, capacity: int, columns: int, dtype=np.float64) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        self._data = np.full((int(capacity), int(columns)), np.nan, dtype=dtype)
+        self._head = 0
+        self._size = 0
+        self.total_written = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def columns(self) -> int:
+        return self._data.shape[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Append ``rows[n, columns]``; only the newest ``capacity`` rows are kept."""
+        rows = np.asarray(rows)
+        count = rows.shape[0]
+        if count == 0:
+            return
+        capacity = self.capacity
+        self.total_written += count
+        if count >= capacity:
+            self._data[:] = rows[-capacity:]
+            self._head = 0
+            self._size = capacity
+            return
+        first = min(count, capacity - self._head)
+        self._data[self._head:self._head + first] = rows[:first]
+        if first < count:
+            self._data[:count - first] = rows[first:]
+        self._head = (self._head + count) % capacity
+        self._size = min(capacity, self._size + count)
+
+    def views(self, count: int | None = None) -> Tuple[np.ndarray, ...]:
+        """Newest ``count`` rows (all by default) as one or two read-only slices."""
+        size = self._size if count is None else max(0, min(int(count), self._size))
+        start = self._head - size
+        if start >= 0:
+            parts: Tuple[np.ndarray, ...] = (self._data[start:self._head],)
+        else:
+            parts = (self._data[start:], self._data[:self._head])
+        for part in parts:
+            part.flags.writeable = False
+        return parts
+
+    def since(self, index: int, count: int | None = None) -> Tuple[int, Tuple[np.ndarray, ...]]:
+        """Rows from absolute write position ``index`` on, as read-only slices.
+
+        Returns ``(first, parts)``. ``first`` is the absolute position of the
+        first returned row, later than ``index`` if those rows have already
+        been overwritten. ``count`` caps how many rows are returned, oldest
+        first.
+        """
+        first = max(int(index), self.total_written - self._size)
+        available = self.total_written - first
+        if count is not None:
+            available = min(available, int(count))
+        if available <= 0:
+            return first, ()
+        capacity = self.capacity
+        start = (self._head - (self.total_written - first)) % capacity
+        end = start + available
+        if end <= capacity:
+            parts: Tuple[np.ndarray, ...] = (self._data[start:end],)
+        else:
+            parts = (self._data[start:], self._data[:end - capacity])
+        for part in parts:
+            part.flags.writeable = False
+        return first, parts
+
+    def latest(self, count: int | None = None) -> np.ndarray:
+        """Copy of the newest ``count`` rows, oldest first."""
+        parts = self.views(count)
+        if len(parts) == 1:
+            return parts[0].copy()
+        return np.concatenate(parts)
+
+    def between(self, low: float, high: float, column: int = 0) -> np.ndarray:
+        """Copy of the rows with ``low <= row[column] <= high``.
+
+        ``column`` must be non-decreasing in write order (e.g. timestamps);
+        each slice is binary-searched, so only the matching rows are touched.
+        """
+        parts = []
+        for part in self.views():
+            keys = part[:, column]
+            lo = int(np.searchsorted(keys, low, side="left"))
+            hi = int(np.searchsorted(keys, high, side="right"))
+            if hi > lo:
+                parts.append(part[lo:hi])
+        if not parts:
+            return np.empty((0, self.columns), dtype=self._data.dtype)
+        if len(parts) == 1:
+            return parts[0].copy()
+        return np.concatenate(parts)
+
+    def last(self) -> np.ndarray | None:
+        """Newest row, or ``None`` when empty."""
+        if self._size == 0:
+            return None
+        return self._data[self._head - 1].copy()
+
+
+class SharedRingBuffer(RingBuffer):
+    """:class:`RingBuffer` whose rows and write position live in shared memory.
+
+    One process creates the segment (``name=None``) and others attach to it
+    by :attr:`name`. Exactly one process may write; readers serialise with
+    it through a lock shared between the processes.
+    """
+
+    # int64 slots ahead of the rows: head, size, total_written, spare.
+    _STATE_SLOTS = 4
+
+    def __init__(self, capacity: int, columns: int, name: str | None = None) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive.")
+        state_bytes = self._STATE_SLOTS * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=state_bytes + int(capacity) * int(columns) * 8
+            )
+        else:
+            # Processes spawned by the creator share its resource tracker,
+            # so attaching does not schedule a second unlink.
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._state = np.ndarray((self._STATE_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray(
+            (int(capacity), int(columns)), dtype=np.float64, buffer=self.shm.buf, offset=state_bytes
+        )
+        if name is None:
+            self._state[:] = 0
+            self._data.fill(np.nan)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def _head(self) -> int:
+        return int(self._state[0])
+
+    @_head.setter
+    def _head(self, value: int) -> None:
+        self._state[0] = value
+
+    @property
+    def _size(self) -> int:
+        return int(self._state[1])
+
+    @_size.setter
+    def _size(self, value: int) -> None:
+        self._state[1] = value
+
+    @property
+    def total_written(self) -> int:
+        return int(self._state[2])
+
+    @total_written.setter
+    def total_written(self, value: int) -> None:
+        self._state[2] = value
+
+    def unlink(self) -> None:
+        """Remove the segment; attached mappings stay valid until closed."""
+        self.shm.unlink()
@@ -0,0 +1,202 @@
+"""Incremental rolling statistics over the last few seconds of samples.
+
+A :class:`RollingWindow` keeps the rows inside its window in a
+:class:`RingBuffer` together with running sums per column (count, sum, sum of
+squares and the time cross-terms of a least-squares line). Every appended
+block is added once and subtracted once when it leaves the window, so
+keeping the aggregates current costs O(new samples) and reading the mean,
+standard deviation or slope is O(1), whatever the window length.
+
+Sums are taken relative to a reference time and value, and rebuilt from the
+window rows once per ring capacity, so catastrophic cancellation of
+``1550 nm``-sized values and slow float drift stay bounded. Minimum and
+maximum come from per-block extremes of ``BLOCK_ROWS`` samples plus the
+partial blocks at the window edges.
+
+NaN samples (e.g. a peak not found) are skipped per column.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .ringbuffer import RingBuffer
+
+# Windows kept by a stream reader unless asked for, in seconds: none, so
+# acquisition pays for rolling statistics only when something reads them.
+DEFAULT_ROLLING_WINDOWS: Tuple[float, ...] = ()
+BLOCK_ROWS = 64
+
+
+@dataclass
+class RollingSummary:
+    """Statistics of one column over a rolling window (device time)."""
+
+    count: int
+    mean: float
+    std: float
+    minimum: float
+    maximum: float
+    # Least-squares slope in units per second.
+    slope: float
+    t_start: float
+    t_end: float
+
+
+class RollingWindow(object):
+    """Running aggregates of ``n_values`` columns over the last ``window_seconds``.
+
+    ``capacity`` bounds the rows held; at rates where the window holds more,
+    the oldest rows leave early and the window is effectively shorter.
+    Not thread-safe; the owner serialises access.
+    """
+
+    _SUMS = ("count", "sum", "sumsq", "sum_t", "sum_tt", "sum_ty")
+
+    def __init__(self, window_seconds: float, n_values: int, capacity: int) -> None:
+        if window_seconds <= 0:
+            raise ValueError("Rolling window must be positive.")
+        self.window_seconds = float(window_seconds)
+        self.n_values = int(n_values)
+        self.ring = RingBuffer(max(2 * BLOCK_ROWS, int(capacity)), 1 + self.n_values)
+        # Absolute ring position of the oldest row inside the window.
+        self._first = 0
+        self._n_blocks = self.ring.capacity // BLOCK_ROWS + 3
+        self._block_min = np.full((self._n_blocks, self.n_values), np.nan)
+        self._block_max = np.full((self._n_blocks, self.n_values), np.nan)
+        self._t_ref: float | None = None
+        self._y_ref = np.zeros(self.n_values)
+        self._sums = np.zeros((len(self._SUMS), self.n_values))
+        self._since_rebase = 0
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Add ``values[n, n_values]`` stamped with non-decreasing ``timestamps``."""
+        if timestamps.shape[0] == 0:
+            return
+        capacity = self.ring.capacity
+        if timestamps.shape[0] > capacity - 1:
+            timestamps, values = timestamps[-(capacity - 1):], values[-(capacity - 1):]
+        count = timestamps.shape[0]
+        # Rows about to be overwritten leave the window first.
+        overflow = self.ring.total_written + count - capacity - self._first
+        if overflow > 0:
+            self._expire(self._first + overflow)
+        if self._t_ref is None:
+            self._t_ref = float(timestamps[0])
+            self._y_ref = np.where(np.isfinite(values[0]), values[0], 0.0)
+
+        start = self.ring.total_written
+        self.ring.extend(np.column_stack((timestamps, values)))
+        self._accumulate(timestamps, values, 1.0)
+        self._update_blocks(start, values)
+        self._expire(self._position_of(float(timestamps[-1]) - self.window_seconds))
+
+        self._since_rebase += count
+        if self._since_rebase >= capacity:
+            self._rebase()
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        """Per-column ``count``, ``mean``, ``std``, ``min``, ``max`` and ``slope``
+        arrays, plus the window's ``t_start``/``t_end``."""
+        count, total, sumsq, sum_t, sum_tt, sum_ty = self._sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+            var = (sumsq - total * mean) / (count - 1)
+            slope = (count * sum_ty - sum_t * total) / (count * sum_tt - sum_t * sum_t)
+        lo, hi = self._first, self.ring.total_written
+        t_start = t_end = math.nan
+        if hi > lo:
+            t_start = float(self.ring.since(lo, 1)[1][0][0, 0])
+            t_end = float(self.ring.last()[0])
+        low, high = self._extremes(lo, hi)
+        return {
+            "count": count.astype(np.int64),
+            "mean": np.where(count > 0, mean + self._y_ref, np.nan),
+            "std": np.where(count > 1, np.sqrt(np.clip(var, 0.0, None)), np.nan),
+            "min": low,
+            "max": high,
+            "slope": np.where(count > 1, slope, np.nan),
+            "t_start": t_start,
+            "t_end": t_end,
+        }
+
+    def _position_of(self, t: float) -> int:
+        """Absolute ring position of the first window row with time >= ``t``."""
+        first, parts = self.ring.since(self._first)
+        for part in parts:
+            offset = int(np.searchsorted(part[:, 0], t, side="left"))
+            if offset < part.shape[0]:
+                return first + offset
+            first += part.shape[0]
+        return first
+
+    def _expire(self, index: int) -> None:
+        if index <= self._first:
+            return
+        _, parts = self.ring.since(self._first, index - self._first)
+        for part in parts:
+            self._accumulate(part[:, 0], part[:, 1:], -1.0)
+        self._first = index
+
+    def _accumulate(self, timestamps: np.ndarray, values: np.ndarray, sign: float) -> None:
+        dy = values - self._y_ref
+        finite = np.isfinite(dy)
+        dy = np.where(finite, dy, 0.0)
+        dt = np.where(finite, (timestamps - self._t_ref)[:, None], 0.0)
+        self._sums[0] += sign * finite.sum(axis=0)
+        self._sums[1] += sign * dy.sum(axis=0)
+        self._sums[2] += sign * np.einsum("ij,ij->j", dy, dy)
+        self._sums[3] += sign * dt.sum(axis=0)
+        self._sums[4] += sign * np.einsum("ij,ij->j", dt, dt)
+        self._sums[5] += sign * np.einsum("ij,ij->j", dt, dy)
+
+    def _rebase(self) -> None:
+        """Recompute the sums from the window rows around fresh references."""
+        count, total = self._sums[0], self._sums[1]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self._y_ref = np.where(count > 0, self._y_ref + total / count, self._y_ref)
+        self._since_rebase = 0
+        self._sums[:] = 0.0
+        _, parts = self.ring.since(self._first)
+        if not parts:
+            self._t_ref = None
+            return
+        self._t_ref = float(parts[0][0, 0])
+        for part in parts:
+            self._accumulate(part[:, 0], part[:, 1:], 1.0)
+
+    def _update_blocks(self, start: int, values: np.ndarray) -> None:
+        blocks = np.arange(start, start + values.shape[0]) // BLOCK_ROWS
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(blocks)) + 1))
+        lows = np.fmin.reduceat(values, starts, axis=0)
+        highs = np.fmax.reduceat(values, starts, axis=0)
+        slots = blocks[starts] % self._n_blocks
+        if start % BLOCK_ROWS:
+            # The first block was already partly filled by the previous call.
+            lows[0] = np.fmin(lows[0], self._block_min[slots[0]])
+            highs[0] = np.fmax(highs[0], self._block_max[slots[0]])
+        self._block_min[slots] = lows
+        self._block_max[slots] = highs
+
+    def _extremes(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+        low = np.full(self.n_values, np.nan)
+        high = np.full(self.n_values, np.nan)
+        first_full = -(-lo // BLOCK_ROWS)
+        last_full = hi // BLOCK_ROWS
+        if last_full > first_full:
+            slots = np.arange(first_full, last_full) % self._n_blocks
+            low = np.fmin.reduce(self._block_min[slots], axis=0)
+            high = np.fmax.reduce(self._block_max[slots], axis=0)
+            edges = ((lo, first_full * BLOCK_ROWS), (last_full * BLOCK_ROWS, hi))
+        else:
+            edges = ((lo, hi),)
+        for edge_lo, edge_hi in edges:
+            _, parts = self.ring.since(edge_lo, edge_hi - edge_lo)
+            for part in parts:
+                low = np.fmin(low, np.fmin.reduce(part[:, 1:], axis=0))
+                high = np.fmax(high, np.fmax.reduce(part[:, 1:], axis=0))
+        return low, high
@@ -1,5 +1,7 @@
 import json
-from typing import List
+from typing import Dict, List, Optional
+
+import numpy as np
 
 class Sensor(object):
     def __init__(self, name, properties=None):
@@ -89,3 +91,119 @@ class Sensor(object):
                     + self.cal_coeff_0
         else:
             return None
+
+
+class SensorBank(object):
+    """Vectorised strain/temperature conversion for a fixed set of gratings.
+
+    The per-grating constants of :class:`Sensor` are held in arrays aligned
+    with the wavelength columns, so a whole ``[n_samples, n_sensors]`` block
+    converts in one call. Strain gratings are thermally compensated with the
+    temperature change measured by the bank's temperature gratings (their mean
+    unless ``compensation`` maps a strain column to a specific temperature
+    column), relative to the temperature at the last :meth:`zero`.
+    """
+
+    STRAIN = "strain"
+    BARE_STRAIN = "bare strain"
+    TEMPERATURE = "temperature"
+
+    def __init__(self, sensors: List[Sensor], compensation: Optional[Dict[int, int]] = None):
+        self.names = [sensor.name for sensor in sensors]
+        kinds = [(sensor.type or "").lower() for sensor in sensors]
+        self.is_strain = np.array([kind == self.STRAIN for kind in kinds], dtype=bool)
+        self.is_bare_strain = np.array([kind == self.BARE_STRAIN for kind in kinds], dtype=bool)
+        self.is_temperature = np.array([kind == self.TEMPERATURE for kind in kinds], dtype=bool)
+
+        def column(attr, default=np.nan):
+            values = [getattr(sensor, attr, None) for sensor in sensors]
+            return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+        self.nominal_wavelength = column("nominal_wavelength")
+        self.initial_wavelength = column("initial_wavelength")
+        missing = np.isnan(self.initial_wavelength)
+        self.initial_wavelength[missing] = self.nominal_wavelength[missing]
+        self.gage_factor = column("gage_factor", 1.0)
+        self.ke = column("ke", 1.0)
+        # Thermal output per kelvin, as in Sensor.strain; unknown terms count as 0.
+        self.thermal_coefficient = (
+            column("gage_constant_1", 0.0) / self.gage_factor
+            + column("cte_specimen", 0.0)
+            - column("gage_constant_2", 0.0)
+        )
+        self.wavelength_offset = column("wavelength_offset", 0.0)
+        # Rows are polynomial coefficients, highest power first (np.polyval order).
+        self.calibration = np.stack(
+            [column("cal_coeff_3"), column("cal_coeff_2"), column("cal_coeff_1"), column("cal_coeff_0")]
+        )
+        self.reference_temperature = np.full(len(sensors), np.nan)
+
+        self._temperature_columns = np.flatnonzero(self.is_temperature)
+        self._compensation = dict(compensation or {})
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def units(self) -> List[str]:
+        """Unit of each column returned by :meth:`convert`."""
+        units = []
+        for strain, bare, temp in zip(self.is_strain, self.is_bare_strain, self.is_temperature):
+            units.append("ustrain" if strain else "strain" if bare else "degC" if temp else "nm")
+        return units
+
+    def zero(self, wavelengths: np.ndarray) -> None:
+        """Take ``wavelengths`` (one row or a block, averaged) as the unstrained state."""
+        block = np.atleast_2d(np.asarray(wavelengths, dtype=np.float64))
+        with np.errstate(all="ignore"):
+            reference = np.nanmean(block, axis=0)
+        usable = np.isfinite(reference)
+        strained = (self.is_strain | self.is_bare_strain) & usable
+        self.initial_wavelength[strained] = reference[strained]
+        temperature = self.temperature(reference[np.newaxis, :])[0]
+        self.reference_temperature = np.where(self.is_temperature, temperature, np.nan)
+
+    def temperature(self, wavelengths: np.ndarray) -> np.ndarray:
+        """Temperature of every grating (NaN for non-temperature columns)."""
+        block = np.asarray(wavelengths, dtype=np.float64)
+        shifted = block + self.wavelength_offset
+        c3, c2, c1, c0 = self.calibration
+        result = ((c3 * shifted + c2) * shifted + c1) * shifted + c0
+        return np.where(self.is_temperature, result, np.nan)
+
+    def temperature_change(self, wavelengths: np.ndarray) -> np.ndarray:
+        """Per-sample, per-column temperature change used for compensation.
+
+        Zero when the bank has no temperature gratings or :meth:`zero` has
+        not been called.
+        """
+        block = np.asarray(wavelengths, dtype=np.float64)
+        change = np.zeros(block.shape, dtype=np.float64)
+        columns = self._temperature_columns
+        if columns.size == 0 or not np.isfinite(self.reference_temperature[columns]).any():
+            return change
+        delta = self.temperature(block)[..., columns] - self.reference_temperature[columns]
+        with np.errstate(all="ignore"):
+            mean_delta = np.nanmean(delta, axis=-1)
+        change[...] = np.nan_to_num(mean_delta)[..., np.newaxis]
+        for strain_col, temp_col in self._compensation.items():
+            change[..., strain_col] = delta[..., list(columns).index(temp_col)]
+        return change
+
+    def strain(self, wavelengths: np.ndarray) -> np.ndarray:
+        """Strain of every grating: microstrain for "strain" gratings
+        (thermally compensated), strain for "bare strain", NaN otherwise."""
+        block = np.asarray(wavelengths, dtype=np.float64)
+        relative = (block - self.initial_wavelength) / self.initial_wavelength
+        compensated = relative * 1e6 / self.gage_factor
+        if self._temperature_columns.size:
+            compensated = compensated - self.temperature_change(block) * self.thermal_coefficient
+        result = np.where(self.is_strain, compensated, np.nan)
+        return np.where(self.is_bare_strain, relative / self.ke, result)
+
+    def convert(self, wavelengths: np.ndarray) -> np.ndarray:
+        """Engineering units for every column (see :attr:`units`)."""
+        block = np.asarray(wavelengths, dtype=np.float64)
+        result = np.where(self.is_temperature, self.temperature(block), block)
+        strained = self.is_strain | self.is_bare_strain
+        return np.where(strained, self.strain(block), result)
@@ -0,0 +1,157 @@
+"""Streaming short-time Fourier transform for live spectrogram images.
+
+:class:`StreamingSpectrogram` keeps the image as a rolling buffer of columns
+and, as samples arrive, transforms only the segments that became complete,
+so a refresh costs O(new samples) however long the displayed history is.
+Columns match ``scipy.signal.spectrogram`` with its defaults (Tukey(0.25)
+window, constant detrend, one-sided PSD) and are stored in dB, cropped to
+``max_freq``.
+
+The column buffer is written twice, at ``i`` and ``i + capacity``, so the
+newest ``capacity`` columns are always one contiguous slice and
+:meth:`StreamingSpectrogram.image` never copies.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+# Added to the PSD before taking dB, so silent bins stay finite.
+_DB_FLOOR = 1e-12
+
+
+class StreamingSpectrogram(object):
+    """Rolling spectrogram of one channel over the last ``span_seconds``.
+
+    ``noverlap`` samples are shared by consecutive segments of ``nperseg``;
+    each new column needs ``nperseg - noverlap`` new samples. NaN samples
+    (e.g. a peak not found) count as the segment mean.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float,
+        nperseg: int,
+        noverlap: int,
+        max_freq: float,
+        span_seconds: float,
+    ) -> None:
+        if sample_rate <= 0 or span_seconds <= 0:
+            raise ValueError("Sample rate and span must be positive.")
+        if nperseg <= 8 or not 0 <= noverlap < nperseg:
+            raise ValueError("Spectrogram needs nperseg > 8 and 0 <= noverlap < nperseg.")
+        self.sample_rate = float(sample_rate)
+        self.nperseg = int(nperseg)
+        self.hop = self.nperseg - int(noverlap)
+        self.frequencies = np.fft.rfftfreq(self.nperseg, 1.0 / self.sample_rate)
+        self.frequencies = self.frequencies[self.frequencies <= max_freq]
+        n_freq = self.frequencies.shape[0]
+
+        window = signal.get_window(("tukey", 0.25), self.nperseg)
+        self._window = window
+        # One-sided PSD density scaling; DC (and Nyquist) are not doubled.
+        self._scale = np.full(n_freq, 2.0 / (self.sample_rate * float(np.sum(window * window))))
+        self._scale[0] /= 2.0
+        if self.nperseg % 2 == 0 and n_freq == self.nperseg // 2 + 1:
+            self._scale[-1] /= 2.0
+
+        self.capacity = max(1, math.ceil(span_seconds * self.sample_rate / self.hop))
+        self._columns = np.full((2 * self.capacity, n_freq), np.nan, dtype=np.float32)
+        self._written = 0
+        # Samples not yet covered by a column's hop, with their times.
+        self._pending = np.empty(0)
+        self._pending_times = np.empty(0)
+        # Preallocated segment workspace, grown to the largest batch seen.
+        self._work = np.empty((0, self.nperseg))
+        # Device time at the centre of the newest column.
+        self.t_last = math.nan
+        self.levels: Tuple[float, float] = (math.nan, math.nan)
+
+    def reset(self) -> None:
+        self._columns[:] = np.nan
+        self._written = 0
+        self._pending = np.empty(0)
+        self._pending_times = np.empty(0)
+        self.t_last = math.nan
+        self.levels = (math.nan, math.nan)
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> int:
+        """Add samples and transform every segment they complete; return new columns.
+
+        Time running backwards (a rebuilt history) restarts the image.
+        """
+        if timestamps.shape[0] == 0:
+            return 0
+        if self._pending_times.shape[0] and timestamps[0] < self._pending_times[-1]:
+            self.reset()
+        samples = np.concatenate((self._pending, values))
+        times = np.concatenate((self._pending_times, timestamps))
+        count = (samples.shape[0] - self.nperseg) // self.hop + 1
+        if count <= 0:
+            self._pending, self._pending_times = samples, times
+            return 0
+        # Only the newest ``capacity`` columns can be shown.
+        skip = max(0, count - self.capacity)
+        start = skip * self.hop
+        consumed = count * self.hop
+        segments = sliding_window_view(samples[start:], self.nperseg)[:: self.hop][: count - skip]
+        self._append(self._transform(segments))
+        self.t_last = float(times[(count - 1) * self.hop + self.nperseg // 2])
+        self._pending = samples[consumed:]
+        self._pending_times = times[consumed:]
+        return count - skip
+
+    def image(self) -> np.ndarray:
+        """``[columns, frequencies]`` dB image, oldest column first (a view)."""
+        filled = min(self._written, self.capacity)
+        head = self._written % self.capacity
+        return self._columns[head + self.capacity - filled:head + self.capacity]
+
+    def extent(self) -> Tuple[float, float, float, float]:
+        """``(t0, column width, f0, bin height)`` placing :meth:`image` on device time."""
+        width = self.hop / self.sample_rate
+        columns = min(self._written, self.capacity)
+        step = float(self.frequencies[1]) if self.frequencies.shape[0] > 1 else 1.0
+        return self.t_last - (columns - 0.5) * width, width, -0.5 * step, step
+
+    def _transform(self, segments: np.ndarray) -> np.ndarray:
+        count = segments.shape[0]
+        if self._work.shape[0] < count:
+            self._work = np.empty((count, self.nperseg))
+        work = self._work[:count]
+        missing = np.isnan(segments)
+        if missing.any():
+            present = np.where(missing, 0.0, segments)
+            counts = np.maximum(1, self.nperseg - missing.sum(axis=1, keepdims=True))
+            np.subtract(present, present.sum(axis=1, keepdims=True) / counts, out=work)
+            work[missing] = 0.0
+        else:
+            np.subtract(segments, segments.mean(axis=1, keepdims=True), out=work)
+        work *= self._window
+        spectrum = np.fft.rfft(work, axis=1)[:, : self.frequencies.shape[0]]
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        power *= self._scale
+        return 10.0 * np.log10(power + _DB_FLOOR)
+
+    def _append(self, columns: np.ndarray) -> None:
+        n = columns.shape[0]
+        slots = (self._written + np.arange(n)) % self.capacity
+        self._columns[slots] = columns
+        self._columns[slots + self.capacity] = columns
+        self._written += n
+        if self._written > self.capacity:
+            # Older extremes may have scrolled out; rescan the (small) image.
+            image = self.image()
+            self.levels = (float(image.min()), float(image.max()))
+        elif self._written == n:
+            self.levels = (float(columns.min()), float(columns.max()))
+        else:
+            self.levels = (
+                min(self.levels[0], float(columns.min())),
+                max(self.levels[1], float(columns.max())),
+            )
@@ -1,15 +1,51 @@
 from __future__ import annotations
 
+import os
+import tempfile
 import threading
 import time
 from collections import deque
-from itertools import islice
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
 
 import numpy as np
 
+from .capture import RawCaptureWriter
 from .config import InterrogatorSettings
+from .continuity import CounterTracker, LossHistory
+from .downsample import DOWNSAMPLE_MODES, downsample
 from .interrogator import Interrogator
+from .metrics import REGISTRY
+from .protocol import SKIP_FRAME_ERROR, FrameBatch
+from .recorder import ChunkedRecorder, load_recording
+from .ringbuffer import RingBuffer
+from .rolling import DEFAULT_ROLLING_WINDOWS, RollingSummary, RollingWindow
+from .sensor import SensorBank
+from .tiers import DEFAULT_HISTORY_TIERS, TIER_STATS, TieredHistory, merge_buckets, tier_columns
+from .timebase import ClockMapping
+
+# Recorded rows hold device time and mapped host time ahead of the sensor values.
+RECORDING_TIME_COLUMNS = 2
+# Upper bound on device-buffer entries pulled per round-trip in buffered mode.
+BUFFER_READ_FRAMES = 1000
+# A socket silent for this long is treated as dead and reconnected.
+READ_TIMEOUT_S = 2.0
+# Reconnect delays double from the first to the last, in seconds.
+RECONNECT_INITIAL_S = 0.25
+RECONNECT_MAX_S = 10.0
+# Non-connection read errors back off from ERROR_BACKOFF_S, doubling up to
+# ERROR_BACKOFF_MAX_S, and force a reconnect after MAX_CONSECUTIVE_ERRORS.
+ERROR_BACKOFF_S = 0.005
+ERROR_BACKOFF_MAX_S = 0.5
+MAX_CONSECUTIVE_ERRORS = 10
+# Seconds between rate/health updates in the metrics registry.
+METRICS_INTERVAL_S = 1.0
+# What a subscription does when its unread backlog exceeds ``max_backlog``.
+OVERFLOW_POLICIES = ("drop_oldest", "raise")
+
+
+class SubscriptionOverflow(RuntimeError):
+    """Unread samples were discarded from a ``overflow="raise"`` subscription."""
 
 
 class FBGStreamReader(threading.Thread):
@@ -19,10 +55,29 @@ class FBGStreamReader(threading.Thread):
         self,
         interr_cfg: InterrogatorSettings,
         history_seconds: float,
+        batch_frames: int = 256,
+        history_tiers: Sequence[Tuple[float, float]] = DEFAULT_HISTORY_TIERS,
+        rolling_windows: Sequence[float] = DEFAULT_ROLLING_WINDOWS,
     ) -> None:
+        """``batch_frames`` caps how many buffered frames are drained and
+        appended per loop iteration; ``1`` processes one frame at a time.
+        ``history_tiers`` lists ``(bucket seconds, span seconds)`` of the
+        decimated history kept beyond the raw one (see :meth:`history`).
+        ``rolling_windows`` are the spans, in seconds, of the rolling
+        statistics kept up to date (see :meth:`rolling_stats`)."""
         super().__init__(daemon=True)
         self._interr_cfg = interr_cfg
         self._history_seconds = history_seconds
+        self._batch_frames = max(1, int(batch_frames))
+        if interr_cfg.acquisition_mode not in ("stream", "buffered", "replay"):
+            raise ValueError(f"Unsupported acquisition mode: {interr_cfg.acquisition_mode!r}")
+        self._buffered = interr_cfg.acquisition_mode == "buffered"
+        self._replay = interr_cfg.acquisition_mode == "replay"
+        if self._replay and not interr_cfg.replay_path:
+            raise ValueError("Replay mode requires replay_path.")
+        # Interrogator settings last applied to the device, kept across
+        # connections so a reconnect only resends what changed.
+        self._applied_settings: Dict[str, str] = {}
 
         self.interrogator: Interrogator | None = None
         self.sensor_names: List[str] = [sensor.name for sensor in interr_cfg.sensors]
@@ -37,18 +92,43 @@ class FBGStreamReader(threading.Thread):
         # Use 3× safety margin: 2000 Hz × 3 × history_seconds
         history_size = max(1, int(self._estimated_rate * history_seconds * 3.0))
         self._history_samples = history_size
-        self._history: Dict[str, deque[float]] = {
-            name: deque(maxlen=self._history_samples) for name in self.sensor_names
+        # Rows are [device_time, sensor values...] in sensor_names order.
+        self._ring = RingBuffer(self._history_samples, 1 + len(self.sensor_names))
+        # (key, timestamps, values) of the last reduced snapshot.
+        self._reduced: Tuple | None = None
+        # Per tier bucket width: (key, merged complete buckets) of the last
+        # budgeted history() read from that tier.
+        self._tier_reduced: Dict[float, Tuple] = {}
+        self._history_tiers = list(history_tiers)
+        self._tiers = TieredHistory(self._history_tiers, len(self.sensor_names))
+        self._rolling: Dict[float, RollingWindow] = {
+            float(seconds): self._new_rolling_window(float(seconds)) for seconds in rolling_windows
         }
-        self._timestamps: deque[float] = deque(maxlen=self._history_samples)
         self._lock = threading.Lock()
+        # Signalled on every appended block, for blocking subscription reads.
+        self._data_ready = threading.Condition(self._lock)
 
         self._stop_event = threading.Event()
         self._ready_event = threading.Event()
 
-        self._recording = False
-        self._recorded_rows: List[List[float]] = []
+        self._recorder: ChunkedRecorder | None = None
         self._start_time: float | None = None
+        self._device_origin: float | None = None
+        # Set by a reconnect that keeps the history; the next batch then
+        # continues the time axis from the last sample seen (device and
+        # host time) and marks the outage.
+        self._resume_pending = False
+        self._last_device_time: float | None = None
+        self._last_host_time = 0.0
+        self.clock = ClockMapping()
+        self._counters = CounterTracker()
+        self._loss_history = LossHistory()
+        self._gaps: deque[Tuple[float, int]] = deque(maxlen=4096)
+        self._capture_lock = threading.Lock()
+        self._capture: RawCaptureWriter | None = None
+        self.sensor_bank: SensorBank | None = None
+        self._init_metrics()
+        self._zero_pending = True
         self._last_cycle_time: float = 0.0
         self.error_count = 0
         self.error: str | None = None
@@ -63,6 +143,11 @@ class FBGStreamReader(threading.Thread):
     def is_ready(self) -> bool:
         return self._ready_event.is_set()
 
+    @property
+    def start_time(self) -> float:
+        """Host ``perf_counter`` time the stream became ready; 0 on the :meth:`to_host_time` axis."""
+        return self._start_time or 0.0
+
     def wait_until_ready(self, timeout: float | None = None) -> bool:
         return self._ready_event.wait(timeout=timeout)
 
@@ -80,99 +165,472 @@ class FBGStreamReader(threading.Thread):
         except Exception:
             pass
         
+        # Supervise the connection. Failing to connect at all (wrong address,
+        # device off) ends the thread with ``error`` set, as callers waiting
+        # for readiness expect. Once streaming has started, any failure shuts
+        # the connection down and reconnects with exponential backoff until
+        # stopped, keeping the history and marking the outage as a gap.
+        # A raw capture spans reconnects and is closed only when the thread
+        # exits for good.
+        attempt = 0
         try:
-            self._open_connection()
-        except Exception as exc:
-            self.error = f"{type(exc).__name__}: {exc}"
-            self._shutdown_connection()
-            return
-
-        try:
-            self._stream_loop()
-        except Exception as exc:
-            self.error = f"{type(exc).__name__}: {exc}"
+            while not self._stop_event.is_set():
+                try:
+                    self._open_connection(resume=self._ready_event.is_set())
+                    self.error = None
+                    attempt = 0
+                    self._metric_connected.set(1)
+                    self._stream_loop()
+                    finished = True
+                except Exception as exc:
+                    self.error = f"{type(exc).__name__}: {exc}"
+                    finished = False
+                finally:
+                    self._metric_connected.set(0)
+                    self._shutdown_connection()
+                if finished or self._replay or not self._ready_event.is_set():
+                    return
+                delay = min(RECONNECT_MAX_S, RECONNECT_INITIAL_S * 2.0 ** attempt)
+                attempt += 1
+                self._metric_reconnects.inc()
+                self._metric_reconnect_delay.set(delay)
+                self.error = f"{self.error}; reconnecting in {delay:.2f} s"
+                self._stop_event.wait(delay)
         finally:
-            self._shutdown_connection()
+            self.stop_raw_capture()
 
     def stop(self) -> None:
         self._stop_event.set()
         if self.is_alive():
             self.join(timeout=2.0)
 
-    def start_recording(self) -> None:
+    @property
+    def recording_columns(self) -> List[str]:
+        return ["time_seconds", "host_time_seconds"] + self.sensor_names
+
+    def start_recording(self, path: Path | None = None) -> Path:
+        """Record every sample to ``path`` (a temporary ``.npy`` by default).
+
+        Rows are ``[device time, host time, sensor values...]``; see
+        :mod:`fbg.recorder` for the file format.
+        """
+        if path is None:
+            handle, name = tempfile.mkstemp(prefix="fbg_recording_", suffix=".npy")
+            os.close(handle)
+            path = Path(name)
+        recorder = ChunkedRecorder(path, self.recording_columns)
         with self._lock:
-            self._recording = True
-            self._recorded_rows = []
+            previous, self._recorder = self._recorder, recorder
+        if previous is not None:
+            previous.close()
+        return recorder.path
 
-    def stop_recording(self) -> List[List[float]]:
+    def stop_recording(self) -> Path | None:
+        """Stop recording; returns the finished file, or ``None`` if nothing was recorded."""
         with self._lock:
-            self._recording = False
-            rows = list(self._recorded_rows)
-            self._recorded_rows = []
-        return rows
+            recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return None
+        try:
+            path = recorder.close()
+        except OSError as exc:
+            # The file still holds every row written before the failure.
+            print(f"[FBGStreamReader] {exc}")
+            path = recorder.path
+        if recorder.rows_written == 0:
+            path.unlink(missing_ok=True)
+            return None
+        return path
+
+    def start_raw_capture(self, path: Path) -> None:
+        """Log every undecoded frame to ``path`` (see :mod:`fbg.capture`)."""
+        writer = RawCaptureWriter(path)
+        with self._capture_lock:
+            previous, self._capture = self._capture, writer
+        if previous is not None:
+            previous.close()
+
+    def stop_raw_capture(self) -> Path | None:
+        with self._capture_lock:
+            writer, self._capture = self._capture, None
+        if writer is None:
+            return None
+        writer.close()
+        return writer.path
+
+    def subscribe(
+        self,
+        max_backlog: int | None = None,
+        overflow: str = "drop_oldest",
+        from_start: bool = False,
+    ) -> "Subscription":
+        """Return a cursor that yields only samples appended since its last read.
+
+        Unlike :meth:`snapshot`, each read copies just the new rows, so any
+        number of consumers cost O(new data). At most ``max_backlog`` unread
+        rows are kept for a subscriber (never more than the history); older
+        ones are skipped and counted in :attr:`Subscription.dropped`, or, with
+        ``overflow="raise"``, reported by the next read raising
+        :class:`SubscriptionOverflow`. Slow subscribers never hold up
+        acquisition. ``from_start`` begins with the history already held.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow!r}")
+        with self._lock:
+            cursor = 0 if from_start else self._ring.total_written
+            return Subscription(self, self._ring, cursor, max_backlog, overflow)
+
+    def _read_subscription(
+        self,
+        subscription: "Subscription",
+        max_rows: int | None,
+        timeout: float | None,
+    ) -> Tuple[np.ndarray, List[str], int]:
+        """Copy a subscriber's unread rows; returns ``(block, names, lost)``."""
+        with self._data_ready:
+            if subscription._ring is not self._ring:
+                # History was rebuilt on reconnect; start over on the new one.
+                subscription._ring = self._ring
+                subscription._cursor = 0
+            if timeout and self._ring.total_written <= subscription._cursor:
+                self._data_ready.wait(timeout)
+            ring = self._ring
+            limit = ring.capacity
+            if subscription.max_backlog:
+                limit = min(limit, subscription.max_backlog)
+            lost = max(0, ring.total_written - subscription._cursor - limit)
+            first, parts = ring.since(subscription._cursor + lost, max_rows)
+            lost = first - subscription._cursor
+            if lost and subscription.overflow == "raise":
+                # Report the loss before handing out anything past it.
+                subscription._cursor = first
+                return np.empty((0, ring.columns)), list(self.sensor_names), lost
+            if len(parts) == 1:
+                block = parts[0].copy()
+            elif parts:
+                block = np.concatenate(parts)
+            else:
+                block = np.empty((0, ring.columns))
+            subscription._cursor = first + block.shape[0]
+            return block, list(self.sensor_names), lost
 
     def latest_sample(self) -> Tuple[float, Dict[str, float]]:
         with self._lock:
-            if not self._timestamps:
-                return float("nan"), {}
-            timestamp = float(self._timestamps[-1])
-            latest = {
-                name: (float(values[-1]) if values else float("nan"))
-                for name, values in self._history.items()
-            }
-        return timestamp, latest
+            row = self._ring.last()
+            names = list(self.sensor_names)
+        if row is None:
+            return float("nan"), {}
+        return float(row[0]), dict(zip(names, row[1:].tolist()))
+
+    def add_rolling_window(self, window_seconds: float) -> None:
+        """Keep rolling statistics over ``window_seconds`` from now on.
+
+        The window is seeded from the raw history, so it can be queried
+        straight away. Adding an existing window does nothing.
+        """
+        window_seconds = float(window_seconds)
+        with self._lock:
+            if window_seconds not in self._rolling:
+                self._rolling[window_seconds] = self._new_rolling_window(window_seconds)
+
+    def rolling_stats(
+        self,
+        window_seconds: float | None = None,
+        sensors: Sequence[str] | None = None,
+    ) -> Dict[str, RollingSummary]:
+        """Statistics of every sample in the last ``window_seconds`` per sensor.
 
-    def snapshot(self, max_points: int | None = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        Uses every sample and costs the same whatever the window length;
+        ``None`` picks the first configured window.
+        """
         with self._lock:
-            total = len(self._timestamps)
-            if max_points is not None and max_points > 0 and total > int(max_points):
-                start = total - int(max_points)
+            if not self._rolling:
+                raise ValueError("No rolling windows are configured; call add_rolling_window() first.")
+            if window_seconds is None:
+                window = next(iter(self._rolling.values()))
+            elif float(window_seconds) in self._rolling:
+                window = self._rolling[float(window_seconds)]
             else:
-                start = 0
-
-            count = total - start
-            if count <= 0:
-                return np.array([]), {name: np.array([], dtype=np.float64) for name in self.sensor_names}
-
-            ts_iter = self._timestamps if start == 0 else islice(self._timestamps, start, total)
-            timestamps = np.fromiter(ts_iter, dtype=np.float64, count=count)
-
-            series: Dict[str, np.ndarray] = {}
-            for name in self.sensor_names:
-                values = self._history.get(name)
-                if values is None or len(values) == 0:
-                    series[name] = np.full(count, np.nan, dtype=np.float64)
-                    continue
-
-                n_values = len(values)
-                take = min(count, n_values)
-                v_start = n_values - take
-                v_iter = values if v_start == 0 else islice(values, v_start, n_values)
-                arr = np.fromiter(v_iter, dtype=np.float64, count=take)
-                if take < count:
-                    padded = np.full(count, np.nan, dtype=np.float64)
-                    padded[-take:] = arr
-                    arr = padded
-                series[name] = arr
-        
-        # Diagnostic: print actual acquisition rate periodically
-        if len(timestamps) > 10 and hasattr(self, '_last_diagnostic_time'):
-            now = time.perf_counter()
-            if now - self._last_diagnostic_time > 5.0:  # Every 5 seconds
-                if len(timestamps) >= 2:
-                    actual_rate = len(timestamps) / (timestamps[-1] - timestamps[0]) if timestamps[-1] > timestamps[0] else 0
-                    print(f"[FBGStreamReader] Buffer: {len(timestamps)} samples, actual rate: {actual_rate:.1f} Hz")
-                self._last_diagnostic_time = now
-        elif not hasattr(self, '_last_diagnostic_time'):
-            self._last_diagnostic_time = time.perf_counter()
-        
+                raise ValueError(
+                    f"No rolling window of {window_seconds} s; call add_rolling_window() first."
+                )
+            summary = window.summary()
+            names = list(self.sensor_names)
+        stats: Dict[str, RollingSummary] = {}
+        for idx, name in enumerate(names):
+            if sensors is not None and name not in sensors:
+                continue
+            stats[name] = RollingSummary(
+                count=int(summary["count"][idx]),
+                mean=float(summary["mean"][idx]),
+                std=float(summary["std"][idx]),
+                minimum=float(summary["min"][idx]),
+                maximum=float(summary["max"][idx]),
+                slope=float(summary["slope"][idx]),
+                t_start=summary["t_start"],
+                t_end=summary["t_end"],
+            )
+        return stats
+
+    def _new_rolling_window(self, window_seconds: float) -> RollingWindow:
+        # Sized like the raw history, for the bursty delivery rate.
+        capacity = int(self.sample_rate * window_seconds * 3.0) + 1
+        window = RollingWindow(window_seconds, len(self.sensor_names), capacity)
+        block = self._ring.latest(window.ring.capacity - 1)
+        if block.shape[0]:
+            window.extend(block[:, 0], block[:, 1:])
+        return window
+
+    def gaps(self, since: float | None = None) -> List[Tuple[float, int]]:
+        """Return ``(timestamp, lost_frames)`` for each detected gap in the stream.
+
+        ``timestamp`` is the device time of the first frame after the gap.
+        """
+        with self._lock:
+            gaps = list(self._gaps)
+        if since is not None:
+            gaps = [gap for gap in gaps if gap[0] >= since]
+        return gaps
+
+    def loss_statistics(self, seconds: int | None = 60) -> np.ndarray:
+        """Per-second ``[second, received, lost, duplicates]`` rows, oldest first."""
+        with self._lock:
+            return self._loss_history.as_array(seconds)
+
+    def metrics(self) -> Dict[str, float]:
+        """Counters describing stream health, suitable for display or logging."""
+        with self._lock:
+            recent = self._loss_history.as_array(2)
+            gap_count = len(self._gaps)
+        counters = self._counters
+        expected = counters.received + counters.lost
+        # The newest second is still filling; report the last complete one.
+        last = recent[0] if recent.shape[0] == 2 else np.zeros(4, dtype=np.int64)
+        interrogator = self.interrogator
+        return {
+            "frames_received": float(counters.received),
+            "frames_lost": float(counters.lost),
+            "frames_duplicated": float(counters.duplicates),
+            "loss_ratio": float(counters.lost) / expected if expected else 0.0,
+            "gap_count": float(gap_count),
+            "last_second_received": float(last[1]),
+            "last_second_lost": float(last[2]),
+            "stream_resyncs": float(interrogator.stream_resync_count if interrogator else 0),
+            "read_errors": float(self.error_count),
+        }
+
+    def _init_metrics(self) -> None:
+        """Handles on this reader's entries in :data:`fbg.metrics.REGISTRY`."""
+        self.metrics_prefix = f"fbg.{self._interr_cfg.ip_address}:{self._interr_cfg.port}"
+        prefix = self.metrics_prefix
+        self._metric_frames = REGISTRY.counter(f"{prefix}.frames")
+        self._metric_errors = REGISTRY.counter(f"{prefix}.read_errors")
+        self._metric_loop = REGISTRY.histogram(f"{prefix}.loop_s")
+        self._metric_lock_wait = REGISTRY.histogram(f"{prefix}.lock_wait_s")
+        self._metric_rate = REGISTRY.gauge(f"{prefix}.sample_rate_hz")
+        self._metric_connected = REGISTRY.gauge(f"{prefix}.connected")
+        self._metric_reconnects = REGISTRY.counter(f"{prefix}.reconnects")
+        self._metric_reconnect_delay = REGISTRY.gauge(f"{prefix}.reconnect_delay_s")
+        self._metric_sample = f"{prefix}.sample"
+
+    def _publish_metrics(self) -> None:
+        """Copy :meth:`metrics` and the recorder state into the registry."""
+        prefix = self.metrics_prefix
+        health = self.metrics()
+        for key in ("frames_lost", "frames_duplicated", "loss_ratio", "gap_count", "stream_resyncs"):
+            REGISTRY.gauge(f"{prefix}.{key}").set(health[key])
+        recorder = self._recorder
+        REGISTRY.gauge(f"{prefix}.recorder_pending_chunks").set(
+            recorder.pending_chunks if recorder is not None else 0
+        )
+        REGISTRY.gauge(f"{prefix}.recorder_failed").set(
+            int(recorder is not None and recorder.error is not None)
+        )
+
+    def to_host_time(self, timestamps):
+        """Map device-clock sample times onto the host ``perf_counter`` axis.
+
+        The result is relative to the moment the stream became ready, so it
+        lines up with other host-timed readers in the same process.
+        """
+        return self.clock.to_host(timestamps) - (self._start_time or 0.0)
+
+    def from_host_time(self, timestamps):
+        """Inverse of :meth:`to_host_time`."""
+        return self.clock.to_device(np.asarray(timestamps, dtype=np.float64) + (self._start_time or 0.0))
+
+    def snapshot(
+        self,
+        max_points: int | None = None,
+        time_base: str = "device",
+        units: str = "wavelength",
+        mode: str | None = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return the most recent history as ``(timestamps, series)``.
+
+        Timestamps are the interrogator's kernel clock, in seconds since the
+        first streamed frame. ``time_base="host"`` maps them onto the host
+        clock instead (see :meth:`to_host_time`). ``units="engineering"``
+        converts wavelengths to strain/temperature via :attr:`sensor_bank`.
+
+        By default ``max_points`` keeps the newest points. With ``mode``
+        (``"minmax"`` or ``"lttb"``, see :mod:`fbg.downsample`) the whole
+        history is instead reduced to at most ``max_points``, e.g. twice the
+        plot width in pixels. The reduction is cached until new data
+        arrives, and the returned arrays are then read-only.
+        """
+        if time_base not in ("device", "host"):
+            raise ValueError(f"Unsupported time base: {time_base!r}")
+        if units not in ("wavelength", "engineering"):
+            raise ValueError(f"Unsupported units: {units!r}")
+        if mode is not None and mode not in DOWNSAMPLE_MODES:
+            raise ValueError(f"Unsupported downsampling mode: {mode!r}")
+        reduce = mode is not None and bool(max_points) and max_points > 0
+        with self._lock:
+            names = list(self.sensor_names)
+            key = (mode, max_points, self._ring, self._ring.total_written)
+            cached = self._reduced if reduce and self._reduced and self._reduced[0] == key else None
+            if cached is None:
+                # One memcpy of at most two contiguous slices; the lock is
+                # only held for the copy.
+                block = self._ring.latest(
+                    max_points if not reduce and max_points and max_points > 0 else None
+                )
+        if cached is not None:
+            timestamps, values = cached[1], cached[2]
+        elif reduce:
+            timestamps, values = downsample(block[:, 0], block[:, 1:], max_points, mode)
+            timestamps.flags.writeable = False
+            values.flags.writeable = False
+            self._reduced = (key, timestamps, values)
+        else:
+            timestamps, values = block[:, 0], block[:, 1:]
+        if timestamps.shape[0] == 0:
+            return np.array([]), {name: np.array([], dtype=np.float64) for name in names}
+        series: Dict[str, np.ndarray] = {
+            name: values[:, idx] for idx, name in enumerate(names)
+        }
+
+        if time_base == "host":
+            timestamps = self.to_host_time(timestamps)
+        if units == "engineering":
+            series = self.to_engineering_units(series)
         return timestamps, series
 
+    def to_engineering_units(self, series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Convert wavelength ``series`` keyed by sensor name in one vectorised call."""
+        bank = self.sensor_bank
+        if bank is None or not series:
+            return series
+        block = np.column_stack([series[name] for name in bank.names])
+        converted = bank.convert(block)
+        return {name: converted[:, idx] for idx, name in enumerate(bank.names)}
+
+    def query(
+        self,
+        t_start: float,
+        t_end: float,
+        sensors: Sequence[str] | None = None,
+        time_base: str = "device",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Every sample with ``t_start <= time <= t_end``, as ``(timestamps, series)``.
+
+        The raw history is binary-searched on its timestamps, so only the
+        span is copied. The part of the span older than the raw history is
+        read from the active recording, if any. ``time_base="host"`` takes and returns
+        times on the :meth:`to_host_time` axis. ``sensors`` limits the
+        returned series.
+        """
+        if time_base not in ("device", "host"):
+            raise ValueError(f"Unsupported time base: {time_base!r}")
+        if time_base == "host":
+            t_start, t_end = self.from_host_time([t_start, t_end]).tolist()
+        with self._lock:
+            names = list(self.sensor_names)
+            oldest = self._ring.since(0, 1)[1]
+            block = self._ring.between(t_start, t_end)
+            recorder = self._recorder
+        oldest_time = float(oldest[0][0, 0]) if oldest else np.inf
+        if recorder is not None and oldest_time > t_start:
+            # The part already evicted from the raw history comes from the
+            # recording; the raw history stays authoritative for the rest.
+            rows = recorder.span(t_start, min(t_end, oldest_time))
+            rows = rows[rows[:, 0] < oldest_time]
+            evicted = np.column_stack((rows[:, 0], rows[:, RECORDING_TIME_COLUMNS:]))
+            block = np.vstack((evicted, block))
+        timestamps = block[:, 0]
+        series = {
+            name: block[:, idx + 1]
+            for idx, name in enumerate(names)
+            if sensors is None or name in sensors
+        }
+        if time_base == "host":
+            timestamps = self.to_host_time(timestamps)
+        return timestamps, series
+
+    def history(
+        self,
+        span_seconds: float,
+        max_points: int | None = None,
+        stat: str = "mean",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """The last ``span_seconds`` of data at a resolution that fits ``max_points``.
+
+        Served from the raw history when it covers the span within the point
+        budget, otherwise from the finest decimated tier covering the span,
+        with its buckets merged down to ``max_points`` (cached per tier until
+        a bucket completes); ``stat`` picks the
+        per-bucket ``"min"``, ``"max"`` or ``"mean"`` there (raw samples are
+        returned as they are). Timestamps are device time, bucket centres for
+        decimated data.
+        """
+        if stat not in TIER_STATS:
+            raise ValueError(f"Unsupported statistic: {stat!r}")
+        raw_points = span_seconds * self.sample_rate
+        use_raw = span_seconds <= self._history_seconds and (not max_points or raw_points <= max_points)
+        merged = None
+        with self._lock:
+            names = list(self.sensor_names)
+            tier = None if use_raw else self._tiers.select(span_seconds)
+            if tier is None:
+                # Bursty delivery can pack more than the nominal rate into the span.
+                block = self._ring.latest(int(raw_points * 3.0) + 1)
+                columns = slice(1, 1 + len(names))
+            elif max_points:
+                # Complete buckets are merged once per new bucket and cached;
+                # only the bucket being filled is added fresh on every call.
+                columns = tier_columns(stat, len(names))
+                key = (tier, span_seconds, max_points, tier.ring.total_written)
+                cached = self._tier_reduced.get(tier.bucket_seconds)
+                if cached is not None and cached[0] == key:
+                    merged = cached[1]
+                else:
+                    block = tier.ring.latest(int(np.ceil(span_seconds / tier.bucket_seconds)))
+                partial = tier.partial_row()
+            else:
+                block = tier.latest(int(np.ceil(span_seconds / tier.bucket_seconds)) + 1)
+                columns = tier_columns(stat, len(names))
+        if tier is not None and max_points:
+            if merged is None:
+                newest = partial[0] if partial is not None else (block[-1, 0] if block.shape[0] else 0.0)
+                block = block[np.searchsorted(block[:, 0], newest - span_seconds):]
+                budget = max_points - 1 if partial is not None else max_points
+                merged = merge_buckets(block, tier.bucket_seconds, len(names), max(1, budget))
+                merged.flags.writeable = False
+                self._tier_reduced[tier.bucket_seconds] = (key, merged)
+            block = merged if partial is None else np.vstack((merged, partial))
+        if block.shape[0] == 0:
+            return np.array([]), {name: np.array([], dtype=np.float64) for name in names}
+        if tier is None or not max_points:
+            block = block[np.searchsorted(block[:, 0], block[-1, 0] - span_seconds):]
+        values = block[:, columns]
+        return block[:, 0], {name: values[:, idx] for idx, name in enumerate(names)}
+
     def snapshot_from_recording(self, window_sec: float | None = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
-        """Get snapshot from recording buffer (_recorded_rows) with optional time window.
+        """Get snapshot of the active recording with optional time window.
         
-        This returns data from the same source that gets saved to CSV, ensuring
-        consistency between CSV and NPZ files during active recording sessions.
+        This returns data from the same source that gets saved to disk, ensuring
+        consistency between the recording and NPZ files during active recording sessions.
         
         Args:
             window_sec: If specified, return only the last N seconds of data.
@@ -181,61 +639,63 @@ class FBGStreamReader(threading.Thread):
         Returns:
             Tuple of (timestamps, series_dict) in same format as snapshot().
         """
-        with self._lock:
-            if not self._recorded_rows:
-                # No recording data available, return empty
-                print("[FBGStreamReader] Warning: No recorded data available for snapshot_from_recording()")
-                return np.array([]), {name: np.array([]) for name in self.sensor_names}
+        recorder = self._recorder
+        data_array = None
+        if recorder is not None:
+            # Binary-searched on the recorder's chunk index; copies only the
+            # window and never takes the acquisition lock.
+            t_start = None if window_sec is None else recorder.last_time - window_sec
+            data_array = recorder.span(t_start)
+        if data_array is None or data_array.shape[0] == 0:
+            # No recording data available, return empty
+            print("[FBGStreamReader] Warning: No recorded data available for snapshot_from_recording()")
+            return np.array([]), {name: np.array([]) for name in self.sensor_names}
 
-            
-            # Convert _recorded_rows (list of [time, sensor1, sensor2, ...]) to arrays
-            # Format: each row is [timestamp, sensor1_value, sensor2_value, ...]
-            data_array = np.array(self._recorded_rows, dtype=np.float64)
-            timestamps = data_array[:, 0]
-            
-            # Apply time window if requested
-            if window_sec is not None and len(timestamps) > 0:
-                t_end = timestamps[-1]
-                mask = timestamps >= (t_end - window_sec)
-                timestamps = timestamps[mask]
-                data_array = data_array[mask]
-            
-            # Build series dict
-            series = {}
-            for i, name in enumerate(self.sensor_names):
-                # Column index is i+1 because column 0 is timestamp
-                series[name] = data_array[:, i + 1]
+        # Format: each row is [device_time, host_time, sensor1_value, sensor2_value, ...]
+        timestamps = data_array[:, 0]
+
+        # Build series dict
+        series = {}
+        for i, name in enumerate(self.sensor_names):
+            # Column index is i+2 because columns 0-1 are device and host time
+            series[name] = data_array[:, i + RECORDING_TIME_COLUMNS]
         
         return timestamps, series
 
-    def _open_connection(self) -> None:
+    def _open_connection(self, resume: bool = False) -> None:
+        """Connect and configure the device.
+
+        With ``resume``, a reconnect whose sensor layout is unchanged keeps
+        the history, time axis and strain zero; the first batch then marks
+        the outage (see :meth:`_resume_stream`).
+        """
         properties = self._interr_cfg.to_fbg_properties()
         self.interrogator = Interrogator(
             self._interr_cfg.ip_address,
             self._interr_cfg.port,
             properties if properties else None,
+            settings_cache=self._applied_settings,
+            timeout=None if self._replay else READ_TIMEOUT_S,
         )
-        self.interrogator.connect()
-
-        self.interrogator.data_interleave = self._interr_cfg.data_interleave
-        self.interrogator.num_averages = self._interr_cfg.num_averages
-
-        for idx, gain in enumerate(self._interr_cfg.ch_gains, start=1):
-            self.interrogator.set_channel_gain(idx, gain)
-        for idx, thres in enumerate(self._interr_cfg.ch_noise_thresholds, start=1):
-            self.interrogator.set_channel_noise_threshold(idx, thres)
+        self.interrogator.frame_sink = self._capture_frames
+        if self._replay:
+            self.interrogator.replay(self._interr_cfg.replay_path, speed=self._interr_cfg.replay_speed)
+        else:
+            self._configure_device(zero=not resume)
+        # The stream loop reads the interrogator's preallocated wavelength
+        # array directly, so skip the per-sample Sensor/dict bookkeeping.
+        self.interrogator.append_data = False
+        self.interrogator.update_sensors = False
 
-        self.interrogator.set_trigger_defaults(False)
-        self.interrogator.zero_strain_sensors()
-        self.interrogator.setup_streaming(True)
-        self.interrogator.setup_append_data()
-        # Clear residual interrogator backlog at start of a fresh stream.
-        try:
-            self.interrogator.flush_buffer(receive=False)
-        except Exception:
-            pass
+        names = [sensor.name for sensor in self.interrogator.sensors]
+        if resume and names == self.sensor_names:
+            self._counters.reset()
+            self._resume_pending = True
+            return
 
         if self.interrogator.sensors:
+            # Built after zeroing so strain is relative to the current state.
+            self.sensor_bank = SensorBank(self.interrogator.sensors)
             self.sensor_names = [sensor.name for sensor in self.interrogator.sensors]
             for sensor in self.interrogator.sensors:
                 if sensor.name not in self.nominal_wavelengths:
@@ -253,76 +713,191 @@ class FBGStreamReader(threading.Thread):
         )
         with self._lock:
             self._history_samples = history_size
-            self._history = {
-                name: deque(maxlen=self._history_samples) for name in self.sensor_names
-            }
-            self._timestamps = deque(maxlen=self._history_samples)
+            self._ring = self._new_ring(self._history_samples)
+            self._tiers = TieredHistory(self._history_tiers, len(self.sensor_names))
+            self._rolling = {seconds: self._new_rolling_window(seconds) for seconds in self._rolling}
 
         self._start_time = time.perf_counter()
+        self._zero_pending = True
+        self._device_origin = None
+        self.clock.reset()
+        self._counters.reset()
+        self._resume_pending = False
+        self._last_device_time = None
+        self._last_host_time = 0.0
         self._ready_event.set()
 
+    def _new_ring(self, capacity: int) -> RingBuffer:
+        return RingBuffer(capacity, 1 + len(self.sensor_names))
+
+    def _configure_device(self, zero: bool = True) -> None:
+        assert self.interrogator is not None
+        try:
+            self.interrogator.connect()
+        except OSError:
+            # The device may have rebooted and lost what was applied.
+            self._applied_settings.clear()
+            raise
+
+        # One pipelined batch; settings already in effect are not resent.
+        self.interrogator.configure(
+            data_interleave=self._interr_cfg.data_interleave,
+            num_averages=self._interr_cfg.num_averages,
+            ch_gains=self._interr_cfg.ch_gains,
+            ch_noise_thresholds=self._interr_cfg.ch_noise_thresholds,
+            trigger_defaults=False,
+        )
+        if zero:
+            self.interrogator.zero_strain_sensors()
+        if self._buffered:
+            self.interrogator.enable_buffer()
+            self.interrogator.flush_buffer()
+        else:
+            self.interrogator.setup_streaming(True)
+            # Clear residual interrogator backlog at start of a fresh stream.
+            try:
+                self.interrogator.flush_buffer(receive=False)
+            except Exception:
+                pass
+
+    def _capture_frames(self, frames, host_time: float) -> None:
+        with self._capture_lock:
+            if self._capture is not None:
+                self._capture.write(frames, host_time)
+
     def _stream_loop(self) -> None:
         assert self.interrogator is not None
         # Remove throttling - let the loop run as fast as the hardware allows
-        # The interrogator.get_data() call is blocking and will pace the loop naturally
+        # The interrogator.get_data_batch() call is blocking and will pace the loop naturally
         
         sample_count = 0
-        last_diagnostic_time = time.perf_counter()
+        last_publish_time = time.perf_counter()
+        consecutive_errors = 0
 
         while not self._stop_event.is_set():
             loop_start = time.perf_counter()
             
             try:
-                self.interrogator.get_data()
-            except Exception:
+                if self._buffered:
+                    batch = self.interrogator.read_buffer(BUFFER_READ_FRAMES)
+                else:
+                    batch = self.interrogator.get_data_batch(self._batch_frames)
+            except OSError:
+                # Includes ConnectionError and socket timeouts: the
+                # connection is gone, so let run() reconnect.
+                if self._replay:
+                    print("[FBGStreamReader] Replay finished.")
+                    break
                 self.error_count += 1
+                self._metric_errors.inc()
+                raise
+            except Exception as exc:
+                self.error_count += 1
+                self._metric_errors.inc()
+                consecutive_errors += 1
+                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                    raise ConnectionError(
+                        f"{consecutive_errors} consecutive read errors, last {type(exc).__name__}: {exc}"
+                    ) from exc
+                # Back off so a persistent fault cannot spin the CPU.
+                self._stop_event.wait(
+                    min(ERROR_BACKOFF_MAX_S, ERROR_BACKOFF_S * 2.0 ** (consecutive_errors - 1))
+                )
                 continue
+            consecutive_errors = 0
 
-            now = time.perf_counter()
-            relative_time = now - (self._start_time or now)
-            latest_values: Dict[str, float] = {}
-
-            for name in self.sensor_names:
-                key = f"{name}_wavelength"
-                raw = self.interrogator.data.get(key)
-                if raw is None:
-                    latest_values[name] = np.nan
-                    continue
-
-                # Micron Optics driver returns length-1 numpy arrays; avoid copying by indexing directly.
-                if isinstance(raw, (list, tuple)) and raw:
-                    latest_values[name] = float(raw[0])
-                else:
-                    arr = np.asarray(raw)
-                    latest_values[name] = float(arr.flat[0]) if arr.size else np.nan
-
-            with self._lock:
-                self._timestamps.append(relative_time)
-                for name, value in latest_values.items():
-                    if name not in self._history:
-                        self._history[name] = deque(maxlen=self._history_samples)
-                    self._history[name].append(value)
-
-                if self._recording:
-                    row = [relative_time]
-                    for name in self.sensor_names:
-                        row.append(latest_values.get(name, np.nan))
-                    self._recorded_rows.append(row)
+            n_frames = self._ingest_batch(batch, time.perf_counter()) if len(batch) else 0
+            if self._buffered and len(batch) < BUFFER_READ_FRAMES:
+                # Device buffer drained; let it refill instead of polling hot.
+                self._stop_event.wait(self._interr_cfg.buffer_poll_interval_s)
             
-            sample_count += 1
+            sample_count += n_frames
             
-            # Diagnostic: print actual loop rate every 30 seconds (reduced from 10 to minimize overhead)
-            if now - last_diagnostic_time > 30.0:
-                elapsed = now - last_diagnostic_time
-                actual_hz = sample_count / elapsed
-                loop_time_ms = (time.perf_counter() - loop_start) * 1000
-                print(
-                    f"[FBGStreamReader] Loop rate: {actual_hz:.1f} Hz "
-                    f"(target: {self._estimated_rate:.1f} Hz), "
-                    f"last loop: {loop_time_ms:.2f} ms"
-                )
+            now = time.perf_counter()
+            self._metric_loop.observe(now - loop_start)
+            if now - last_publish_time >= METRICS_INTERVAL_S:
+                self._metric_rate.set(sample_count / (now - last_publish_time))
+                self._publish_metrics()
                 sample_count = 0
-                last_diagnostic_time = now
+                last_publish_time = now
+
+    def _ingest_batch(self, batch: FrameBatch, now: float) -> int:
+        """Timestamp, continuity-check and append one decoded batch; return rows kept."""
+        if self._resume_pending:
+            self._resume_stream(batch, now)
+        if self._device_origin is None:
+            self._device_origin = float(batch.kernel_timestamp[0])
+        # Device timestamps are the time axis; the host clock only feeds
+        # the device->host mapping used for cross-device alignment.
+        device_times = batch.kernel_timestamp - self._device_origin
+        self.clock.update(float(device_times[-1]), now)
+        self._last_device_time = float(device_times[-1])
+        self._last_host_time = now
+
+        lost, duplicate = self._counters.update(batch.acq_counter)
+        self._record_continuity(device_times, lost, duplicate)
+
+        values = batch.wavelengths
+        keep = (batch.error != SKIP_FRAME_ERROR) & ~duplicate
+        if not keep.all():
+            values = values[keep]
+            device_times = device_times[keep]
+        if values.shape[0]:
+            if self._zero_pending and self.sensor_bank is not None:
+                # Reference strain and temperature to the first real block.
+                self.sensor_bank.zero(values)
+                self._zero_pending = False
+            self._append_block(device_times, values)
+            self._metric_frames.inc(values.shape[0])
+            REGISTRY.heartbeat(self._metric_sample, now)
+        return values.shape[0]
+
+    def _resume_stream(self, batch: FrameBatch, now: float) -> None:
+        """Continue the time axis after a reconnect and mark the outage.
+
+        The device clock usually keeps running across a network blip; if it
+        restarted instead, the axis is re-anchored on the host time elapsed.
+        The outage is recorded as a gap and as one all-NaN history row.
+        """
+        self._resume_pending = False
+        last = self._last_device_time
+        if last is None or self._device_origin is None:
+            return
+        expected = last + (now - self._last_host_time)
+        resumed = float(batch.kernel_timestamp[0]) - self._device_origin
+        if not last < resumed <= expected + READ_TIMEOUT_S:
+            self._device_origin = float(batch.kernel_timestamp[0]) - expected
+            resumed = expected
+        lost = max(0, int(round((resumed - last) * self.sample_rate)) - 1)
+        with self._lock:
+            self._gaps.append((resumed, lost))
+            self._counters.lost += lost
+        marker = np.full((1, len(self.sensor_names)), np.nan)
+        self._append_block(np.array([0.5 * (last + resumed)]), marker)
+
+    def _record_continuity(self, timestamps: np.ndarray, lost: np.ndarray, duplicate: np.ndarray) -> None:
+        gap_idx = np.flatnonzero(lost)
+        with self._lock:
+            self._loss_history.add(timestamps, lost, duplicate)
+            for idx in gap_idx.tolist():
+                self._gaps.append((float(timestamps[idx]), int(lost[idx])))
+
+    def _append_block(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Append ``values[n, sensors]`` stamped with device ``timestamps`` under one lock hold."""
+        rows = np.column_stack((timestamps, values))
+        wait_start = time.perf_counter()
+        with self._lock:
+            self._metric_lock_wait.observe(time.perf_counter() - wait_start)
+            self._ring.extend(rows)
+            self._tiers.extend(timestamps, values)
+            for window in self._rolling.values():
+                window.extend(timestamps, values)
+            self._data_ready.notify_all()
+
+            if self._recorder is not None:
+                self._recorder.append(
+                    np.column_stack((timestamps, self.to_host_time(timestamps), values))
+                )
 
     def _shutdown_connection(self) -> None:
         if self.interrogator:
@@ -332,3 +907,474 @@ class FBGStreamReader(threading.Thread):
                 self.interrogator.disconnect()
             finally:
                 self.interrogator = None
+
+
+class Subscription(object):
+    """Per-consumer cursor over an :class:`FBGStreamReader` (see :meth:`~FBGStreamReader.subscribe`)."""
+
+    def __init__(
+        self,
+        reader: FBGStreamReader,
+        ring: RingBuffer,
+        cursor: int,
+        max_backlog: int | None,
+        overflow: str,
+    ) -> None:
+        self.reader = reader
+        self.max_backlog = max_backlog
+        self.overflow = overflow
+        self.dropped = 0
+        self.rows_read = 0
+        self._ring = ring
+        self._cursor = cursor
+
+    def read(
+        self,
+        max_rows: int | None = None,
+        timeout: float | None = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """New samples as ``(timestamps, series)``, oldest first.
+
+        Returns at most ``max_rows`` rows; the rest stay queued. With a
+        ``timeout`` the call waits up to that long for data when none is
+        pending, otherwise it returns empty arrays straight away.
+        """
+        block, names, lost = self.reader._read_subscription(self, max_rows, timeout)
+        if lost:
+            self.dropped += lost
+            if self.overflow == "raise":
+                raise SubscriptionOverflow(f"{lost} unread samples were overwritten.")
+        self.rows_read += block.shape[0]
+        return block[:, 0], {name: block[:, idx + 1] for idx, name in enumerate(names)}
+
+    @property
+    def pending(self) -> int:
+        """Unread rows, including any that will be dropped on the next read."""
+        return max(0, self._ring.total_written - self._cursor)
+
+
+class MultiFBGStreamReader(object):
+    """Drive one :class:`FBGStreamReader` per interrogator and merge their data.
+
+    Every interrogator keeps its own reader thread, clock mapping and
+    continuity tracking. Merged views use the first interrogator's samples as
+    the time axis: the other streams are carried onto it through their
+    device->host clock mappings and linearly interpolated, NaN outside the
+    span they cover. The public surface mirrors :class:`FBGStreamReader`, so
+    either can be handed to the plotting and recording code.
+    """
+
+    def __init__(
+        self,
+        interr_cfgs: Sequence[InterrogatorSettings],
+        history_seconds: float,
+        batch_frames: int = 256,
+    ) -> None:
+        if not interr_cfgs:
+            raise ValueError("At least one interrogator must be configured.")
+        names = [sensor.name for cfg in interr_cfgs for sensor in cfg.sensors]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Sensor names must be unique across interrogators: {duplicates}")
+        self.readers = [_make_reader(cfg, history_seconds, batch_frames) for cfg in interr_cfgs]
+        self._recording_path: Path | None = None
+
+    @property
+    def primary(self) -> FBGStreamReader:
+        return self.readers[0]
+
+    @property
+    def sensor_names(self) -> List[str]:
+        return [name for reader in self.readers for name in reader.sensor_names]
+
+    @property
+    def nominal_wavelengths(self) -> Dict[str, float]:
+        merged: Dict[str, float] = {}
+        for reader in self.readers:
+            merged.update(reader.nominal_wavelengths)
+        return merged
+
+    @property
+    def sample_rate(self) -> float:
+        return self.primary.sample_rate
+
+    @property
+    def is_ready(self) -> bool:
+        return all(reader.is_ready for reader in self.readers)
+
+    @property
+    def start_time(self) -> float:
+        return self.primary.start_time
+
+    @property
+    def error(self) -> str | None:
+        errors = [
+            f"{reader._interr_cfg.ip_address}:{reader._interr_cfg.port}: {reader.error}"
+            for reader in self.readers
+            if reader.error
+        ]
+        return "; ".join(errors) or None
+
+    @property
+    def error_count(self) -> int:
+        return sum(reader.error_count for reader in self.readers)
+
+    def start(self) -> None:
+        for reader in self.readers:
+            reader.start()
+
+    def stop(self) -> None:
+        for reader in self.readers:
+            reader._stop_event.set()
+        for reader in self.readers:
+            reader.stop()
+
+    def is_alive(self) -> bool:
+        return any(reader.is_alive() for reader in self.readers)
+
+    def wait_until_ready(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for reader in self.readers:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not reader.wait_until_ready(remaining):
+                return False
+        return True
+
+    def to_host_time(self, timestamps):
+        return self.primary.to_host_time(timestamps)
+
+    def from_host_time(self, timestamps):
+        return self.primary.from_host_time(timestamps)
+
+    @property
+    def recording_columns(self) -> List[str]:
+        return ["time_seconds", "host_time_seconds"] + self.sensor_names
+
+    def start_recording(self, path: Path | None = None) -> Path:
+        """Record each interrogator to ``<stem>_<n>.npy``; merged into ``path`` on stop."""
+        if path is None:
+            handle, name = tempfile.mkstemp(prefix="fbg_recording_", suffix=".npy")
+            os.close(handle)
+            path = Path(name)
+        path = Path(path)
+        for idx, reader in enumerate(self.readers, start=1):
+            reader.start_recording(path.with_name(f"{path.stem}_{idx}{path.suffix}"))
+        self._recording_path = path
+        return path
+
+    def stop_recording(self, chunk_rows: int = 65536) -> Path | None:
+        """Stop all recordings and merge them onto the primary's time axis.
+
+        The per-interrogator files are read back memory-mapped and merged a
+        chunk at a time, so memory stays bounded for long recordings.
+        """
+        parts = [reader.stop_recording() for reader in self.readers]
+        path, self._recording_path = self._recording_path, None
+        try:
+            if path is None or parts[0] is None:
+                return None
+            primary = load_recording(parts[0])
+            others = []
+            for reader, part in zip(self.readers[1:], parts[1:]):
+                data = load_recording(part) if part is not None else np.empty((0, 0))
+                times = self._to_primary_time(reader, data[:, 0]) if data.size else np.empty(0)
+                others.append((reader, times, data))
+            recorder = ChunkedRecorder(path, self.recording_columns)
+            for start in range(0, primary.shape[0], chunk_rows):
+                block = np.asarray(primary[start:start + chunk_rows])
+                columns = [block]
+                for reader, times, data in others:
+                    # Only the span of the other recording around this chunk.
+                    lo = max(0, int(np.searchsorted(times, block[0, 0])) - 1)
+                    hi = int(np.searchsorted(times, block[-1, 0], side="right")) + 1
+                    for col in range(len(reader.sensor_names)):
+                        values = data[lo:hi, RECORDING_TIME_COLUMNS + col] if data.size else data
+                        columns.append(_interp_or_nan(block[:, 0], times[lo:hi], values)[:, None])
+                recorder.append(np.hstack(columns))
+            return recorder.close()
+        finally:
+            for part in parts:
+                if part is not None and part != path:
+                    part.unlink(missing_ok=True)
+
+    def start_raw_capture(self, path: Path) -> None:
+        """Capture each interrogator to ``<stem>_<n><suffix>`` next to ``path``."""
+        path = Path(path)
+        for idx, reader in enumerate(self.readers, start=1):
+            reader.start_raw_capture(path.with_name(f"{path.stem}_{idx}{path.suffix}"))
+
+    def stop_raw_capture(self) -> Path | None:
+        paths = [reader.stop_raw_capture() for reader in self.readers]
+        return paths[0]
+
+    def subscribe(
+        self,
+        max_backlog: int | None = None,
+        overflow: str = "drop_oldest",
+        from_start: bool = False,
+        max_hold_s: float = 0.5,
+    ) -> "MergedSubscription":
+        """Merged :meth:`FBGStreamReader.subscribe` on the primary's time axis."""
+        subscriptions = [
+            reader.subscribe(max_backlog, overflow, from_start) for reader in self.readers
+        ]
+        return MergedSubscription(self, subscriptions, max_hold_s)
+
+    def latest_sample(self) -> Tuple[float, Dict[str, float]]:
+        timestamp, latest = self.primary.latest_sample()
+        for reader in self.readers[1:]:
+            latest.update(reader.latest_sample()[1])
+        return timestamp, latest
+
+    def add_rolling_window(self, window_seconds: float) -> None:
+        for reader in self.readers:
+            reader.add_rolling_window(window_seconds)
+
+    def rolling_stats(
+        self,
+        window_seconds: float | None = None,
+        sensors: Sequence[str] | None = None,
+    ) -> Dict[str, RollingSummary]:
+        """Per-interrogator :meth:`FBGStreamReader.rolling_stats`, each on its own device clock."""
+        stats: Dict[str, RollingSummary] = {}
+        for reader in self.readers:
+            stats.update(reader.rolling_stats(window_seconds, sensors))
+        return stats
+
+    def snapshot(
+        self,
+        max_points: int | None = None,
+        time_base: str = "device",
+        units: str = "wavelength",
+        mode: str | None = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Merged :meth:`FBGStreamReader.snapshot` keyed by sensor name."""
+        if time_base not in ("device", "host"):
+            raise ValueError(f"Unsupported time base: {time_base!r}")
+        timestamps, series = self.primary.snapshot(max_points, units=units, mode=mode)
+        for reader in self.readers[1:]:
+            points = max_points
+            if max_points and mode is None:
+                # Cover the same time span even when the rates differ.
+                points = int(np.ceil(max_points * reader.sample_rate / max(self.primary.sample_rate, 1.0))) + 1
+            other_times, other_series = reader.snapshot(points, units=units, mode=mode)
+            self._merge_into(series, timestamps, reader, other_times, other_series)
+        if time_base == "host":
+            timestamps = self.primary.to_host_time(timestamps)
+        return timestamps, series
+
+    def query(
+        self,
+        t_start: float,
+        t_end: float,
+        sensors: Sequence[str] | None = None,
+        time_base: str = "device",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Merged :meth:`FBGStreamReader.query` on the primary's time axis."""
+        if time_base not in ("device", "host"):
+            raise ValueError(f"Unsupported time base: {time_base!r}")
+        if time_base == "host":
+            t_start, t_end = self.primary.from_host_time([t_start, t_end]).tolist()
+        timestamps, series = self.primary.query(t_start, t_end, sensors)
+        for reader in self.readers[1:]:
+            wanted = [name for name in reader.sensor_names if sensors is None or name in sensors]
+            if not wanted:
+                continue
+            if timestamps.size and reader.clock.is_valid and self.primary.clock.is_valid:
+                # The other stream's span around the primary samples, on its own clock.
+                lo, hi = reader.clock.to_device(
+                    self.primary.clock.to_host(timestamps[[0, -1]])
+                ).tolist()
+                other_times, other_series = reader.query(lo - 1.0, hi + 1.0, wanted)
+            else:
+                other_times, other_series = np.array([]), {}
+            mapped = self._to_primary_time(reader, other_times)
+            for name in wanted:
+                values = other_series.get(name, np.array([], dtype=np.float64))
+                series[name] = _interp_or_nan(timestamps, mapped, values)
+        if time_base == "host":
+            timestamps = self.primary.to_host_time(timestamps)
+        return timestamps, series
+
+    def history(
+        self,
+        span_seconds: float,
+        max_points: int | None = None,
+        stat: str = "mean",
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Merged :meth:`FBGStreamReader.history` on the primary's time axis."""
+        timestamps, series = self.primary.history(span_seconds, max_points, stat)
+        for reader in self.readers[1:]:
+            other_times, other_series = reader.history(span_seconds, max_points, stat)
+            self._merge_into(series, timestamps, reader, other_times, other_series)
+        return timestamps, series
+
+    def snapshot_from_recording(self, window_sec: float | None = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        timestamps, series = self.primary.snapshot_from_recording(window_sec)
+        for reader in self.readers[1:]:
+            other_times, other_series = reader.snapshot_from_recording(window_sec)
+            self._merge_into(series, timestamps, reader, other_times, other_series)
+        return timestamps, series
+
+    def gaps(self, since: float | None = None) -> List[Tuple[float, int]]:
+        """Gaps of every interrogator, stamped on the primary's device clock."""
+        merged = list(self.primary.gaps())
+        for reader in self.readers[1:]:
+            gaps = reader.gaps()
+            if gaps:
+                times = self._to_primary_time(reader, np.array([gap[0] for gap in gaps]))
+                merged.extend(zip(times.tolist(), [gap[1] for gap in gaps]))
+        merged.sort()
+        if since is not None:
+            merged = [gap for gap in merged if gap[0] >= since]
+        return merged
+
+    def metrics(self) -> Dict[str, float]:
+        """Sum of the per-interrogator :meth:`FBGStreamReader.metrics`."""
+        totals: Dict[str, float] = {}
+        for reader in self.readers:
+            for key, value in reader.metrics().items():
+                totals[key] = totals.get(key, 0.0) + value
+        expected = totals["frames_received"] + totals["frames_lost"]
+        totals["loss_ratio"] = totals["frames_lost"] / expected if expected else 0.0
+        return totals
+
+    def _to_primary_time(self, reader: FBGStreamReader, timestamps: np.ndarray) -> np.ndarray:
+        if not (reader.clock.is_valid and self.primary.clock.is_valid):
+            return np.full(np.shape(timestamps), np.nan)
+        return self.primary.clock.to_device(reader.clock.to_host(timestamps))
+
+    def _merge_into(
+        self,
+        series: Dict[str, np.ndarray],
+        timestamps: np.ndarray,
+        reader: FBGStreamReader,
+        other_times: np.ndarray,
+        other_series: Dict[str, np.ndarray],
+    ) -> None:
+        mapped = self._to_primary_time(reader, other_times)
+        for name in reader.sensor_names:
+            values = other_series.get(name, np.array([], dtype=np.float64))
+            series[name] = _interp_or_nan(timestamps, mapped, values)
+
+
+class MergedSubscription(object):
+    """Subscription over a :class:`MultiFBGStreamReader`.
+
+    Rows come out on the primary interrogator's time axis like
+    :meth:`MultiFBGStreamReader.snapshot`. A primary row is held back until
+    every other interrogator has delivered data past it, so it can be
+    interpolated rather than padded with NaN, but for at most ``max_hold_s``
+    seconds of device time.
+    """
+
+    def __init__(
+        self,
+        multi: MultiFBGStreamReader,
+        subscriptions: List[Subscription],
+        max_hold_s: float,
+    ) -> None:
+        self._multi = multi
+        self._subscriptions = subscriptions
+        self.max_hold_s = float(max_hold_s)
+        primary = multi.primary
+        self._held_times = np.empty(0)
+        self._held = np.empty((0, len(primary.sensor_names)))
+        self._tails = [
+            (np.empty(0), np.empty((0, len(reader.sensor_names)))) for reader in multi.readers[1:]
+        ]
+
+    @property
+    def dropped(self) -> int:
+        return sum(subscription.dropped for subscription in self._subscriptions)
+
+    @property
+    def rows_read(self) -> int:
+        return self._subscriptions[0].rows_read - self._held_times.shape[0]
+
+    @property
+    def pending(self) -> int:
+        return self._subscriptions[0].pending + self._held_times.shape[0]
+
+    def read(
+        self,
+        max_rows: int | None = None,
+        timeout: float | None = None,
+    ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Merged :meth:`Subscription.read`."""
+        primary = self._multi.primary
+        timestamps, series = self._subscriptions[0].read(timeout=timeout)
+        self._held_times = np.concatenate((self._held_times, timestamps))
+        self._held = np.vstack((self._held, _stack(series, primary.sensor_names)))
+
+        covered = np.inf
+        readers = self._multi.readers[1:]
+        for idx, (reader, subscription) in enumerate(zip(readers, self._subscriptions[1:])):
+            other_times, other_series = subscription.read()
+            mapped = self._multi._to_primary_time(reader, other_times)
+            known = ~np.isnan(mapped)
+            tail_times, tail = self._tails[idx]
+            tail_times = np.concatenate((tail_times, mapped[known]))[-reader._history_samples:]
+            tail = np.vstack((tail, _stack(other_series, reader.sensor_names)[known]))[-reader._history_samples:]
+            self._tails[idx] = (tail_times, tail)
+            covered = min(covered, tail_times[-1] if tail_times.shape[0] else -np.inf)
+
+        held_times = self._held_times
+        count = 0
+        if held_times.shape[0]:
+            count = max(
+                int(np.searchsorted(held_times, covered, side="right")),
+                int(np.searchsorted(held_times, held_times[-1] - self.max_hold_s, side="right")),
+            )
+        if max_rows:
+            count = min(count, int(max_rows))
+        out_times = held_times[:count]
+        merged = {name: self._held[:count, col] for col, name in enumerate(primary.sensor_names)}
+        for idx, reader in enumerate(readers):
+            tail_times, tail = self._tails[idx]
+            for col, name in enumerate(reader.sensor_names):
+                merged[name] = _interp_or_nan(out_times, tail_times, tail[:, col])
+            if count:
+                # Keep one row before the released span for the next interpolation.
+                keep = max(0, int(np.searchsorted(tail_times, out_times[-1])) - 1)
+                self._tails[idx] = (tail_times[keep:], tail[keep:])
+        self._held_times = held_times[count:]
+        self._held = self._held[count:]
+        return out_times, merged
+
+
+def _stack(series: Dict[str, np.ndarray], names: Sequence[str]) -> np.ndarray:
+    """``[n, len(names)]`` block of ``series`` columns in ``names`` order."""
+    if not names:
+        return np.empty((0, 0))
+    return np.column_stack([series[name] for name in names])
+
+
+def _interp_or_nan(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """``np.interp`` that yields NaN outside ``xp`` or when ``xp`` is unusable."""
+    if xp.shape[0] == 0 or fp.shape[0] != xp.shape[0] or np.isnan(xp).any():
+        return np.full(np.shape(x), np.nan)
+    return np.interp(x, xp, fp, left=np.nan, right=np.nan)
+
+
+def create_stream_reader(
+    interr_cfgs: Sequence[InterrogatorSettings],
+    history_seconds: float,
+    batch_frames: int = 256,
+) -> FBGStreamReader | MultiFBGStreamReader:
+    """Return a plain reader for one interrogator, an aggregating one otherwise."""
+    if len(interr_cfgs) == 1:
+        return _make_reader(interr_cfgs[0], history_seconds, batch_frames)
+    return MultiFBGStreamReader(interr_cfgs, history_seconds, batch_frames)
+
+
+def _make_reader(
+    interr_cfg: InterrogatorSettings,
+    history_seconds: float,
+    batch_frames: int,
+) -> FBGStreamReader:
+    if interr_cfg.separate_process:
+        from .process import ProcessStreamReader
+
+        return ProcessStreamReader(interr_cfg, history_seconds, batch_frames)
+    return FBGStreamReader(interr_cfg, history_seconds, batch_frames)
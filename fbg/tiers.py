@@ -0,0 +1,168 @@
+"""Decimated min/max/mean history for long time windows.
+
+The raw history holds only a few seconds at the full 2 kHz. Each
+:class:`DecimatedTier` folds incoming samples into fixed device-time buckets
+and keeps the last ``span_seconds`` of them in a :class:`RingBuffer`, so a
+view of the last half hour or day costs a few thousand rows instead of
+millions. Rows are laid out as::
+
+    [bucket centre time, min per sensor..., max per sensor..., mean per sensor...]
+
+Buckets are updated incrementally on every appended block with vectorised
+``reduceat`` calls; the bucket still being filled is kept separately and
+included in reads so views stay current.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .ringbuffer import RingBuffer
+
+# (bucket seconds, span seconds): 100 Hz for 10 minutes, 1 Hz for 24 hours.
+DEFAULT_HISTORY_TIERS: Tuple[Tuple[float, float], ...] = ((0.01, 600.0), (1.0, 86400.0))
+TIER_STATS = ("min", "max", "mean")
+
+
+class DecimatedTier(object):
+    """Fixed-interval min/max/mean buckets of ``n_values`` columns."""
+
+    def __init__(self, bucket_seconds: float, span_seconds: float, n_values: int) -> None:
+        if bucket_seconds <= 0 or span_seconds <= 0:
+            raise ValueError("Tier bucket and span must be positive.")
+        self.bucket_seconds = float(bucket_seconds)
+        self.span_seconds = float(span_seconds)
+        self.n_values = int(n_values)
+        self.ring = RingBuffer(math.ceil(span_seconds / bucket_seconds), 1 + 3 * self.n_values)
+        self._bucket: int | None = None
+        self._min = np.full(self.n_values, np.nan)
+        self._max = np.full(self.n_values, np.nan)
+        self._sum = np.zeros(self.n_values)
+        self._count = np.zeros(self.n_values, dtype=np.int64)
+
+    def clear(self) -> None:
+        self.ring.clear()
+        self._bucket = None
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Fold ``values[n, n_values]`` stamped with ``timestamps`` into the buckets."""
+        if timestamps.shape[0] == 0:
+            return
+        buckets = np.floor(timestamps / self.bucket_seconds).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        finite = ~np.isnan(values)
+        mins = np.fmin.reduceat(values, starts, axis=0)
+        maxs = np.fmax.reduceat(values, starts, axis=0)
+        sums = np.add.reduceat(np.where(finite, values, 0.0), starts, axis=0)
+        counts = np.add.reduceat(finite, starts, axis=0)
+        group_buckets = buckets[starts]
+
+        if self._bucket is not None and group_buckets[0] == self._bucket:
+            mins[0] = np.fmin(mins[0], self._min)
+            maxs[0] = np.fmax(maxs[0], self._max)
+            sums[0] += self._sum
+            counts[0] += self._count
+        elif self._bucket is not None:
+            self.ring.extend(self._partial_row()[None, :])
+
+        done = slice(0, len(starts) - 1)
+        if len(starts) > 1:
+            self.ring.extend(self._rows(group_buckets[done], mins[done], maxs[done], sums[done], counts[done]))
+        self._bucket = int(group_buckets[-1])
+        self._min = mins[-1]
+        self._max = maxs[-1]
+        self._sum = sums[-1]
+        self._count = counts[-1]
+
+    def latest(self, count: int | None = None) -> np.ndarray:
+        """Copy of the newest ``count`` buckets, including the one being filled."""
+        if self._bucket is None:
+            return self.ring.latest(count)
+        if count is not None and count <= 1:
+            return self._partial_row()[None, :]
+        complete = self.ring.latest(None if count is None else count - 1)
+        return np.vstack((complete, self._partial_row()))
+
+    def partial_row(self) -> np.ndarray | None:
+        """The bucket still being filled, or ``None`` before any sample."""
+        return None if self._bucket is None else self._partial_row()
+
+    def _partial_row(self) -> np.ndarray:
+        return self._rows(
+            np.array([self._bucket]), self._min[None, :], self._max[None, :],
+            self._sum[None, :], self._count[None, :],
+        )[0]
+
+    def _rows(self, buckets, mins, maxs, sums, counts) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        centres = (buckets + 0.5) * self.bucket_seconds
+        return np.column_stack((centres, mins, maxs, means))
+
+
+class TieredHistory(object):
+    """Several :class:`DecimatedTier`, finest first, fed from the same samples."""
+
+    def __init__(self, tiers: Sequence[Tuple[float, float]], n_values: int) -> None:
+        self.tiers: List[DecimatedTier] = [
+            DecimatedTier(bucket, span, n_values) for bucket, span in sorted(tiers)
+        ]
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        for tier in self.tiers:
+            tier.extend(timestamps, values)
+
+    def select(self, span_seconds: float) -> DecimatedTier | None:
+        """Finest tier whose span covers ``span_seconds``.
+
+        Its rows may exceed a point budget; callers merge them down with
+        :func:`merge_buckets` rather than switching to a coarser tier. Only
+        a span longer than every tier falls back to the coarsest one, which
+        then covers just its own span.
+        """
+        for tier in self.tiers:
+            if span_seconds <= tier.span_seconds:
+                return tier
+        return self.tiers[-1] if self.tiers else None
+
+
+def merge_buckets(rows: np.ndarray, bucket_seconds: float, n_values: int, max_points: int) -> np.ndarray:
+    """Merge consecutive tier ``rows`` into at most ``max_points`` coarser buckets.
+
+    Groups are aligned on multiples of the merged bucket width, so they stay
+    put as new rows arrive; an oldest group that does not fit the budget is
+    dropped. Minima and maxima are kept; means are averaged over the merged
+    buckets, unweighted.
+    """
+    if max_points <= 0 or rows.shape[0] <= max_points:
+        return rows
+    factor = -(-rows.shape[0] // max_points)
+    groups = np.floor(rows[:, 0] / (bucket_seconds * factor)).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(groups)) + 1))[-max_points:]
+    rows = rows[starts[0]:]
+    starts = starts - starts[0]
+    lows = tier_columns("min", n_values)
+    highs = tier_columns("max", n_values)
+    means = tier_columns("mean", n_values)
+    finite = ~np.isnan(rows[:, means])
+    counts = np.add.reduceat(finite, starts, axis=0)
+    sums = np.add.reduceat(np.where(finite, rows[:, means], 0.0), starts, axis=0)
+    sizes = np.diff(np.append(starts, rows.shape[0]))
+    merged = np.empty((starts.shape[0], rows.shape[1]))
+    merged[:, 0] = np.add.reduceat(rows[:, 0], starts) / sizes
+    merged[:, lows] = np.fmin.reduceat(rows[:, lows], starts, axis=0)
+    merged[:, highs] = np.fmax.reduceat(rows[:, highs], starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        merged[:, means] = np.where(counts > 0, sums / counts, np.nan)
+    return merged
+
+
+def tier_columns(stat: str, n_values: int) -> slice:
+    """Columns of ``stat`` in a tier row."""
+    if stat not in TIER_STATS:
+        raise ValueError(f"Unsupported statistic: {stat!r}")
+    start = 1 + TIER_STATS.index(stat) * n_values
+    return slice(start, start + n_values)
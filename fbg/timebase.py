@@ -0,0 +1,113 @@
+"""Mapping between the interrogator's kernel clock and the host clock."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, Tuple
+
+import numpy as np
+
+
+class ClockMapping(object):
+    """Continuously updated linear map from device time to host ``perf_counter``.
+
+    Frames reach the host some unknown, variable delay after they were
+    stamped by the device, and bursty delivery makes that delay swing by tens
+    of milliseconds. The mapping therefore tracks the *lower envelope* of
+    ``host - device``: the smallest residual per ``bucket_seconds`` of device
+    time is kept for ``window_buckets`` buckets, and a least-squares line
+    through those minima gives the clock drift once they span at least
+    ``min_fit_seconds``. The offset is pulled down immediately whenever a
+    frame arrives earlier than the line predicts.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: float = 1.0,
+        window_buckets: int = 300,
+        min_fit_seconds: float = 30.0,
+    ) -> None:
+        self.bucket_seconds = float(bucket_seconds)
+        self.min_fit_seconds = float(min_fit_seconds)
+        self._minima: Deque[Tuple[float, float]] = deque(maxlen=window_buckets)
+        self._bucket_index: int | None = None
+        self._bucket_min: Tuple[float, float] | None = None
+        self._drift = 0.0
+        self._offset = float("nan")
+        self._lock = threading.Lock()
+
+    @property
+    def is_valid(self) -> bool:
+        return np.isfinite(self._offset)
+
+    @property
+    def drift_ppm(self) -> float:
+        return self._drift * 1e6
+
+    def parameters(self) -> Tuple[float, float]:
+        """Return ``(slope, offset)`` with ``host = slope * device + offset``."""
+        with self._lock:
+            return 1.0 + self._drift, self._offset
+
+    def reset(self) -> None:
+        with self._lock:
+            self._minima.clear()
+            self._bucket_index = None
+            self._bucket_min = None
+            self._drift = 0.0
+            self._offset = float("nan")
+
+    def __getstate__(self):
+        # Picklable so a copy can follow an acquisition running in another process.
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def update(self, device_t: float, host_t: float) -> None:
+        """Record that a frame stamped ``device_t`` was seen at ``host_t``."""
+        residual = host_t - device_t
+        bucket = int(device_t // self.bucket_seconds)
+        with self._lock:
+            if self._bucket_index is None:
+                self._bucket_index = bucket
+            if bucket != self._bucket_index:
+                if self._bucket_min is not None:
+                    self._minima.append(self._bucket_min)
+                    self._refit()
+                self._bucket_index = bucket
+                self._bucket_min = None
+            if self._bucket_min is None or residual < self._bucket_min[1]:
+                self._bucket_min = (device_t, residual)
+
+            predicted = self._offset + self._drift * device_t
+            if not np.isfinite(predicted) or residual < predicted:
+                self._offset = residual - self._drift * device_t
+
+    def to_host(self, device_t):
+        slope, offset = self.parameters()
+        return np.asarray(device_t, dtype=np.float64) * slope + offset
+
+    def to_device(self, host_t):
+        slope, offset = self.parameters()
+        return (np.asarray(host_t, dtype=np.float64) - offset) / slope
+
+    def _refit(self) -> None:
+        if len(self._minima) < 2:
+            return
+        if self._minima[-1][0] - self._minima[0][0] < self.min_fit_seconds:
+            return
+        points = np.asarray(self._minima, dtype=np.float64)
+        x = points[:, 0]
+        y = points[:, 1]
+        x_mean = x.mean()
+        spread = np.sum((x - x_mean) ** 2)
+        drift = 0.0 if spread <= 0 else float(np.sum((x - x_mean) * (y - y.mean())) / spread)
+        self._drift = drift
+        # Keep the line under every retained minimum.
+        self._offset = float(np.min(y - drift * x))
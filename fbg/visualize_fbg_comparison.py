@@ -12,13 +12,13 @@ parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
 import numpy as np
-from collections import deque
 from PyQt5 import QtWidgets, QtCore
 import pyqtgraph as pg
 
 # Direct imports to avoid module-level initialization issues
 from fbg.streaming import FBGStreamReader
 from fbg.config import DEFAULT_CONFIG
+from fbg.ringbuffer import RingBuffer
 
 
 class FBGComparisonWindow(QtWidgets.QMainWindow):
@@ -30,10 +30,10 @@ class FBGComparisonWindow(QtWidgets.QMainWindow):
         self.history_seconds = 10.0
         self.max_points = int(2000 * self.history_seconds)
         
-        # Data buffers
-        self.time_data = deque(maxlen=self.max_points)
-        self.fbg1_data = deque(maxlen=self.max_points)
-        self.fbg2_data = deque(maxlen=self.max_points)
+        # Local history of [time, fbg_1, fbg_2]; the subscription only
+        # hands over samples that arrived since the previous update.
+        self.history = RingBuffer(self.max_points, 3)
+        self.subscription = reader.subscribe(max_backlog=self.max_points)
         
         self._init_ui()
         self._init_timer()
@@ -85,18 +85,22 @@ class FBGComparisonWindow(QtWidgets.QMainWindow):
         self.timer.start(20)  # 50 Hz update rate
         
     def _update_plots(self):
-        # Get latest data from reader
-        time_arr, data_dict = self.reader.snapshot()
-        
-        if len(time_arr) == 0:
+        # Get new data from reader
+        new_time, data_dict = self.subscription.read()
+        if len(new_time) > 0:
+            missing = np.full(len(new_time), np.nan)
+            self.history.extend(np.column_stack((
+                new_time,
+                data_dict.get('fbg_1', missing),
+                data_dict.get('fbg_2', missing),
+            )))
+        
+        if len(self.history) == 0:
             return
             
         # Extract FBG1 and FBG2 data
-        fbg1_arr = data_dict.get('fbg_1', np.array([]))
-        fbg2_arr = data_dict.get('fbg_2', np.array([]))
-        
-        if len(fbg1_arr) == 0 or len(fbg2_arr) == 0:
-            return
+        block = self.history.latest()
+        time_arr, fbg1_arr, fbg2_arr = block[:, 0], block[:, 1], block[:, 2]
         
         # Make time relative
         if len(time_arr) > 0:
@@ -47,6 +47,8 @@ except Exception as exc:  # pragma: no cover - runtime dependency
 else:
     PHIDGET_IMPORT_ERROR = None
 
+from fbg.metrics import REGISTRY as METRICS
+
 
 GRAM_TO_NEWTON = 0.00980665
 VALID_GAINS = (1, 8, 16, 32, 64, 128)
@@ -316,6 +318,11 @@ class PhidgetLoadCell:
         self.dropped_records = 0
         self.records: Queue[Tuple[float, float, float]] = Queue(maxsize=200000)
 
+        # Published to the shared metrics registry when it is importable.
+        self.metrics_prefix = f"phidget.ch{channel}"
+        self._rate_window_start = float("nan")
+        self._rate_window_count = 0
+
         self.device.setOnAttachHandler(self._on_attach)
         self.device.setOnDetachHandler(self._on_detach)
         self.device.setOnErrorHandler(self._on_error)
@@ -407,9 +414,11 @@ class PhidgetLoadCell:
 
     def _on_detach(self, _ph) -> None:
         self.attached = False
+        METRICS.counter(f"{self.metrics_prefix}.detaches").inc()
         print("\n[detach] Phidget channel detached. Waiting for reattach...")
 
     def _on_error(self, _ph, code, description) -> None:
+        METRICS.counter(f"{self.metrics_prefix}.errors").inc()
         print(f"\n[phidget-error] code={code} description={description}")
 
     def _on_voltage_ratio_change(self, _ph, voltage_ratio: float) -> None:
@@ -425,6 +434,7 @@ class PhidgetLoadCell:
             else:
                 force_n = float("nan")
 
+            previous_ts = self.latest_ts
             self.latest_raw = float(voltage_ratio)
             self.latest_force = force_n
             self.latest_ts = t_host
@@ -434,6 +444,24 @@ class PhidgetLoadCell:
             self.records.put_nowait((t_host, float(voltage_ratio), force_n))
         except Full:
             self.dropped_records += 1
+            METRICS.counter(f"{self.metrics_prefix}.dropped").inc()
+        self._publish_sample_metrics(t_host, previous_ts)
+
+    def _publish_sample_metrics(self, t_host: float, previous_ts: float) -> None:
+        prefix = self.metrics_prefix
+        METRICS.counter(f"{prefix}.samples").inc()
+        METRICS.heartbeat(f"{prefix}.sample", t_host)
+        if math.isfinite(previous_ts):
+            METRICS.histogram(f"{prefix}.interval_s").observe(t_host - previous_ts)
+        if not math.isfinite(self._rate_window_start):
+            self._rate_window_start = t_host
+        self._rate_window_count += 1
+        elapsed = t_host - self._rate_window_start
+        if elapsed >= 1.0:
+            METRICS.gauge(f"{prefix}.sample_rate_hz").set(self._rate_window_count / elapsed)
+            METRICS.gauge(f"{prefix}.queue_depth").set(self.records.qsize())
+            self._rate_window_start = t_host
+            self._rate_window_count = 0
 
     def tare(self, window_s: float) -> Tuple[float, int]:
         avg_raw, n = self.get_average_raw(window_s)